@@ -0,0 +1,1187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks do Detector LIBRAS
+=============================
+
+Mede o custo por frame do detector sem câmera nem motor: os frames vêm de
+um arquivo de vídeo (--video) ou são sintéticos, e o GPIO é simulado.
+
+Uso:
+    python3 benchmark.py logging [--frames 300] [--video gravacao.mp4]
+    python3 benchmark.py api [--clients 4]
+    python3 benchmark.py preview [--clients 16] [--seconds 5]
+    python3 benchmark.py mqtt
+    python3 benchmark.py multicam [--workers 4]
+    python3 benchmark.py blobs [--frames 300]
+    python3 benchmark.py startup [--video gravacao.mp4]
+    python3 benchmark.py features [--samples 20000]
+    python3 benchmark.py profiler [--frames 300]
+    python3 benchmark.py latency [--activations 20]
+    python3 benchmark.py simplify [--samples 20000] [--video gravacao.mp4]
+    python3 benchmark.py cache [--frames 300] [--video gravacao.mp4]
+    python3 benchmark.py session [--frames 300] [--video gravacao.mp4]
+    python3 benchmark.py offload [--frames 300] [--video gravacao.mp4]
+    python3 benchmark.py realtime [--frames 300] [--video gravacao.mp4]
+    python3 benchmark.py tiles [--frames 300] [--video gravacao.mp4]
+    python3 benchmark.py stream [--frames 300] [--video gravacao.mp4]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+
+def synthetic_frames(count, width=640, height=480, seed=0):
+    """Gera frames com uma silhueta de mão cor de pele dentro do ROI"""
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(count):
+        frame = np.full((height, width, 3), 40, dtype=np.uint8)
+        frame += rng.integers(0, 20, frame.shape, dtype=np.uint8)
+
+        # O detector espelha o frame: a mão é desenhada já espelhada no ROI
+        cx = width - 350 + int(10 * np.sin(i / 10.0))
+        cy = 240
+        skin = (120, 160, 220)
+        cv2.circle(frame, (cx, cy), 60, skin, -1)
+        for k in range((i // 60) % 5 + 1):
+            angle = np.radians(-150 + k * 30)
+            tip = (int(cx + 130 * np.cos(angle)), int(cy + 130 * np.sin(angle)))
+            cv2.line(frame, (cx, cy), tip, skin, 22)
+        frames.append(frame)
+    return frames
+
+
+def load_frames(args):
+    """Carrega os frames do vídeo informado ou gera frames sintéticos"""
+    if not args.video:
+        return synthetic_frames(args.frames)
+
+    import cv2
+
+    cap = cv2.VideoCapture(args.video)
+    frames = []
+    while len(frames) < args.frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.resize(frame, (640, 480)))
+    cap.release()
+    if not frames:
+        raise SystemExit(f"❌ Nenhum frame lido de {args.video}")
+    return frames
+
+
+def time_frames(detector, frames):
+    """Processa todos os frames e retorna o tempo de cada um (segundos)"""
+    times = []
+    for frame in frames:
+        start = time.perf_counter()
+        detector.process_frame(frame.copy())
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def summarize(label, times):
+    """Imprime média, p50, p95, máximo e desvio padrão em milissegundos"""
+    ordered = sorted(times)
+    n = len(ordered)
+    mean = sum(ordered) / n
+    stdev = (sum((t - mean) ** 2 for t in ordered) / n) ** 0.5
+    p50 = ordered[n // 2]
+    p95 = ordered[min(n - 1, int(n * 0.95))]
+    print(f"{label:<24} média {mean*1000:7.3f} ms | p50 {p50*1000:7.3f} ms | "
+          f"p95 {p95*1000:7.3f} ms | máx {ordered[-1]*1000:7.3f} ms | "
+          f"σ {stdev*1000:6.3f} ms | {n / sum(ordered):6.1f} FPS")
+    return mean
+
+
+def make_detector(cfg):
+    """Cria um detector com GPIO simulado"""
+    cfg.hardware.USE_FAKE_GPIO = True
+    from libras_detector_rpi import LibrasDetectorRPi
+    return LibrasDetectorRPi(motor_pins=cfg.hardware.MOTOR_PINS, cfg=cfg)
+
+
+def bench_logging(args):
+    """Tempo por frame com logging desligado vs. em nível DEBUG"""
+    from config import Config
+
+    frames = load_frames(args)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for level in ("OFF", "DEBUG"):
+            cfg = Config()
+            cfg.system.ENABLE_LOGGING = level != "OFF"
+            cfg.system.LOG_LEVEL = level if level != "OFF" else "INFO"
+            cfg.system.LOG_FILE = os.path.join(tmp, f"detector_{level}.log")
+
+            detector = make_detector(cfg)
+            try:
+                time_frames(detector, frames[:10])  # Aquecimento
+                results[level] = summarize(f"logging {level}", time_frames(detector, frames))
+            finally:
+                detector.cleanup()
+
+    overhead = (results["DEBUG"] - results["OFF"]) * 1e6
+    print(f"Custo do logging DEBUG: {overhead:+.1f} µs/frame")
+
+
+def bench_api(args):
+    """Latência da API REST e jitter do loop de frames sob carga em localhost"""
+    import http.client
+    import json
+    from config import Config
+    from rest_api import RestApiServer
+
+    frames = load_frames(args)
+    cfg = Config()
+    cfg.system.ENABLE_LOGGING = False
+    detector = make_detector(cfg)
+    server = RestApiServer(detector, "127.0.0.1", 0,
+                           cfg.network.API_MAX_REQUESTS_PER_SECOND).start()
+
+    stop = threading.Event()
+    latencies = []
+
+    def client(index):
+        conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        requests = [("GET", "/status", None),
+                    ("POST", "/word", json.dumps({"word": "OLA" if index % 2 else "UAU"})),
+                    ("GET", "/status", None),
+                    ("POST", "/reset", None)]
+        i = 0
+        while not stop.is_set():
+            method, path, body = requests[i % len(requests)]
+            start = time.perf_counter()
+            conn.request(method, path, body=body)
+            conn.getresponse().read()
+            latencies.append(time.perf_counter() - start)
+            i += 1
+        conn.close()
+
+    try:
+        time_frames(detector, frames[:10])  # Aquecimento
+        summarize("frames sem carga", time_frames(detector, frames))
+
+        clients = [threading.Thread(target=client, args=(i,), daemon=True)
+                   for i in range(args.clients)]
+        for t in clients:
+            t.start()
+        loaded = time_frames(detector, frames)
+        stop.set()
+        for t in clients:
+            t.join()
+
+        summarize(f"frames com {args.clients} clientes", loaded)
+        if latencies:
+            summarize("latência da API", latencies)
+            print(f"Requisições atendidas: {len(latencies)} "
+                  f"({len(latencies) / sum(loaded):.0f} req/s; limite "
+                  f"{cfg.network.API_MAX_REQUESTS_PER_SECOND or 'nenhum'})")
+    finally:
+        server.stop()
+        detector.cleanup()
+
+
+def bench_preview(args):
+    """CPU do preview MJPEG com 1..N espectadores locais (deve ficar estável)"""
+    import socket
+    from config import Config
+    from preview_server import PreviewServer
+
+    cfg = Config()
+    frames = load_frames(args)
+    server = PreviewServer("127.0.0.1", 0, cfg.network.PREVIEW_FPS,
+                           cfg.network.PREVIEW_WIDTH, cfg.network.PREVIEW_JPEG_QUALITY).start()
+
+    def viewer(stop, received, slow):
+        sock = socket.create_connection(("127.0.0.1", server.port))
+        sock.sendall(b"GET /stream.mjpg HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        sock.settimeout(0.5)
+        while not stop.is_set():
+            try:
+                data = sock.recv(4096 if slow else 65536)
+            except socket.timeout:
+                continue
+            if not data:
+                break
+            received[0] += len(data)
+            if slow:
+                time.sleep(0.05)  # Cliente lento: não deve acumular buffer no servidor
+        sock.close()
+
+    counts = [1]
+    while counts[-1] * 2 <= args.clients:
+        counts.append(counts[-1] * 2)
+
+    try:
+        for count in counts:
+            stop = threading.Event()
+            received = [[0] for _ in range(count + 1)]
+            viewers = [threading.Thread(target=viewer, args=(stop, received[i], i == count),
+                                        daemon=True)
+                       for i in range(count + 1)]
+            for t in viewers:
+                t.start()
+            time.sleep(0.5)
+
+            stats_before = server.get_stats()
+            cpu_start = time.process_time()
+            wall_start = time.perf_counter()
+            period = 1.0 / cfg.hardware.CAMERA_FPS
+            i = 0
+            while time.perf_counter() - wall_start < args.seconds:
+                server.publish(frames[i % len(frames)])
+                i += 1
+                time.sleep(period)
+            cpu = time.process_time() - cpu_start
+            wall = time.perf_counter() - wall_start
+            stats = server.get_stats()
+
+            stop.set()
+            for t in viewers:
+                t.join()
+
+            encoded = stats['encoded_frames'] - stats_before['encoded_frames']
+            fast_kb = sum(r[0] for r in received[:count]) / count / 1024
+            print(f"{count:3d} espectadores + 1 lento | CPU {cpu / wall * 100:5.1f}% | "
+                  f"JPEGs {encoded / wall:5.1f}/s ({stats['encode_ms']:.2f} ms) | "
+                  f"{fast_kb / wall:7.1f} KB/s por cliente | lento {received[count][0] / 1024 / wall:6.1f} KB/s | "
+                  f"descartados {stats['dropped_frames'] - stats_before['dropped_frames']}")
+    finally:
+        server.stop()
+
+
+class LocalBroker:
+    """Broker MQTT mínimo em localhost: aceita CONNECT, conta PUBLISH e responde PING"""
+
+    def __init__(self):
+        import socket
+
+        self.server = socket.socket()
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(4)
+        self.port = self.server.getsockname()[1]
+        self.topics = {}
+        self.running = True
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while self.running:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._client, args=(conn,), daemon=True).start()
+
+    def _client(self, conn):
+        stream = conn.makefile("rb")
+        try:
+            while True:
+                header = stream.read(1)
+                if not header:
+                    break
+                length, shift = 0, 0
+                while True:
+                    byte = stream.read(1)[0]
+                    length |= (byte & 0x7F) << shift
+                    shift += 7
+                    if not byte & 0x80:
+                        break
+                body = stream.read(length)
+                kind = header[0] >> 4
+                if kind == 1:       # CONNECT
+                    conn.sendall(b"\x20\x02\x00\x00")
+                elif kind == 3:     # PUBLISH
+                    topic_len = int.from_bytes(body[:2], "big")
+                    topic = body[2:2 + topic_len].decode("utf-8")
+                    self.topics[topic] = self.topics.get(topic, 0) + 1
+                elif kind == 12:    # PINGREQ
+                    conn.sendall(b"\xd0\x00")
+                elif kind == 14:    # DISCONNECT
+                    break
+        except (OSError, IndexError):
+            pass
+        finally:
+            conn.close()
+
+    def close(self):
+        self.running = False
+        self.server.close()
+
+
+def bench_mqtt(args):
+    """Custo por frame da publicação MQTT: desligado, broker local e broker fora do ar"""
+    import socket
+    from config import Config
+
+    frames = load_frames(args)
+    broker = LocalBroker()
+
+    # Porta sem ninguém escutando para simular broker fora do ar
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    dead_port = probe.getsockname()[1]
+    probe.close()
+
+    scenarios = [("sem MQTT", None), ("broker local", broker.port), ("broker fora do ar", dead_port)]
+    results = {}
+    try:
+        for label, port in scenarios:
+            cfg = Config()
+            cfg.system.ENABLE_LOGGING = False
+            cfg.network.ENABLE_MQTT = port is not None
+            cfg.network.MQTT_BROKER = "127.0.0.1"
+            cfg.network.MQTT_PORT = port or 0
+            cfg.network.MQTT_METRICS_INTERVAL = 0.5
+
+            detector = make_detector(cfg)
+            detector.start_services()
+            try:
+                time_frames(detector, frames[:10])  # Aquecimento
+                times = []
+                for frame in frames:
+                    start = time.perf_counter()
+                    detector.process_frame(frame.copy())
+                    # Um evento extra por frame para exercitar a caixa de saída
+                    detector.publish_event("letter", letter="A", frame=detector.frame_count)
+                    times.append(time.perf_counter() - start)
+                results[label] = summarize(label, times)
+                if detector.event_publisher is not None:
+                    print(f"   {detector.event_publisher.get_stats()}")
+            finally:
+                detector.stop_services()
+                detector.cleanup()
+
+        time.sleep(0.2)
+        print(f"Mensagens recebidas pelo broker local: {broker.topics}")
+        for label in ("broker local", "broker fora do ar"):
+            overhead = (results[label] - results["sem MQTT"]) * 1e6
+            print(f"Custo por frame ({label}): {overhead:+.1f} µs")
+    finally:
+        broker.close()
+
+
+class FrameListCapture:
+    """Fonte com a interface de cv2.VideoCapture que reproduz uma lista de frames"""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.position = 0
+
+    def read(self):
+        if self.position >= len(self.frames):
+            return False, None
+        frame = self.frames[self.position].copy()
+        self.position += 1
+        return True, frame
+
+    def release(self):
+        pass
+
+
+def bench_multicam(args):
+    """Vazão agregada com 1, 2 e 4 streams reproduzidos em paralelo"""
+    from config import Config
+    from multi_camera import MultiStreamDetector
+
+    frames = load_frames(args)
+    baseline = None
+    for count in (1, 2, 4):
+        cfg = Config()
+        cfg.system.ENABLE_LOGGING = False
+        detector = make_detector(cfg)
+        workers = args.workers or min(count, os.cpu_count() or 1)
+        try:
+            sources = [FrameListCapture(frames) for _ in range(count)]
+            stats = MultiStreamDetector(detector, sources, workers, realtime=False).run()
+        finally:
+            detector.cleanup()
+
+        baseline = baseline or stats['fps']
+        per_stream = [info['frames'] for info in stats['streams'].values()]
+        print(f"{count} stream(s), {workers} worker(s): {stats['fps']:7.1f} FPS agregados | "
+              f"{stats['fps'] / count:6.1f} FPS/stream | escala {stats['fps'] / baseline:4.2f}x | "
+              f"frames por stream {per_stream}")
+
+
+def noisy_masks(count, blobs=60, seed=1):
+    """Máscaras 300x300 com a mão sintética e dezenas de blobs de ruído"""
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    masks = []
+    for i, frame in enumerate(synthetic_frames(count, seed=seed)):
+        roi = cv2.flip(frame, 1)[60:360, 200:500]
+        mask = np.zeros(roi.shape[:2], dtype=np.uint8)
+        mask[cv2.inRange(roi, (100, 140, 200), (140, 180, 240)) > 0] = 255
+        for _ in range(blobs):
+            center = (int(rng.integers(0, 300)), int(rng.integers(0, 300)))
+            cv2.circle(mask, center, int(rng.integers(1, 6)), 255, -1)
+        if i % 10 == 0:
+            # Blob grande (braço/rosto) que deve vetar a detecção como antes
+            cv2.rectangle(mask, (0, 0), (299, 190), 255, -1)
+        masks.append(cv2.GaussianBlur(mask, (3, 3), 0))
+    return masks
+
+
+def legacy_select_hand_contour(mask, min_area, max_area):
+    """Seleção original: todos os contornos + contourArea repetido"""
+    import cv2
+
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+    hand_contour = max(contours, key=cv2.contourArea)
+    area = cv2.contourArea(hand_contour)
+    return hand_contour if min_area < area < max_area else None
+
+
+def bench_blobs(args):
+    """Seleção do blob da mão: original vs. passe único, com verificação de identidade"""
+    import numpy as np
+    from config import Config
+
+    cfg = Config()
+    cfg.system.ENABLE_LOGGING = False
+    detector = make_detector(cfg)
+    masks = noisy_masks(args.frames)
+
+    legacy_times, new_times = [], []
+    mismatches = 0
+    found = 0
+    try:
+        for mask in masks:
+            start = time.perf_counter()
+            expected = legacy_select_hand_contour(mask, detector.min_area, detector.max_area)
+            legacy_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            contour, _ = detector.select_hand_contour(mask)
+            new_times.append(time.perf_counter() - start)
+
+            if expected is None or contour is None:
+                mismatches += (expected is None) != (contour is None)
+            else:
+                found += 1
+                mismatches += not np.array_equal(expected, contour)
+    finally:
+        detector.cleanup()
+
+    legacy = summarize("findContours (original)", legacy_times)
+    new = summarize("passe único", new_times)
+    print(f"Speedup: {legacy / new:.2f}x | mãos encontradas: {found}/{len(masks)} | "
+          f"contornos diferentes do original: {mismatches}")
+    if mismatches:
+        raise SystemExit("❌ Seleção diverge da implementação original")
+
+
+def startup_probe(video, parallel, max_frames, results):
+    """Executado em um interpretador novo: mede a partida a frio do detector"""
+    start = time.perf_counter()
+    from config import Config
+    from libras_detector_rpi import LibrasDetectorRPi
+    imported = time.perf_counter() - start
+
+    cfg = Config()
+    cfg.system.ENABLE_LOGGING = False
+    cfg.hardware.USE_FAKE_GPIO = True
+    cfg.advanced.PARALLEL_STARTUP = parallel
+    detector = LibrasDetectorRPi(motor_pins=cfg.hardware.MOTOR_PINS, cfg=cfg)
+    detector.run(source=video, headless=True, max_frames=max_frames)
+
+    metrics = dict(detector.startup_metrics)
+    metrics['import_total'] = imported
+    results.put(metrics)
+
+
+def write_video(frames, path, fps=20):
+    """Grava os frames em um AVI MJPG (fonte de vídeo para o detector)"""
+    import cv2
+
+    height, width = frames[0].shape[:2]
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+
+
+def bench_startup(args):
+    """Tempo até o primeiro frame e a primeira letra, com inicialização paralela e serial"""
+    import multiprocessing
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        video = args.video
+        if not video:
+            video = os.path.join(tmp, "startup.avi")
+            write_video(synthetic_frames(args.frames), video)
+
+        for parallel in (True, False):
+            label = "paralela" if parallel else "serial"
+            runs = []
+            for _ in range(3):
+                results = context.Queue()
+                process = context.Process(target=startup_probe,
+                                          args=(video, parallel, args.frames, results))
+                process.start()
+                runs.append(results.get(timeout=120))
+                process.join()
+
+            def best(key):
+                values = [run[key] for run in runs if key in run]
+                return f"{min(values) * 1000:7.0f} ms" if values else "      —   "
+
+            print(f"inicialização {label:<9} importações {best('import_total')} | "
+                  f"GPIO {best('hardware_ready')} | câmera {best('camera_ready')} | "
+                  f"1º frame {best('first_frame')} | 1ª letra {best('first_letter')}")
+
+
+def feature_worker(seed, start, count):
+    """Mede geometria + dedos + classificação em uma fatia do corpus sintético"""
+    import cv2
+    import numpy as np
+    from config import Config
+    from hand_synth import ROI_SIZE, iter_samples
+
+    cv2.setNumThreads(1)
+    cfg = Config()
+    cfg.system.ENABLE_LOGGING = False
+    cfg.detection.FEATURE_CACHE = False
+    detector = make_detector(cfg)
+    try:
+        # A geração fica fora do tempo medido
+        samples = [sample for sample in iter_samples(count, seed, start)
+                   if sample['contour'] is not None]
+        canvas = np.zeros((ROI_SIZE, ROI_SIZE, 3), dtype=np.uint8)
+
+        hits = {}
+        begin = time.perf_counter()
+        for sample in samples:
+            _, fingers, _ = detector.describe_hand(sample['contour'], canvas)
+            expected = sample['expected_fingers']
+            total, correct = hits.get(expected, (0, 0))
+            hits[expected] = (total + 1, correct + (fingers == expected))
+        elapsed = time.perf_counter() - begin
+    finally:
+        detector.cleanup()
+    return len(samples), elapsed, hits
+
+
+
+def bench_features(args):
+    """Contornos/s sustentados pelas etapas de features e classificação, de 1 a N CPUs"""
+    import multiprocessing
+
+    cpus = os.cpu_count() or 1
+    process_counts = sorted({1, cpus} | {n for n in (2, 4, 8, 16, 32, 64) if n < cpus})
+    context = multiprocessing.get_context("spawn")
+    baseline = None
+    for processes in process_counts:
+        shards = [(0, index * args.samples, args.samples) for index in range(processes)]
+        with context.Pool(processes) as pool:
+            results = pool.starmap(feature_worker, shards)
+
+        total = sum(count for count, _, _ in results)
+        wall = max(elapsed for _, elapsed, _ in results)
+        rate = total / wall if wall > 0 else 0.0
+        baseline = baseline or rate
+        print(f"{processes:3d} processo(s): {total:8d} contornos | {rate:10.0f} contornos/s | "
+              f"{rate / processes:9.0f} por CPU | escala {rate / baseline:5.2f}x")
+
+        if processes == 1:
+            hits = results[0][2]
+            agreement = ", ".join(f"{expected} dedos {correct / count * 100:5.1f}%"
+                                  for expected, (count, correct) in sorted(hits.items()))
+            print(f"    contagem de dedos igual à esperada: {agreement}")
+
+
+def bench_profiler(args):
+    """Custo por frame com o profiler desligado e ligado em taxas crescentes"""
+    from config import Config
+    from profiler import SamplingProfiler
+
+    frames = load_frames(args)
+    cfg = Config()
+    cfg.system.ENABLE_LOGGING = False
+    detector = make_detector(cfg)
+    try:
+        time_frames(detector, frames[:20])
+        baseline = summarize("profiler desligado", time_frames(detector, frames))
+        with tempfile.TemporaryDirectory() as tmp:
+            for rate in (100, 500, 1000):
+                profiler = SamplingProfiler(tmp, rate=rate)
+                profiler.start()
+                mean = summarize(f"profiler {rate} Hz", time_frames(detector, frames))
+                profiler.stop(wait=True)
+                print(f"    {profiler.samples} amostras, {len(profiler.stacks)} pilhas distintas, "
+                      f"overhead {(mean / baseline - 1) * 100:+.1f}%")
+    finally:
+        detector.cleanup()
+
+
+# Orçamentos de latência (p95, ms) verificados pelo replay
+# vote→capture: a votação precisa de 7 dos 10 últimos frames (6 intervalos a 20 FPS = 300 ms)
+LATENCY_BUDGETS_MS = {
+    'vote→capture': 350.0,
+    'letter→word': 2.0,
+    'word→dispatch': 5.0,
+    'dispatch→first_step': 20.0,
+    'capture→first_step': 100.0,
+    'vote→first_step': 450.0,
+}
+
+
+def bench_latency(args):
+    """Replay de sequências de letras roteirizadas com GPIO simulado; verifica orçamentos"""
+    import itertools
+    from config import Config
+
+    cfg = Config()
+    cfg.system.ENABLE_LOGGING = False
+    cfg.detection.FEATURE_CACHE = False
+    detector = make_detector(cfg)
+    detector.activation_cooldown = 0
+    word = detector.target_word
+
+    # Cada letra dura 12 frames; 'E' separa as repetições da palavra
+    script = []
+    for _ in range(args.activations):
+        for letter in "E" + word:
+            script.extend([letter] * 12)
+    letters = iter(script)
+    detector.classify_libras_letter = lambda geometry, fingers, frame: next(letters, "INDEFINIDO")
+
+    frames = synthetic_frames(1)
+    tracer = detector.tracer
+    # Frames no ritmo da câmera: o atraso da votação é medido em tempo real
+    period = 1.0 / cfg.hardware.CAMERA_FPS
+    print(f"Replay de {len(script)} frames a {cfg.hardware.CAMERA_FPS} FPS "
+          f"(~{len(script) * period:.0f} s)")
+    next_tick = time.perf_counter()
+    try:
+        for frame in itertools.islice(itertools.cycle(frames), len(script)):
+            next_tick = max(next_tick + period, time.perf_counter())
+            time.sleep(max(next_tick - time.perf_counter(), 0))
+            activations = len(tracer.activations)
+            detector.process_frame(frame.copy(), capture_time=time.perf_counter())
+            if detector.motor.running:
+                # Aguarda o primeiro passo e para o motor antes do próximo frame
+                deadline = time.perf_counter() + 1.0
+                while len(tracer.activations) == activations and time.perf_counter() < deadline:
+                    time.sleep(0.0005)
+                detector.motor.stop()
+                while detector.motor.running and time.perf_counter() < deadline:
+                    time.sleep(0.0005)
+    finally:
+        writes = detector.gpio.writes
+        detector.cleanup()
+
+    distributions = tracer.get_distributions()
+    print(f"{len(tracer.letters)} letras confirmadas, {len(tracer.activations)} acionamentos "
+          f"(esperados {args.activations}), {writes} escritas no GPIO simulado")
+    for kind in ("letters", "activations"):
+        print(f"{kind}:")
+        for name, stats in distributions[kind].items():
+            print(f"    {name:<24} média {stats['mean_ms']:7.3f} ms | p50 {stats['p50_ms']:7.3f} ms"
+                  f" | p95 {stats['p95_ms']:7.3f} ms | máx {stats['max_ms']:7.3f} ms")
+
+    failures = []
+    if len(tracer.activations) != args.activations:
+        failures.append(f"{len(tracer.activations)} acionamentos, esperados {args.activations}")
+    for name, budget in LATENCY_BUDGETS_MS.items():
+        stats = distributions["activations"].get(name)
+        if stats is None:
+            failures.append(f"segmento {name} ausente")
+        elif stats['p95_ms'] > budget:
+            failures.append(f"{name}: p95 {stats['p95_ms']:.2f} ms > {budget:.0f} ms")
+    if failures:
+        raise SystemExit("❌ Orçamento de latência estourado: " + "; ".join(failures))
+    print("✅ Latências dentro do orçamento")
+
+
+def recorded_contours(detector, frames):
+    """Contornos da mão extraídos dos frames pelo próprio pipeline (coordenadas do ROI)"""
+    import cv2
+
+    x, y, w, h = detector.stream.roi
+    contours = []
+    for frame in frames:
+        roi = cv2.flip(frame, 1)[y:y+h, x:x+w]
+        contour, _ = detector.select_hand_contour(detector.create_skin_mask(roi))
+        if contour is not None:
+            contours.append(contour)
+    return contours
+
+
+def bench_simplify(args):
+    """Speedup e concordância (dedos/letra) da simplificação de contorno por tolerância"""
+    import numpy as np
+    from config import Config
+    from hand_synth import ROI_SIZE, iter_samples
+
+    cfg = Config()
+    cfg.system.ENABLE_LOGGING = False
+    cfg.detection.FEATURE_CACHE = False
+    detector = make_detector(cfg)
+    canvas = np.zeros((ROI_SIZE, ROI_SIZE, 3), dtype=np.uint8)
+    datasets = {
+        "sintético": [sample['contour'] for sample in iter_samples(args.samples)
+                      if sample['contour'] is not None],
+        "vídeo" if args.video else "frames sintéticos": recorded_contours(detector,
+                                                                          load_frames(args)),
+    }
+
+    try:
+        for name, contours in datasets.items():
+            print(f"{name}: {len(contours)} contornos, "
+                  f"{np.mean([len(c) for c in contours]):.0f} pontos em média")
+            if not contours:
+                continue
+            detection = detector.config.detection
+            baseline = None
+            for epsilon in (0, 0.002, 0.005, 0.01, 0.02):
+                detection.CONTOUR_SIMPLIFY = epsilon > 0
+                detection.CONTOUR_EPSILON = epsilon
+                start = time.perf_counter()
+                results = [detector.describe_hand(contour, canvas)[1:] for contour in contours]
+                elapsed = time.perf_counter() - start
+
+                if baseline is None:
+                    baseline, base_elapsed = results, elapsed
+                fingers = sum(a[0] == b[0] for a, b in zip(results, baseline)) / len(results)
+                letters = sum(a[1] == b[1] for a, b in zip(results, baseline)) / len(results)
+                print(f"    ε={epsilon:<6} {elapsed / len(contours) * 1e6:8.1f} µs/contorno | "
+                      f"speedup {base_elapsed / elapsed:5.2f}x | dedos iguais {fingers * 100:5.1f}% | "
+                      f"letras iguais {letters * 100:5.1f}%")
+    finally:
+        detector.cleanup()
+
+
+def bench_cache(args):
+    """A/B do cache de features: custo por frame, taxa de acerto e concordância das letras"""
+    from config import Config
+
+    frames = load_frames(args)
+    letters = {}
+    means = {}
+    for enabled in (False, True):
+        cfg = Config()
+        cfg.system.ENABLE_LOGGING = False
+        cfg.detection.FEATURE_CACHE = enabled
+        detector = make_detector(cfg)
+        times, gestures = [], []
+        try:
+            for frame in frames:
+                start = time.perf_counter()
+                _, _, gesture = detector.process_frame(frame.copy())
+                times.append(time.perf_counter() - start)
+                gestures.append(gesture)
+        finally:
+            detector.cleanup()
+        label = "cache ligado" if enabled else "cache desligado"
+        means[enabled] = summarize(label, times)
+        letters[enabled] = gestures
+        if enabled:
+            stats = detector.feature_cache.get_stats()
+            print(f"    acertos {stats['hits']} / {stats['hits'] + stats['misses']} "
+                  f"({stats['hit_rate'] * 100:.1f}%) | evicções {stats['evictions']} | "
+                  f"tempo economizado {stats['saved_ms']:.1f} ms")
+
+    agreement = sum(a == b for a, b in zip(letters[False], letters[True])) / len(frames)
+    print(f"Speedup: {means[False] / means[True]:.2f}x | "
+          f"letras iguais às do cálculo completo: {agreement * 100:.1f}%")
+
+
+def bench_session(args):
+    """Custo do append por frame, rotação e leitura sem cópia do log de sessão"""
+    import numpy as np
+    from config import Config
+    from session_log import SessionLog, read_session
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Custo isolado do append (geometria típica)
+        log = SessionLog(os.path.join(tmp, "isolado"), records_per_file=50000, max_files=2)
+        geometry = {'center': (350, 210), 'perimeter': 812.5, 'aspect_ratio': 0.91,
+                    'solidity': 0.83, 'compactness': 0.12, 'defect_count': 4,
+                    'extent': 0.66, 'width': 220, 'height': 240}
+        count = 200000
+        start = time.perf_counter()
+        for i in range(count):
+            log.append(time.time(), i, 0, 21000.0, geometry, 3, 0.8, "B", "B", 0)
+        elapsed = time.perf_counter() - start
+        log.close()
+        files = sorted(os.listdir(log.directory))
+        print(f"append: {elapsed / count * 1e6:.2f} µs/registro | {count} registros, "
+              f"{log.files} arquivos criados, {len(files)} mantidos, "
+              f"{log.dropped} descartados")
+
+        # Appends que trocam de arquivo (próximo pré-alocado em background)
+        log = SessionLog(os.path.join(tmp, "rotacao"), records_per_file=2000, max_files=2)
+        rotations = []
+        for i in range(20000):
+            start = time.perf_counter()
+            log.append(time.time(), i, 300 + i, 21000.0, geometry, 3, 0.8, "B", "B", 0)
+            if i % 2000 == 0:
+                rotations.append(time.perf_counter() - start)
+            time.sleep(0) if i % 2000 else time.sleep(0.01)
+        log.close()
+        print(f"troca de arquivo: média {np.mean(rotations) * 1e6:.0f} µs | "
+              f"máx {max(rotations) * 1e6:.0f} µs | {len(rotations)} trocas | "
+              f"descartados {log.dropped} | "
+              f"stream > 255 gravado: {int(read_session(log.path)['stream'][-1])}")
+
+        # Detector completo com e sem o log
+        frames = load_frames(args)
+        means = {}
+        for enabled in (False, True):
+            cfg = Config()
+            cfg.system.ENABLE_LOGGING = False
+            cfg.system.ENABLE_SESSION_LOG = enabled
+            cfg.system.SESSION_LOG_DIR = os.path.join(tmp, "detector")
+            detector = make_detector(cfg)
+            gestures = []
+            times = []
+            try:
+                for frame in frames:
+                    t0 = time.perf_counter()
+                    _, _, gesture = detector.process_frame(frame.copy())
+                    times.append(time.perf_counter() - t0)
+                    gestures.append(gesture)
+            finally:
+                detector.cleanup()
+            means[enabled] = summarize("log ligado" if enabled else "log desligado", times)
+
+        records = read_session(detector.session_log.path)
+        zero_copy = isinstance(records, np.memmap)
+        letters = [letter.decode() for letter in records['raw_letter']]
+        print(f"Leitura: {len(records)} registros, np.memmap={zero_copy}, "
+              f"letras iguais às do detector: {letters == gestures}")
+        print(f"Overhead por frame: {(means[True] - means[False]) * 1e6:+.1f} µs")
+        del records
+
+
+def start_offload_worker():
+    """Inicia offload.py em um processo local (loopback); retorna (processo, porta)"""
+    import subprocess
+    import sys
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    process = subprocess.Popen([sys.executable, os.path.join(here, "offload.py"),
+                                "--host", "127.0.0.1", "--port", "0"],
+                               stdout=subprocess.PIPE, text=True, cwd=here)
+    for line in process.stdout:
+        if "ouvindo em" in line:
+            return process, int(line.rsplit(":", 1)[1])
+    process.wait()
+    raise RuntimeError("worker de visão não iniciou")
+
+
+def bench_offload(args):
+    """Local vs. worker em loopback: custo por frame, RTT, fração remota e concordância"""
+    from config import Config
+
+    frames = load_frames(args)
+    process, port = start_offload_worker()
+    print(f"Worker em 127.0.0.1:{port} (pid {process.pid})")
+
+    # (rótulo, escala, prazo em ms); None = só local
+    scenarios = [("local", None, None), ("remoto 1.0x", 1.0, 40), ("remoto 0.5x", 0.5, 40),
+                 ("prazo 0.2 ms", 0.5, 0.2)]
+    baseline = None
+    try:
+        for label, scale, deadline in scenarios:
+            cfg = Config()
+            cfg.system.ENABLE_LOGGING = False
+            cfg.network.ENABLE_STDIN_COMMANDS = False
+            if scale is not None:
+                cfg.network.ENABLE_OFFLOAD = True
+                cfg.network.OFFLOAD_HOST = "127.0.0.1"
+                cfg.network.OFFLOAD_PORT = port
+                cfg.network.OFFLOAD_SCALE = scale
+                cfg.network.OFFLOAD_DEADLINE_MS = deadline
+            detector = make_detector(cfg)
+            detector.start_services()
+            if detector.offload is not None:
+                limit = time.monotonic() + 5
+                while detector.offload.sock is None and time.monotonic() < limit:
+                    time.sleep(0.01)
+            times, gestures = [], []
+            try:
+                for frame in frames:
+                    start = time.perf_counter()
+                    _, _, gesture = detector.process_frame(frame.copy())
+                    times.append(time.perf_counter() - start)
+                    gestures.append(gesture)
+                stats = detector.offload.get_stats() if detector.offload is not None else None
+            finally:
+                detector.stop_services()
+                detector.cleanup()
+
+            summarize(label, times)
+            if baseline is None:
+                baseline = gestures
+                continue
+            agreement = sum(a == b for a, b in zip(baseline, gestures)) / len(frames)
+            rtt = (f"RTT p50 {stats['rtt_p50_ms']:.2f} ms p95 {stats['rtt_p95_ms']:.2f} ms | "
+                   f"worker {stats['worker_ms']:.2f} ms | "
+                   f"{stats['bytes_per_request'] / 1024:.1f} KiB/req"
+                   if stats['rtt_p50_ms'] is not None else "sem respostas no prazo")
+            print(f"    remoto {stats['offload_ratio'] * 100:5.1f}% | "
+                  f"prazos perdidos {stats['deadline_misses']} | ocupado {stats['busy']} | "
+                  f"{rtt} | letras iguais às locais {agreement * 100:.1f}%")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def bench_realtime(args):
+    """Jitter dos passos do motor e variância dos frames sem/com afinidade e SCHED_FIFO"""
+    from config import Config
+    import sys
+    from cpu_policy import available_cpus
+
+    frames = load_frames(args)
+    cpus = available_cpus()
+    # Motor no primeiro núcleo, visão (e pool do OpenCV) nos demais
+    motor_cpus = cpus[:1]
+    vision_cpus = cpus[1:] or cpus
+    delay = 0.002
+
+    original_affinity = os.sched_getaffinity(0) if hasattr(os, "sched_getaffinity") else None
+    original_switch = sys.getswitchinterval()
+    scenarios = [("padrão", False, None), ("GIL 0.5 ms", False, 0.0005),
+                 ("afinidade + FIFO", True, None), ("afinidade + FIFO + GIL", True, 0.0005)]
+    for label, tuned, switch in scenarios:
+        cfg = Config()
+        cfg.system.ENABLE_LOGGING = False
+        cfg.advanced.GIL_SWITCH_INTERVAL = switch
+        if tuned:
+            cfg.advanced.MOTOR_CPUS = motor_cpus
+            cfg.advanced.MOTOR_RT_PRIORITY = 50
+            cfg.advanced.MOTOR_NICE = -10
+            cfg.advanced.VISION_CPUS = vision_cpus
+            cfg.advanced.OPENCV_THREADS = len(vision_cpus)
+        detector = make_detector(cfg)
+        vision = detector.apply_thread_policy("vision")
+
+        motor_policy = {}
+        step_times = []
+        motor = detector.motor
+        step = motor.step
+        setup = motor.thread_setup
+
+        def timed_step(direction=1):
+            step_times.append(time.perf_counter())
+            step(direction)
+
+        def traced_setup():
+            motor_policy.update(setup())
+
+        motor.step = timed_step
+        motor.thread_setup = traced_setup
+        try:
+            motor.run_sequence(10 ** 9, delay)
+            times = time_frames(detector, frames)
+        finally:
+            motor.stop()
+            time.sleep(0.05)
+            detector.cleanup()
+            # A thread principal volta ao padrão para o próximo cenário
+            if original_affinity is not None:
+                os.sched_setaffinity(0, original_affinity)
+            sys.setswitchinterval(original_switch)
+
+        summarize(label, times)
+        intervals = sorted((b - a - delay) * 1000 for a, b in zip(step_times, step_times[1:]))
+        n = len(intervals)
+        mean = sum(intervals) / n
+        stdev = (sum((v - mean) ** 2 for v in intervals) / n) ** 0.5
+        print(f"    passos do motor: {n + 1} | atraso médio {mean:.3f} ms | σ {stdev:.3f} ms | "
+              f"p99 {intervals[min(n - 1, int(n * 0.99))]:.3f} ms | máx {intervals[-1]:.3f} ms")
+        if tuned and switch is None:
+            print(f"    aplicado: visão {vision or '-'} | motor {motor_policy or '-'} | "
+                  f"OpenCV {cfg.advanced.OPENCV_THREADS} thread(s) | CPUs disponíveis {cpus}")
+
+
+def bench_tiles(args):
+    """Máscara de pele em 1..4 faixas paralelas: speedup e identidade com o caminho serial"""
+    import cv2
+    import numpy as np
+    from config import Config
+
+    frames = load_frames(args)
+    # Frames com ruído exercitam as bordas entre faixas (blobs e buracos em toda parte)
+    rng = np.random.default_rng(2)
+    noisy = [cv2.add(frame, rng.integers(0, 80, frame.shape, dtype=np.uint8))
+             for frame in frames[:20]]
+    print(f"🖐️ Máscara de pele em faixas: {len(frames)} frames, "
+          f"{os.cpu_count()} CPU(s), OpenCV com {cv2.getNumThreads()} thread(s)")
+
+    detector = None
+    reference = None
+    baseline = {}
+    for threads in (1, 2, 3, 4):
+        cfg = Config()
+        cfg.system.ENABLE_LOGGING = False
+        cfg.advanced.TILED_SKIN_MASK = True
+        cfg.advanced.THREAD_POOL_SIZE = threads
+        if detector is not None:
+            detector.cleanup()
+        detector = make_detector(cfg)
+        x, y, w, h = detector.stream.roi
+        rois = [frame[y:y + h, x:x + w] for frame in frames]
+        samples = {"ROI": rois, "frame inteiro": frames}
+
+        masks = [detector.create_skin_mask(image) for image in rois + frames + noisy]
+        if reference is None:
+            reference = masks
+            mismatches = 0
+        else:
+            mismatches = sum(not np.array_equal(a, b) for a, b in zip(masks, reference))
+
+        for label, images in samples.items():
+            times = []
+            for image in images:
+                start = time.perf_counter()
+                detector.create_skin_mask(image)
+                times.append(time.perf_counter() - start)
+            mean = summarize(f"{threads} thread(s) {label:13s}", times)
+            baseline.setdefault(label, mean)
+            print(f"   speedup {baseline[label] / mean:4.2f}x")
+        status = "✅ idênticas" if mismatches == 0 else f"❌ {mismatches} diferentes"
+        print(f"   máscaras vs. serial: {status} ({len(masks)} comparadas)")
+        if mismatches:
+            detector.cleanup()
+            raise SystemExit(f"❌ Máscara em {threads} faixas difere do caminho serial")
+    detector.cleanup()
+
+
+def bench_stream(args):
+    """detect_stream: custo por frame, eventos iguais ao loop direto e descarte por política"""
+    import asyncio
+    import sys
+    from config import Config
+
+    import stream_api
+    print(f"📦 import stream_api: RPi.GPIO importado? {'RPi.GPIO' in sys.modules} | "
+          f"detector importado? {'libras_detector_rpi' in sys.modules}")
+
+    frames = load_frames(args)
+    cfg = Config()
+    cfg.system.ENABLE_LOGGING = False
+
+    # Referência: o loop de run() sem janela (process_frame com interface)
+    detector = make_detector(cfg)
+    letters = []
+    detector.publish_event = lambda kind, **payload: letters.append(
+        payload.get("letter", payload.get("word"))) if kind in ("letter", "word") else None
+    summarize("process_frame (run)", time_frames(detector, frames))
+    detector.cleanup()
+
+    detector = stream_api.make_stream_detector(cfg)
+    times = []
+    events = []
+    start = time.perf_counter()
+    for event in stream_api.detect_stream(frames, detector=detector, drop_policy="block"):
+        if event['kind'] == "frame":
+            now = time.perf_counter()
+            times.append(now - start)
+            start = now
+        else:
+            events.append(event.get("letter", event.get("word")))
+    summarize("detect_stream (block)", times)
+    status = "✅ iguais" if events == letters else f"❌ {events} vs. {letters}"
+    print(f"   letras/palavras vs. loop direto: {status} ({len(events)} eventos)")
+
+    # Fonte ao vivo (ritmo da câmera) e consumidor 3x mais lento que a câmera
+    period = 1.0 / cfg.hardware.CAMERA_FPS
+    count = min(len(frames), 60)
+
+    def live():
+        for frame in frames[:count]:
+            time.sleep(period)
+            yield frame
+
+    async def live_async():
+        for frame in frames[:count]:
+            await asyncio.sleep(period)
+            yield frame
+
+    async def consume_async(policy):
+        result = []
+        async for event in stream_api.detect_stream(live_async(), detector=detector,
+                                                    drop_policy=policy):
+            if event['kind'] == "frame":
+                await asyncio.sleep(3 * period)
+                result.append(event)
+        return result
+
+    print(f"🐢 consumidor lento: fonte a {cfg.hardware.CAMERA_FPS} FPS, "
+          f"{3 * period * 1000:.0f} ms por evento, {count} frames")
+    for policy in stream_api.DROP_POLICIES:
+        processed = []
+        start = time.perf_counter()
+        for event in stream_api.detect_stream(live(), detector=detector, drop_policy=policy):
+            if event['kind'] == "frame":
+                time.sleep(3 * period)
+                processed.append(event)
+        elapsed = time.perf_counter() - start
+        async_processed = asyncio.run(consume_async(policy))
+        print(f"   {policy:12s} processados {len(processed):3d} | descartados "
+              f"{processed[-1]['dropped']:3d} | {elapsed:5.2f} s | assíncrono: "
+              f"{len(async_processed)} processados, {async_processed[-1]['dropped']} descartados")
+    detector.cleanup()
+    print(f"   RPi.GPIO importado ao final? {'RPi.GPIO' in sys.modules}")
+
+
+BENCHMARKS = {
+    "logging": bench_logging,
+    "api": bench_api,
+    "preview": bench_preview,
+    "mqtt": bench_mqtt,
+    "multicam": bench_multicam,
+    "blobs": bench_blobs,
+    "startup": bench_startup,
+    "features": bench_features,
+    "profiler": bench_profiler,
+    "latency": bench_latency,
+    "simplify": bench_simplify,
+    "cache": bench_cache,
+    "session": bench_session,
+    "offload": bench_offload,
+    "realtime": bench_realtime,
+    "tiles": bench_tiles,
+    "stream": bench_stream,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do Detector LIBRAS")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--frames", type=int, default=300, help="Número de frames")
+    parser.add_argument("--video", help="Arquivo de vídeo usado como fonte de frames")
+    parser.add_argument("--clients", type=int, default=4, help="Clientes simultâneos")
+    parser.add_argument("--samples", type=int, default=20000,
+                        help="Amostras sintéticas por processo")
+    parser.add_argument("--activations", type=int, default=20,
+                        help="Acionamentos roteirizados no replay de latência")
+    parser.add_argument("--seconds", type=float, default=5, help="Duração de cada medição")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Workers de visão (0 = um por stream, até o número de CPUs)")
+    args = parser.parse_args()
+
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Canal de comandos não-bloqueante do Detector LIBRAS
+===================================================
+
+Substitui o input() que parava o loop de frames na tecla 'w'. Os comandos
+chegam por uma thread que lê o terminal (stdin) e/ou por um socket Unix
+local; cada linha vira um comando na fila do detector, aplicada entre
+frames. A detecção continua enquanto uma palavra está sendo digitada.
+
+Comandos (um por linha):
+    w <PALAVRA>      muda a palavra alvo            (word)
+    p <N|PALAVRA>    usa uma palavra de WordConfig.PREDEFINED_WORDS
+    n                próxima palavra pré-definida   (next)
+    r                limpa sequência e buffer       (reset)
+    s                para o motor                   (stop)
+    prof on|off      liga/desliga o profiler        (profile)
+    ?                lista os comandos              (help)
+
+Exemplo com o socket:
+    echo "w OLA" | socat - UNIX-CONNECT:~/libras_detector/comandos.sock
+"""
+
+import logging
+import os
+import socket
+import sys
+import threading
+
+from event_log import get_logger, log_event
+
+logger = get_logger("commands")
+
+HELP = ("Comandos: w <PALAVRA> | p <N|PALAVRA> | n (próxima) | "
+        "r (reset) | s (parar motor) | prof on|off | ? (ajuda)")
+
+ALIASES = {
+    "w": "word", "word": "word",
+    "p": "use", "use": "use",
+    "n": "next", "next": "next",
+    "r": "reset", "reset": "reset",
+    "s": "stop", "stop": "stop",
+    "prof": "profile", "profile": "profile",
+    "?": "help", "h": "help", "help": "help",
+}
+
+
+def parse_command(line, predefined_words):
+    """
+    Converte uma linha em (comando, argumentos) para submit_command.
+    Retorna None para 'help' e linhas vazias; ValueError se inválida.
+    """
+    parts = line.strip().split(None, 1)
+    if not parts:
+        return None
+    verb = ALIASES.get(parts[0].lower())
+    argument = parts[1].strip() if len(parts) > 1 else ""
+
+    if verb is None:
+        raise ValueError(f"comando desconhecido: {parts[0]}")
+    if verb == "help":
+        return None
+    if verb == "word":
+        if not argument:
+            raise ValueError("informe a palavra: w <PALAVRA>")
+        return "set_word", {"word": argument}
+    if verb == "use":
+        if argument.isdigit():
+            index = int(argument)
+        elif argument.upper() in predefined_words:
+            index = predefined_words.index(argument.upper())
+        else:
+            raise ValueError(f"palavra pré-definida inválida: {argument or '?'}")
+        if not 0 <= index < len(predefined_words):
+            raise ValueError(f"índice fora da lista (0-{len(predefined_words) - 1})")
+        return "use_word", {"index": index}
+    if verb == "next":
+        return "use_word", {}
+    if verb == "reset":
+        return "reset", {}
+    if verb == "profile":
+        actions = {"on": "start", "off": "stop"}
+        if argument.lower() not in actions:
+            raise ValueError("use: prof on | prof off")
+        return "profile", {"action": actions[argument.lower()]}
+    return "stop_motor", {}
+
+
+class CommandChannel:
+    """Recebe comandos do terminal e/ou de um socket Unix em threads próprias"""
+
+    def __init__(self, detector, use_stdin=True, socket_path=None):
+        self.detector = detector
+        self.use_stdin = use_stdin
+        self.socket_path = os.path.expanduser(socket_path) if socket_path else None
+        self.predefined_words = list(detector.config.words.PREDEFINED_WORDS)
+
+        self.server = None
+        self.threads = []
+        self.running = False
+        self.received = 0
+
+    def start(self):
+        self.running = True
+        # Só lê o terminal interativo; stdin redirecionado fica com quem o redirecionou
+        if self.use_stdin and sys.stdin is not None and sys.stdin.isatty():
+            self._spawn(self._read_stdin, "commands-stdin")
+        if self.socket_path:
+            try:
+                self._open_socket()
+                self._spawn(self._accept_loop, "commands-socket")
+                log_event(logger, logging.INFO, f"⌨️ Comandos em {self.socket_path}")
+            except OSError as e:
+                log_event(logger, logging.ERROR, f"❌ Erro ao abrir {self.socket_path}: {e}")
+                self.server = None
+        return self
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        if self.server is not None:
+            # shutdown() acorda o accept() bloqueado
+            try:
+                self.server.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.server.close()
+            self.server = None
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+        # stdin e clientes ficam bloqueados em leitura; são daemon e terminam com o processo
+        for thread in self.threads:
+            if thread.name == "commands-socket":
+                thread.join(timeout=2)
+
+    def handle_line(self, line):
+        """Enfileira o comando da linha; retorna a resposta para o remetente"""
+        try:
+            command = parse_command(line, self.predefined_words)
+        except ValueError as e:
+            return f"erro: {e}"
+        if command is None:
+            return HELP if line.strip() else ""
+        name, kwargs = command
+        self.detector.submit_command(name, **kwargs)
+        self.received += 1
+        return "ok"
+
+    def _spawn(self, target, name):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self.threads = [t for t in self.threads if t.is_alive()] + [thread]
+
+    def _read_stdin(self):
+        print(f"⌨️ {HELP}")
+        while self.running:
+            line = sys.stdin.readline()
+            if not line:
+                break
+            reply = self.handle_line(line)
+            if reply and reply != "ok":
+                print(reply)
+
+    def _open_socket(self):
+        directory = os.path.dirname(self.socket_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        self.server.listen(4)
+
+    def _accept_loop(self):
+        server = self.server
+        while self.running:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                break
+            self._spawn(lambda conn=conn: self._serve_client(conn), "commands-client")
+
+    def _serve_client(self, conn):
+        with conn, conn.makefile("rw", encoding="utf-8", newline="\n") as stream:
+            try:
+                for line in stream:
+                    reply = self.handle_line(line)
+                    if reply:
+                        stream.write(reply + "\n")
+                        stream.flush()
+            except (OSError, UnicodeDecodeError):
+                pass
@@ -28,12 +28,14 @@ class HardwareConfig:
     MOTOR_DEFAULT_STEPS = 1000         # Passos padrão ao ativar
     MOTOR_STEP_DELAY = 0.003          # Delay entre passos (segundos)
     MOTOR_DIRECTION = 1               # 1=horário, -1=anti-horário
+    USE_FAKE_GPIO = False             # GPIO simulado (benchmarks/replay fora da Raspberry Pi)
     
     # Configuração da câmera
     CAMERA_INDEX = 0                  # Índice da câmera (0=primeira câmera)
     CAMERA_WIDTH = 640                # Largura do frame
     CAMERA_HEIGHT = 480               # Altura do frame  
     CAMERA_FPS = 20                   # Frames por segundo
+    CAMERA_SOURCES = []               # Várias fontes (índices ou arquivos) p/ multi_camera.py
     
     # ROI (Region of Interest) - área de detecção na tela
     ROI_X = 200                       # Posição X do ROI
@@ -70,6 +72,15 @@ class DetectionConfig:
     MIN_FINGER_ANGLE = 30             # Ângulo mínimo entre dedos (graus)
     MAX_FINGER_ANGLE = 120            # Ângulo máximo entre dedos (graus)
     MAX_FINGERS = 5                   # Número máximo de dedos detectáveis
+    
+    # Simplificação do contorno antes de hull/defeitos (approxPolyDP)
+    CONTOUR_SIMPLIFY = False          # Liga a simplificação
+    CONTOUR_EPSILON = 0.002           # Tolerância relativa ao perímetro
+    
+    # Cache LRU de geometria/dedos/letra por assinatura do contorno
+    FEATURE_CACHE = False             # Resultado aproximado: ligue após medir (A/B)
+    FEATURE_CACHE_SIZE = 64           # Entradas
+    FEATURE_CACHE_QUANTUM = 2         # Quantização da assinatura (pixels)
 
 
 # ========================================
@@ -249,6 +260,18 @@ class SystemConfig:
     LOG_LEVEL = "INFO"  # DEBUG, INFO, WARNING, ERROR
     MAX_LOG_SIZE = 10 * 1024 * 1024  # 10MB
     LOG_BACKUP_COUNT = 3
+    LOG_QUEUE_SIZE = 10000                   # Registros pendentes antes de descartar
+    LOG_FRAME_EVERY = 30                     # Em DEBUG, registra 1 a cada N frames (0 = nenhum)
+    
+    # Rastreamento de latência gesto → motor
+    ENABLE_LATENCY_TRACE = True              # Marca as etapas de cada frame
+    LATENCY_TRACE_SIZE = 512                 # Registros guardados (buffer circular)
+    
+    # Log binário por frame (session_log.py), legível com NumPy
+    ENABLE_SESSION_LOG = False               # Grava um registro de largura fixa por frame
+    SESSION_LOG_DIR = os.path.join(PROJECT_DIR, "sessions")
+    SESSION_LOG_RECORDS = 100000             # Registros por arquivo antes da rotação
+    SESSION_LOG_FILES = 10                   # Arquivos mantidos
     
     # Performance
     MAX_FPS_LIMIT = 30                       # FPS máximo
@@ -296,7 +319,22 @@ class AdvancedConfig:
     # Otimizações de performance
     USE_MULTITHREADING = True                # Multi-threading
     THREAD_POOL_SIZE = 2                     # Tamanho do pool de threads
+    TILED_SKIN_MASK = False                  # Máscara de pele em THREAD_POOL_SIZE faixas paralelas
+    STREAM_WORKERS = 2                       # Workers de visão compartilhados (multi-câmera)
+    PARALLEL_STARTUP = True                  # Inicializa GPIO, câmera e warm-up em paralelo
     FRAME_SKIP_RATIO = 0                     # Pular frames (0=sem pular)
+    STREAM_DROP_POLICY = "drop_oldest"       # stream_api: block, drop_oldest ou drop_newest
+    STREAM_QUEUE_SIZE = 2                    # stream_api: frames aguardando o detector
+    OPENCV_THREADS = None                    # cv2.setNumThreads (None = padrão do OpenCV)
+    GIL_SWITCH_INTERVAL = None               # sys.setswitchinterval (s); ex. 0.0005 reduz a
+                                             # espera do motor pelo GIL (padrão 0.005)
+    
+    # Afinidade de CPU e prioridade por thread (Linux); None = padrão do sistema
+    VISION_CPUS = None                       # Núcleos do loop de visão, ex. [1, 2, 3]
+    CAPTURE_CPUS = None                      # Núcleos das threads de captura (multi-câmera)
+    MOTOR_CPUS = None                        # Núcleos da thread do motor, ex. [0]
+    MOTOR_RT_PRIORITY = None                 # 1-99: SCHED_FIFO no motor (root/CAP_SYS_NICE)
+    MOTOR_NICE = None                        # Nice do motor se SCHED_FIFO não for usado
     
     # Filtros avançados
     USE_KALMAN_FILTER = False                # Filtro de Kalman
@@ -306,7 +344,13 @@ class AdvancedConfig:
     # Debugging
     SAVE_DEBUG_FRAMES = False                # Salva frames para debug
     DEBUG_FRAME_INTERVAL = 30                # Intervalo para salvar
-    DEBUG_OUTPUT_DIR = os.path.join(PROJECT_DIR, "debug_frames")
+    DEBUG_OUTPUT_DIR = os.path.join(SystemConfig.PROJECT_DIR, "debug_frames")
+    
+    # Profiler por amostragem (SIGUSR1 liga, SIGUSR2 desliga e grava)
+    ENABLE_PROFILER = False                  # Instala os handlers de sinal
+    PROFILER_RATE = 100                      # Amostras por segundo
+    PROFILER_MAX_DEPTH = 64                  # Profundidade máxima da pilha
+    PROFILER_OUTPUT_DIR = os.path.join(SystemConfig.PROJECT_DIR, "profiles")
 
 
 # ========================================
@@ -320,16 +364,40 @@ class NetworkConfig:
     ENABLE_REST_API = False
     API_HOST = "0.0.0.0"
     API_PORT = 8080
+    API_MAX_REQUESTS_PER_SECOND = 50  # Requisições além disso esperam a vez (0 = sem limite)
     
-    # WebSocket (para streaming)
+    # WebSocket / MJPEG (preview remoto do frame anotado)
     ENABLE_WEBSOCKET = False
     WS_PORT = 8081
+    PREVIEW_FPS = 5                   # Codificações JPEG por segundo (máximo)
+    PREVIEW_WIDTH = 320               # Largura do preview (altura proporcional)
+    PREVIEW_JPEG_QUALITY = 70         # Qualidade JPEG (0-100)
     
     # MQTT (para IoT)
     ENABLE_MQTT = False
     MQTT_BROKER = "localhost"
     MQTT_PORT = 1883
     MQTT_TOPIC_BASE = "libras_detector"
+    MQTT_CLIENT_ID = "libras_detector"
+    MQTT_KEEPALIVE = 30               # Segundos
+    MQTT_OUTBOX_SIZE = 256            # Eventos pendentes antes de descartar
+    MQTT_BATCH_INTERVAL = 0.2         # Intervalo entre lotes (segundos)
+    MQTT_METRICS_INTERVAL = 5         # Intervalo das métricas (segundos)
+    MQTT_RECONNECT_MAX = 30           # Backoff máximo de reconexão (segundos)
+    
+    # Canal de comandos local (terminal e socket Unix)
+    ENABLE_STDIN_COMMANDS = True      # Lê comandos do terminal sem bloquear os frames
+    ENABLE_COMMAND_SOCKET = False
+    COMMAND_SOCKET_PATH = os.path.join(SystemConfig.PROJECT_DIR, "comandos.sock")
+    
+    # Visão em um worker da rede local (offload.py); a Pi processa localmente se ele atrasar
+    ENABLE_OFFLOAD = False
+    OFFLOAD_HOST = "192.168.0.10"
+    OFFLOAD_PORT = 5600
+    OFFLOAD_DEADLINE_MS = 40          # Prazo por frame antes do processamento local
+    OFFLOAD_SCALE = 1.0               # Redução da ROI enviada (0.5: 1/4 dos bytes, máscara mais grossa)
+    OFFLOAD_JPEG_QUALITY = 80         # Qualidade JPEG (0-100)
+    OFFLOAD_RECONNECT_MAX = 10        # Backoff máximo de reconexão (segundos)
 
 
 # ========================================
@@ -351,8 +419,11 @@ class Config:
         self.advanced = AdvancedConfig()
         self.network = NetworkConfig()
     
-    def load_from_file(self, config_path=None):
-        """Carrega configurações de arquivo JSON"""
+    def load_from_file(self, config_path=None, report=print):
+        """
+        Carrega configurações de arquivo JSON
+        report: recebe as mensagens (print por padrão; o detector embutido usa o logger)
+        """
         import json
         
         if config_path is None:
@@ -363,13 +434,13 @@ class Config:
                 with open(config_path, 'r', encoding='utf-8') as f:
                     user_config = json.load(f)
                     self._apply_user_config(user_config)
-                    print(f" Configurações carregadas de: {config_path}")
+                    report(f" Configurações carregadas de: {config_path}")
             else:
-                print(f" Arquivo de configuração não encontrado: {config_path}")
-                print(" Usando configurações padrão")
+                report(f" Arquivo de configuração não encontrado: {config_path}")
+                report(" Usando configurações padrão")
         except Exception as e:
-            print(f" Erro ao carregar configurações: {e}")
-            print(" Usando configurações padrão")
+            report(f" Erro ao carregar configurações: {e}")
+            report(" Usando configurações padrão")
     
     def save_to_file(self, config_path=None):
         """Salva configurações atuais em arquivo JSON"""
@@ -471,6 +542,12 @@ class Config:
         if not 0 <= self.stabilization.CONFIDENCE_THRESHOLD <= 1:
             errors.append("Threshold de confiança deve estar entre 0 e 1")
         
+        if self.network.API_MAX_REQUESTS_PER_SECOND < 0:
+            errors.append("API_MAX_REQUESTS_PER_SECOND não pode ser negativo (0 = sem limite)")
+        
+        if self.advanced.STREAM_DROP_POLICY not in ("block", "drop_oldest", "drop_newest"):
+            errors.append("STREAM_DROP_POLICY deve ser block, drop_oldest ou drop_newest")
+        
         # Warnings para performance
         if self.hardware.CAMERA_WIDTH * self.hardware.CAMERA_HEIGHT > 640 * 480:
             warnings.append("Resolução alta pode impactar performance na RPi 3B+")
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Afinidade de CPU e prioridade por thread
+========================================
+
+Na Pi 3B+ o loop de visão, as threads internas do OpenCV, a captura e a
+thread do motor disputam os mesmos quatro núcleos; um passo do motor que
+atrasa vira tranco no stepper. apply_thread_policy() é chamada pela
+própria thread no início (loop de visão, captura, motor) e:
+
+    - fixa a thread em um conjunto de núcleos (sched_setaffinity);
+    - opcionalmente usa SCHED_FIFO com a prioridade dada (requer root ou
+      CAP_SYS_NICE); sem permissão, cai para o nice, se configurado;
+    - opcionalmente ajusta o nice da thread.
+
+set_switch_interval() encurta a espera da thread do motor pelo GIL
+enquanto a visão roda código Python (efeito medido com benchmark.py
+realtime; varia com a carga).
+
+Threads criadas depois herdam a afinidade de quem as criou: fixar o loop
+de visão também confina o pool interno do OpenCV, deixando o núcleo do
+motor livre. Fora do Linux as chamadas não existem e nada é alterado.
+"""
+
+import logging
+import os
+import threading
+
+from event_log import get_logger, log_event
+
+logger = get_logger("cpu_policy")
+
+# Papéis já avisados (a thread do motor é recriada a cada acionamento)
+_warned = set()
+
+
+def _warn(role, message):
+    if role not in _warned:
+        _warned.add(role)
+        log_event(logger, logging.WARNING, f"⚠️ {role}: {message}")
+
+
+def available_cpus():
+    """Núcleos em que o processo pode rodar"""
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        return list(range(os.cpu_count() or 1))
+
+
+def apply_thread_policy(role, cpus=None, fifo_priority=None, nice=None):
+    """
+    Aplica afinidade e prioridade à thread que chama.
+    Retorna o que foi efetivamente aplicado: {'cpus', 'fifo', 'nice'}.
+    """
+    applied = {}
+    if cpus:
+        try:
+            os.sched_setaffinity(0, cpus)
+            applied['cpus'] = sorted(os.sched_getaffinity(0))
+        except (AttributeError, OSError, ValueError) as e:
+            _warn(role, f"afinidade {list(cpus)} não aplicada ({e})")
+
+    if fifo_priority:
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(fifo_priority))
+            applied['fifo'] = fifo_priority
+        except (AttributeError, OSError) as e:
+            _warn(role, f"SCHED_FIFO {fifo_priority} não aplicado ({e})")
+
+    if nice is not None and 'fifo' not in applied:
+        try:
+            # No Linux, setpriority com o TID altera só a thread
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), nice)
+            applied['nice'] = nice
+        except (AttributeError, OSError) as e:
+            _warn(role, f"nice {nice} não aplicado ({e})")
+
+    if applied and role not in _warned:
+        log_event(logger, logging.DEBUG, f"Política da thread {role}: {applied}")
+    return applied
+
+
+def set_switch_interval(seconds):
+    """
+    Intervalo de troca do GIL (None mantém o padrão de 5 ms). A thread do
+    motor, ao acordar do sleep, pode esperar até esse intervalo pelo GIL
+    enquanto a visão roda código Python; prioridade do SO não evita isso.
+    """
+    if seconds is None:
+        return
+    import sys
+
+    sys.setswitchinterval(seconds)
+
+
+def set_opencv_threads(count):
+    """Limita o pool interno do OpenCV (None mantém o padrão)"""
+    if count is None:
+        return
+    import cv2
+
+    cv2.setNumThreads(int(count))
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Logging estruturado e não-bloqueante do Detector LIBRAS
+=======================================================
+
+As threads de detecção e do motor apenas enfileiram registros; um único
+listener em background formata e grava no terminal e no arquivo rotativo
+definido em SystemConfig. Assim um terminal lento ou um cartão SD ocupado
+nunca seguram um frame.
+
+Cada evento carrega campos estruturados (frame, letra, confiança, ação do
+motor) que vão para o arquivo como uma linha JSON.
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+
+LOGGER_NAME = "libras"
+
+# Campos estruturados aceitos em log_event()
+EVENT_FIELDS = ('stream', 'frame', 'letter', 'confidence', 'motor', 'sequence', 'word')
+
+# Evita o "lastResort" síncrono do logging quando nada foi configurado
+logging.getLogger(LOGGER_NAME).addHandler(logging.NullHandler())
+
+_listener = None
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que descarta registros quando a fila está cheia"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Registros ficam no mesmo processo: a formatação é feita pelo listener
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formata registros como uma linha JSON por evento"""
+
+    def format(self, record):
+        payload = {
+            'ts': round(record.created, 6),
+            'level': record.levelname,
+            'thread': record.threadName,
+            'event': record.getMessage(),
+        }
+        for field in EVENT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                payload[field] = value
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+def setup_logging(system_config):
+    """
+    Configura o logger do detector a partir de SystemConfig.
+    Retorna o QueueListener ativo (ou None se o logging estiver desligado).
+    """
+    global _listener
+
+    root = logging.getLogger(LOGGER_NAME)
+    if _listener is not None:
+        return _listener
+
+    if not system_config.ENABLE_LOGGING:
+        root.setLevel(logging.CRITICAL + 1)
+        return None
+
+    handlers = []
+
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter("%(message)s"))
+    console.setLevel(logging.INFO)
+    handlers.append(console)
+
+    try:
+        os.makedirs(os.path.dirname(system_config.LOG_FILE), exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            system_config.LOG_FILE,
+            maxBytes=system_config.MAX_LOG_SIZE,
+            backupCount=system_config.LOG_BACKUP_COUNT,
+            encoding='utf-8'
+        )
+        file_handler.setFormatter(StructuredFormatter())
+        handlers.append(file_handler)
+    except OSError as e:
+        print(f"⚠️ Log em arquivo desativado: {e}")
+
+    log_queue = queue.Queue(maxsize=system_config.LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+
+    root.setLevel(getattr(logging, str(system_config.LOG_LEVEL).upper(), logging.INFO))
+    root.addHandler(queue_handler)
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers,
+                                               respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Esvazia a fila e para o listener em background"""
+    global _listener
+
+    if _listener is None:
+        return
+    _listener.stop()
+    root = logging.getLogger(LOGGER_NAME)
+    for handler in list(root.handlers):
+        if isinstance(handler, DroppingQueueHandler):
+            root.removeHandler(handler)
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+def get_logger(name=None):
+    """Retorna um logger filho do logger do detector"""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}" if name else LOGGER_NAME)
+
+
+def log_event(logger, level, event, **fields):
+    """Registra um evento estruturado; custo mínimo quando o nível está desligado"""
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra=fields)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Cache LRU de features de contorno
+=================================
+
+Com o sinal parado, frames consecutivos produzem contornos quase iguais e
+geometria, dedos e letra são recalculados do zero. FeatureCache guarda o
+resultado de describe_hand() indexado por uma assinatura barata do
+contorno: momentos até a segunda ordem (área, centro, dispersões) e o
+perímetro, quantizados em QUANTUM pixels. Contornos que diferem menos que
+o quantum caem na mesma chave e reaproveitam o resultado.
+
+A assinatura custa um cv2.moments e um cv2.arcLength (O(N) em C); o
+cálculo evitado inclui o laço Python sobre os defeitos de convexidade.
+
+O resultado também depende da configuração (simplificação e limites de
+classificação): lookup() recebe essas configurações e esvazia o cache
+quando elas mudam. Quem chama recebe cópias da geometria e dos pontos,
+então alterá-las não altera o cache.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+
+
+def contour_signature(contour, quantum=2.0):
+    """Assinatura quantizada: (centro, dispersões, raiz da área, perímetro)"""
+    M = cv2.moments(contour)
+    area = M["m00"]
+    if area <= 0:
+        return None
+    cx = M["m10"] / area
+    cy = M["m01"] / area
+    # Desvios padrão e covariância normalizada (pixels)
+    sx = math.sqrt(max(M["mu20"] / area, 0.0))
+    sy = math.sqrt(max(M["mu02"] / area, 0.0))
+    sxy = M["mu11"] / area / max(sx * sy, 1e-6)
+    perimeter = cv2.arcLength(contour, True)
+    q = float(quantum)
+    return (int(cx // q), int(cy // q), int(sx // q), int(sy // q), int(sxy * 20),
+            int(math.sqrt(area) // q), int(perimeter // (4 * q)))
+
+
+def _copy_features(value):
+    """Cópia de (geometry, finger_count, letra, pontos) que não compartilha listas/dicts"""
+    geometry, finger_count, letter, points = value
+    return dict(geometry), finger_count, letter, list(points)
+
+
+class FeatureCache:
+    """LRU limitado de (geometry, finger_count, letra, pontos de defeito)"""
+
+    def __init__(self, size=64, quantum=2.0):
+        self.size = size
+        self.quantum = quantum
+        self._entries = OrderedDict()
+        self._settings = None
+        # Compartilhado entre os workers de visão (multi-câmera)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.miss_time = 0.0
+        self.hit_time = 0.0
+
+    def lookup(self, contour, compute, settings=None):
+        """
+        Retorna o resultado em cache para o contorno ou chama compute(),
+        guarda e retorna o resultado.
+        settings: configurações de que o resultado depende; se mudarem
+        desde a última chamada, o cache é esvaziado.
+        """
+        start = time.perf_counter()
+        key = contour_signature(contour, self.quantum)
+        if key is not None:
+            with self._lock:
+                if settings != self._settings:
+                    self._entries.clear()
+                    self._settings = settings
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    self.hit_time += time.perf_counter() - start
+                    return _copy_features(value)
+
+        value = compute()
+        if key is not None:
+            with self._lock:
+                self._entries[key] = value
+                if len(self._entries) > self.size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        self.misses += 1
+        self.miss_time += time.perf_counter() - start
+        return _copy_features(value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """Taxa de acerto, evicções e tempo economizado estimado"""
+        lookups = self.hits + self.misses
+        mean_miss = self.miss_time / self.misses if self.misses else 0.0
+        mean_hit = self.hit_time / self.hits if self.hits else 0.0
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'saved_ms': self.hits * max(mean_miss - mean_hit, 0.0) * 1000,
+        }
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Silhuetas sintéticas de mão para testes de vazão
+================================================
+
+Gera máscaras binárias do tamanho do ROI com formas parametrizadas de mão
+(palma + N dedos em ângulos dados, punho fechado, formatos de C e O) e o
+contorno correspondente, com a contagem de dedos esperada na definição do
+detector (vales entre dedos + 1: punho e O contam 1). Permite medir
+analyze_hand_geometry, count_extended_fingers e classify_libras_letter sem
+ninguém na frente da câmera.
+
+A geração é preguiçosa e reproduzível: iter_samples(count, seed, start)
+sempre produz as mesmas amostras para o mesmo (seed, start), então milhões
+de amostras podem ser divididas em fatias entre processos sem guardar nada
+em disco.
+
+Uso:
+    python3 hand_synth.py --count 48 --out amostras.png   # folha de contato
+"""
+
+import argparse
+import math
+
+import cv2
+import numpy as np
+
+# Formas e sua frequência relativa no corpus
+SHAPES = ("open", "open", "open", "fist", "c", "o")
+
+ROI_SIZE = 300
+
+
+def random_spec(rng, size=ROI_SIZE):
+    """Sorteia os parâmetros de uma silhueta"""
+    shape = SHAPES[rng.integers(len(SHAPES))]
+    spec = {
+        'shape': shape,
+        'size': size,
+        'center': (int(size / 2 + rng.integers(-20, 21)),
+                   int(size * 0.62 + rng.integers(-15, 16))),
+        'rotation': float(rng.uniform(-25, 25)),
+        'palm': int(rng.integers(50, 70)),
+    }
+
+    if shape == "open":
+        fingers = int(rng.integers(1, 6))
+        spread = 0.0 if fingers == 1 else float(rng.uniform(60, 140))
+        spec['fingers'] = fingers
+        spec['angles'] = [
+            -90 + spread * (k / (fingers - 1) - 0.5 if fingers > 1 else 0)
+            + float(rng.uniform(-6, 6))
+            for k in range(fingers)
+        ]
+        spec['length'] = int(rng.integers(95, 125))
+        spec['thickness'] = int(rng.integers(16, 24))
+        spec['expected_fingers'] = fingers
+    elif shape == "fist":
+        spec['axes'] = (spec['palm'] + int(rng.integers(5, 20)),
+                        spec['palm'] + int(rng.integers(15, 35)))
+        # Sem vales entre dedos: o detector conta 1 (defeitos + 1), nunca 0
+        spec['expected_fingers'] = 1
+    elif shape == "c":
+        # Abertura do C voltada para a direita, duas pontas (polegar e dedos)
+        spec['opening'] = float(rng.uniform(70, 120))
+        spec['thickness'] = int(rng.integers(28, 40))
+        spec['expected_fingers'] = 2
+    else:
+        # O: anel fechado; o contorno externo é um disco (1, como o punho)
+        spec['thickness'] = int(rng.integers(28, 40))
+        spec['expected_fingers'] = 1
+    return spec
+
+
+def render_mask(spec):
+    """Desenha a silhueta descrita por spec em uma máscara uint8 (0/255)"""
+    size = spec['size']
+    mask = np.zeros((size, size), dtype=np.uint8)
+    cx, cy = spec['center']
+    palm = spec['palm']
+    rotation = spec['rotation']
+    shape = spec['shape']
+
+    if shape == "open":
+        cv2.circle(mask, (cx, cy), palm, 255, -1)
+        for angle in spec['angles']:
+            theta = math.radians(angle + rotation)
+            base = (int(cx + palm * 0.6 * math.cos(theta)),
+                    int(cy + palm * 0.6 * math.sin(theta)))
+            tip = (int(cx + (palm + spec['length']) * math.cos(theta)),
+                   int(cy + (palm + spec['length']) * math.sin(theta)))
+            cv2.line(mask, base, tip, 255, spec['thickness'])
+            cv2.circle(mask, tip, spec['thickness'] // 2, 255, -1)
+    elif shape == "fist":
+        cv2.ellipse(mask, (cx, cy), spec['axes'], rotation, 0, 360, 255, -1)
+        # Polegar recolhido sobre o punho
+        cv2.ellipse(mask, (cx - spec['axes'][0] // 2, cy), (palm // 3, palm // 2),
+                    rotation, 0, 360, 255, -1)
+    elif shape == "c":
+        half = spec['opening'] / 2
+        radius = palm + 35
+        cv2.ellipse(mask, (cx, cy - 30), (radius, radius), rotation, half, 360 - half,
+                    255, spec['thickness'])
+    else:
+        radius = palm + 30
+        cv2.ellipse(mask, (cx, cy - 30), (radius, radius), rotation, 0, 360,
+                    255, spec['thickness'])
+    return mask
+
+
+def largest_contour(mask):
+    """Maior contorno externo da máscara (ou None)"""
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+    return max(contours, key=cv2.contourArea)
+
+
+def iter_samples(count, seed=0, start=0, size=ROI_SIZE, with_mask=False):
+    """
+    Gera 'count' amostras {'spec', 'contour', 'expected_fingers'[, 'mask']}.
+    A fatia (seed, start) é reproduzível, independente das demais.
+    """
+    rng = np.random.default_rng([seed, start])
+    for _ in range(count):
+        spec = random_spec(rng, size)
+        mask = render_mask(spec)
+        sample = {
+            'spec': spec,
+            'contour': largest_contour(mask),
+            'expected_fingers': spec['expected_fingers'],
+        }
+        if with_mask:
+            sample['mask'] = mask
+        yield sample
+
+
+def contact_sheet(samples, columns=8):
+    """Monta uma imagem com as máscaras e a contagem esperada de cada uma"""
+    tiles = []
+    for sample in samples:
+        tile = cv2.cvtColor(sample['mask'], cv2.COLOR_GRAY2BGR)
+        label = f"{sample['spec']['shape']} {sample['expected_fingers']}"
+        cv2.putText(tile, label, (8, 24), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+        tiles.append(tile)
+    while len(tiles) % columns:
+        tiles.append(np.zeros_like(tiles[0]))
+    rows = [np.hstack(tiles[i:i + columns]) for i in range(0, len(tiles), columns)]
+    return np.vstack(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Silhuetas sintéticas de mão")
+    parser.add_argument("--count", type=int, default=48, help="Número de amostras")
+    parser.add_argument("--seed", type=int, default=0, help="Semente do gerador")
+    parser.add_argument("--out", default="amostras.png", help="Folha de contato (PNG)")
+    args = parser.parse_args()
+
+    sheet = contact_sheet(list(iter_samples(args.count, args.seed, with_mask=True)))
+    cv2.imwrite(args.out, sheet)
+    print(f"✅ {args.count} amostras em {args.out}")
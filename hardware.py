@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Acesso ao GPIO do Detector LIBRAS
+=================================
+
+RPi.GPIO só é importado quando o hardware real é usado, e a importação
+acontece na thread de inicialização do detector, em paralelo com a
+abertura da câmera. FakeGPIO permite rodar o detector (benchmarks, replay
+de vídeos) fora da Raspberry Pi.
+"""
+
+
+class FakeGPIO:
+    """Substituto do módulo RPi.GPIO que apenas registra o estado dos pinos"""
+
+    BCM = 11
+    BOARD = 10
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+
+    def __init__(self):
+        self.mode = None
+        self.pins = {}
+        self.writes = 0
+
+    def setmode(self, mode):
+        self.mode = mode
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, pin, direction):
+        self.pins[pin] = self.LOW
+
+    def output(self, pin, value):
+        self.pins[pin] = value
+        self.writes += 1
+
+    def cleanup(self):
+        self.pins.clear()
+
+
+def load_gpio(use_fake=False):
+    """Retorna o módulo RPi.GPIO ou um FakeGPIO (sem importar RPi.GPIO)"""
+    if use_fake:
+        return FakeGPIO()
+
+    import RPi.GPIO as GPIO
+    return GPIO
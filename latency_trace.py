@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Rastreamento de latência gesto → motor
+======================================
+
+Cada frame ganha um trace com o instante de captura; as etapas seguintes
+marcam seus instantes no mesmo trace. Quando a votação confirma uma letra,
+o trace recebe também a captura do primeiro frame dessa letra na janela de
+votação ('vote'), então vote→capture mede o atraso da estabilização:
+
+    vote         captura do primeiro frame da letra confirmada
+    capture      frame lido da câmera (o que completou a votação)
+    vision       máscara, contorno, geometria e classificação prontos
+    letter       letra confirmada pela votação (update_letter_sequence)
+    word         palavra alvo formada (check_target_word)
+    dispatch     thread do motor disparada (activate_motor)
+    first_step   primeiro passo do motor (thread do motor)
+
+Cada letra confirmada e cada acionamento viram um registro com a duração
+dos segmentos entre etapas consecutivas, guardado em um buffer circular.
+get_distributions() resume os segmentos (média, p50, p95, máximo).
+"""
+
+import threading
+import time
+from collections import deque
+
+STAGES = ('vote', 'capture', 'vision', 'letter', 'word', 'dispatch', 'first_step')
+
+
+def segments(trace):
+    """
+    Durações (s) entre etapas consecutivas presentes no trace, mais o total
+    e, com 'vote' presente, o total a partir da captura (custo do pipeline)
+    """
+    marks = [(stage, trace[stage]) for stage in STAGES if stage in trace]
+    spans = {}
+    for (start, t0), (end, t1) in zip(marks, marks[1:]):
+        spans[f"{start}→{end}"] = t1 - t0
+    for first, t0 in marks[:2]:
+        if first in ('vote', 'capture') and marks[-1][0] not in (first, 'capture'):
+            spans[f"{first}→{marks[-1][0]}"] = marks[-1][1] - t0
+    return spans
+
+
+class LatencyTracer:
+    """Registros de letras e acionamentos em buffers circulares"""
+
+    def __init__(self, size=512):
+        self.letters = deque(maxlen=size)
+        self.activations = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def begin(frame, capture_time=None):
+        """Cria o trace de um frame (capture_time em time.perf_counter())"""
+        return {'frame': frame,
+                'capture': capture_time if capture_time is not None else time.perf_counter()}
+
+    @staticmethod
+    def mark(trace, stage):
+        if trace is not None:
+            trace[stage] = time.perf_counter()
+
+    def record_letter(self, trace, letter, stream=None):
+        if trace is None:
+            return
+        self.mark(trace, 'letter')
+        with self._lock:
+            self.letters.append({'letter': letter, 'frame': trace['frame'], 'stream': stream,
+                                 'spans': segments(trace)})
+
+    def record_activation(self, trace, word=None, stream=None):
+        """Chamado pela thread do motor no primeiro passo"""
+        if trace is None:
+            return
+        self.mark(trace, 'first_step')
+        with self._lock:
+            self.activations.append({'word': word, 'frame': trace['frame'], 'stream': stream,
+                                     'spans': segments(trace)})
+
+    def get_distributions(self):
+        """{'letters'|'activations': {segmento: {count, mean_ms, p50_ms, p95_ms, max_ms}}}"""
+        with self._lock:
+            records = {'letters': list(self.letters), 'activations': list(self.activations)}
+
+        result = {}
+        for kind, entries in records.items():
+            values = {}
+            for entry in entries:
+                for name, duration in entry['spans'].items():
+                    values.setdefault(name, []).append(duration)
+            result[kind] = {name: summarize(durations) for name, durations in values.items()}
+        return result
+
+
+def summarize(durations):
+    ordered = sorted(durations)
+    n = len(ordered)
+    return {
+        'count': n,
+        'mean_ms': sum(ordered) / n * 1000,
+        'p50_ms': ordered[n // 2] * 1000,
+        'p95_ms': ordered[min(n - 1, int(n * 0.95))] * 1000,
+        'max_ms': ordered[-1] * 1000,
+    }
@@ -1,25 +1,84 @@
-import cv2
 import time
+
+# Referência das métricas de inicialização (antes das importações pesadas)
+_STARTUP_T0 = time.perf_counter()
+
+import cv2
 import numpy as np
 from collections import deque
-import math
-import RPi.GPIO as GPIO
+import logging
 import threading
 
-class LibrasDetectorRPi:
-    def __init__(self, motor_pins=[18, 19, 20, 21]):
-        """
-        Inicializa o detector LIBRAS para Raspberry Pi 3B+
-        motor_pins: Lista com os pinos GPIO para controle do motor stepper
-        """
-        # Configuração GPIO
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setwarnings(False)
+from config import config
+from event_log import setup_logging, shutdown_logging, get_logger, log_event
+from hardware import load_gpio
+from latency_trace import LatencyTracer
+from feature_cache import FeatureCache
+from session_log import SessionLog, MOTOR_RUNNING, MOTOR_ACTIVATED
+from cpu_policy import apply_thread_policy, set_opencv_threads, set_switch_interval
+from tiled_mask import TiledSegmenter, mask_halo
+
+_IMPORTS_DONE = time.perf_counter()
+
+# Tempo máximo de espera pela inicialização do GPIO em background
+GPIO_INIT_TIMEOUT = 10
+
+logger = get_logger("detector")
+
+
+class StreamState:
+    """
+    Estado de uma fonte de vídeo (câmera ou arquivo): ROI, buffer de gestos,
+    sequência de letras e palavra alvo. Recursos compartilhados (motor,
+    publicadores, workers) ficam no LibrasDetectorRPi.
+    """
+    
+    def __init__(self, name="camera0", target_word="UAU", roi=(200, 60, 300, 300),
+                 letter_history=10, buffer_size=20, index=0):
+        self.name = name
+        self.index = index
+        self.roi = roi
         
-        # Configuração do motor stepper
-        self.motor_pins = motor_pins
-        for pin in self.motor_pins:
-            GPIO.setup(pin, GPIO.OUT)
+        # Sistema de reconhecimento de sequências
+        self.detected_letters = deque(maxlen=letter_history)
+        self.target_word = target_word
+        self.last_gesture = ""
+        
+        # Buffer para estabilização
+        self.gesture_buffer = deque(maxlen=buffer_size)
+        # Instante de captura de cada gesto do buffer (início da votação no trace)
+        self.gesture_times = deque(maxlen=buffer_size)
+        
+        # Estado da palavra/ativação deste stream
+        self.motor_activated = False
+        self.last_activation_time = 0
+        
+        # Contadores por frame (usados nos eventos estruturados)
+        self.frame_count = 0
+        self.last_confidence = 0.0
+        # Área, geometria e dedos da mão no último frame (None sem mão)
+        self.last_features = None
+        
+        # Fila de comandos externos (API, teclado...), esvaziada uma vez por frame.
+        # deque.append/popleft são atômicos: produtores nunca bloqueiam o loop.
+        self.commands = deque()
+        
+        # Snapshot de status publicado a cada frame (lido por outras threads)
+        self.fps = 0.0
+        self.last_frame_time = None
+        self.status = {}
+        
+        # Trace de latência do frame em processamento (None se desligado)
+        self.trace = None
+
+
+class MotorController:
+    """Motor stepper compartilhado entre todos os streams"""
+    
+    def __init__(self, pins, gpio=None):
+        self.pins = pins
+        self.gpio = None
+        self.ready = threading.Event()
         
         # Sequência de passos para motor stepper (modo half-step para maior precisão)
         self.step_sequence = [
@@ -34,101 +93,479 @@ class LibrasDetectorRPi:
         ]
         
         self.current_step = 0
-        self.motor_running = False
+        self.running = False
+        self._lock = threading.Lock()
+        # off() pedido antes do GPIO ficar pronto (aplicado por attach)
+        self.pending_off = False
+        
+        # Chamado no início da thread do motor (afinidade/prioridade)
+        self.thread_setup = None
+        
+        if gpio is not None:
+            self.attach(gpio)
+    
+    def attach(self, gpio):
+        """
+        Configura os pinos no GPIO (pode rodar na thread de inicialização).
+        Os pinos começam em LOW, o que também cumpre um off() pendente.
+        """
+        for pin in self.pins:
+            gpio.setup(pin, gpio.OUT)
+            gpio.output(pin, gpio.LOW)
+        with self._lock:
+            self.gpio = gpio
+            self.pending_off = False
+        self.ready.set()
+    
+    def off(self):
+        """Desliga todos os pinos do motor (sem esperar a inicialização do GPIO)"""
+        with self._lock:
+            if self.gpio is None:
+                # Chamado da thread de frames (stop_motor): não espera o GPIO
+                self.pending_off = True
+                return
+        for pin in self.pins:
+            self.gpio.output(pin, self.gpio.LOW)
+    
+    def step(self, direction=1):
+        """Executa um passo do motor"""
+        if direction == 1:
+            self.current_step = (self.current_step + 1) % len(self.step_sequence)
+        else:
+            self.current_step = (self.current_step - 1) % len(self.step_sequence)
+        
+        step = self.step_sequence[self.current_step]
+        for i, pin in enumerate(self.pins):
+            self.gpio.output(pin, step[i])
+    
+    def run_sequence(self, steps, delay, direction=1, on_start=None, on_stop=None,
+                     on_first_step=None):
+        """
+        Executa sequência em thread separada.
+        Retorna False se o motor já estiver rodando (acionamento ignorado).
+        """
+        with self._lock:
+            if self.running:
+                return False
+            self.running = True
+        
+        def run_motor():
+            if self.thread_setup is not None:
+                self.thread_setup()
+            if not self.ready.wait(GPIO_INIT_TIMEOUT):
+                self.running = False
+                return
+            if on_start is not None:
+                on_start(steps)
+            
+            for i in range(steps):
+                if not self.running:  # Permite parar o motor
+                    break
+                self.step(direction)
+                if i == 0 and on_first_step is not None:
+                    on_first_step()
+                time.sleep(delay)
+            
+            self.off()
+            self.running = False
+            if on_stop is not None:
+                on_stop()
+        
+        # Executa em thread separada para não bloquear a detecção
+        motor_thread = threading.Thread(target=run_motor, name="motor")
+        motor_thread.daemon = True
+        motor_thread.start()
+        return True
+    
+    def stop(self):
+        """Interrompe a sequência em andamento e desliga as bobinas"""
+        self.running = False
+        self.off()
+
+
+class _StreamAttribute:
+    """Expõe um atributo do stream padrão como atributo do detector"""
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return getattr(obj.stream, self.name)
+    
+    def __set__(self, obj, value):
+        setattr(obj.stream, self.name, value)
+
+
+class LibrasDetectorRPi:
+    # Estado do stream padrão (compatível com o detector de câmera única)
+    roi = _StreamAttribute()
+    detected_letters = _StreamAttribute()
+    target_word = _StreamAttribute()
+    last_gesture = _StreamAttribute()
+    gesture_buffer = _StreamAttribute()
+    motor_activated = _StreamAttribute()
+    last_activation_time = _StreamAttribute()
+    frame_count = _StreamAttribute()
+    last_confidence = _StreamAttribute()
+    commands = _StreamAttribute()
+    fps = _StreamAttribute()
+    status = _StreamAttribute()
+    
+    def __init__(self, motor_pins=[18, 19, 20, 21], cfg=None, configure_logging=True):
+        """
+        Inicializa o detector LIBRAS para Raspberry Pi 3B+
+        motor_pins: Lista com os pinos GPIO para controle do motor stepper
+        cfg: Instância de Config (usa a configuração global se None)
+        configure_logging: False deixa o logger "libras" como está (detector
+            embutido: handlers e nível ficam a cargo da aplicação)
+        """
+        self.config = cfg if cfg is not None else config
+        
+        # Métricas de inicialização (segundos desde a importação do módulo)
+        self.startup_metrics = {'imports': _IMPORTS_DONE - _STARTUP_T0}
+        
+        # Logging em background (fila + arquivo rotativo)
+        self.log_listener = setup_logging(self.config.system) if configure_logging else None
+        
+        # Configuração do motor stepper (compartilhado entre streams).
+        # O GPIO é importado e configurado em paralelo com câmera e warm-up.
+        self.motor_pins = motor_pins
+        self.motor = MotorController(motor_pins)
+        self.motor.thread_setup = lambda: self.apply_thread_policy("motor")
+        self.gpio = None
+        self._hardware_error = None
+        self._hardware_thread = None
+        if self.config.advanced.PARALLEL_STARTUP:
+            self._hardware_thread = threading.Thread(target=self.init_hardware,
+                                                     name="gpio-init", daemon=True)
+            self._hardware_thread.start()
+        else:
+            self.init_hardware()
+            self.wait_hardware()
         
         # Parâmetros de detecção
         self.min_area = 8000
         self.max_area = 50000
+        self.prepare_pipeline()
         
-        # Sistema de reconhecimento de sequências
-        self.detected_letters = deque(maxlen=10)
-        self.target_word = "UAU"
-        self.last_gesture = ""
+        # Cache de geometria/dedos/letra para contornos quase iguais
+        self.feature_cache = FeatureCache(self.config.detection.FEATURE_CACHE_SIZE,
+                                          self.config.detection.FEATURE_CACHE_QUANTUM)
         self.gesture_count = 0
         self.stability_threshold = 15
         
-        # Buffer para estabilização
-        self.gesture_buffer = deque(maxlen=20)
-        
         # Estado do sistema
-        self.motor_activated = False
-        self.last_activation_time = 0
         self.activation_cooldown = 5
+        # Relógio do cooldown (transcrição em lote usa o tempo do vídeo)
+        self.clock = time.time
+        
+        # Stream padrão (câmera única); MultiStreamDetector cria outros
+        self._next_stream_index = 0
+        self.stream = self.create_stream("camera0")
+        
+        self.command_handlers = {
+            "set_word": self.set_target_word,
+            "reset": self.reset_state,
+            "stop_motor": self.stop_motor,
+            "use_word": self.use_predefined_word,
+            "profile": self.toggle_profiler,
+            "trigger_motor": self.activate_motor,
+        }
         
-        # Inicializa motor parado
-        self.motor_off()
+        # Serviços de rede opcionais (NetworkConfig)
+        self.api_server = None
+        self.preview_server = None
+        self.event_publisher = None
+        self.command_channel = None
+        self.profiler = None
+        self.offload = None
         
-        print("=== DETECTOR LIBRAS RASPBERRY PI 3B+ INICIALIZADO ===")
-        print(f"✓ Pinos do motor: {self.motor_pins}")
-        print(f"✓ Palavra alvo: '{self.target_word}'")
-        print("✓ Detecção por análise de contornos e geometria da mão")
+        # Latência gesto → motor por etapa (buffer circular)
+        self.tracer = LatencyTracer(self.config.system.LATENCY_TRACE_SIZE)
+        
+        # Registro binário por frame (memória mapeada)
+        self.session_log = None
+        if self.config.system.ENABLE_SESSION_LOG:
+            self.session_log = SessionLog(self.config.system.SESSION_LOG_DIR,
+                                          self.config.system.SESSION_LOG_RECORDS,
+                                          self.config.system.SESSION_LOG_FILES)
+        
+        # Pelo logger: saem em ordem com os marcos de inicialização da thread do GPIO
+        log_event(logger, logging.INFO, "=== DETECTOR LIBRAS RASPBERRY PI 3B+ INICIALIZADO ===")
+        log_event(logger, logging.INFO, f"✓ Pinos do motor: {self.motor_pins}")
+        log_event(logger, logging.INFO, f"✓ Palavra alvo: '{self.target_word}'")
+        log_event(logger, logging.INFO, "✓ Detecção por análise de contornos e geometria da mão")
+    
+    def init_hardware(self):
+        """Importa e configura o GPIO e deixa o motor parado"""
+        try:
+            self.gpio = load_gpio(self.config.hardware.USE_FAKE_GPIO)
+            self.gpio.setmode(self.gpio.BCM)
+            self.gpio.setwarnings(self.config.system.ENABLE_GPIO_WARNINGS)
+            self.motor.attach(self.gpio)
+            self.mark_startup('hardware_ready')
+        except Exception as e:
+            self._hardware_error = e
+    
+    def wait_hardware(self):
+        """Aguarda a inicialização do GPIO; propaga o erro, se houver"""
+        if self._hardware_thread is not None:
+            self._hardware_thread.join(GPIO_INIT_TIMEOUT)
+        if self._hardware_error is not None:
+            raise self._hardware_error
+    
+    def prepare_pipeline(self):
+        """Pré-calcula limites de cor e kernel morfológico usados a cada frame"""
+        detection = self.config.detection
+        self.hsv_lower = np.array(detection.HSV_LOWER, dtype=np.uint8)
+        self.hsv_upper = np.array(detection.HSV_UPPER, dtype=np.uint8)
+        self.ycrcb_lower = np.array(detection.YCRCB_LOWER, dtype=np.uint8)
+        self.ycrcb_upper = np.array(detection.YCRCB_UPPER, dtype=np.uint8)
+        self.morph_kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE,
+                                                      tuple(detection.MORPH_KERNEL_SIZE))
+        self.blur_size = tuple(detection.GAUSSIAN_BLUR_SIZE)
+        # Limites de classificação que entram na validade do cache de features
+        self._classification_names = [name for name in dir(self.config.classification)
+                                      if name.isupper()]
+        set_opencv_threads(self.config.advanced.OPENCV_THREADS)
+        set_switch_interval(self.config.advanced.GIL_SWITCH_INTERVAL)
+        
+        # Máscara em faixas paralelas (resultado idêntico ao caminho serial)
+        advanced = self.config.advanced
+        if getattr(self, 'tiled_mask', None) is not None:
+            self.tiled_mask.shutdown()
+        self.tiled_mask = None
+        if advanced.USE_MULTITHREADING and advanced.TILED_SKIN_MASK \
+                and advanced.THREAD_POOL_SIZE > 1:
+            # Workers com a mesma afinidade do loop de visão (VISION_CPUS)
+            self.tiled_mask = TiledSegmenter(
+                advanced.THREAD_POOL_SIZE,
+                mask_halo(self.morph_kernel.shape[::-1], self.blur_size),
+                thread_setup=lambda: self.apply_thread_policy("vision"))
+    
+    def warmup(self):
+        """Processa um frame sintético para inicializar OpenCV antes do primeiro frame real"""
+        start = time.perf_counter()
+        hardware = self.config.hardware
+        dummy = np.zeros((hardware.CAMERA_HEIGHT, hardware.CAMERA_WIDTH, 3), dtype=np.uint8)
+        x, y, w, h = self.stream.roi
+        cv2.circle(dummy, (x + w // 2, y + h // 2), min(w, h) // 3, (120, 160, 220), -1)
+        frame = cv2.flip(dummy, 1)
+        mask = self.create_skin_mask(frame[y:y+h, x:x+w])
+        contour, _ = self.select_hand_contour(mask)
+        if contour is not None:
+            self.describe_hand(contour, frame)
+        cv2.putText(frame, "warmup", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        self.startup_metrics['warmup_duration'] = time.perf_counter() - start
+        self.mark_startup('warmup_done')
+    
+    def mark_startup(self, name):
+        """Registra um marco de inicialização (apenas a primeira ocorrência)"""
+        if name not in self.startup_metrics:
+            elapsed = time.perf_counter() - _STARTUP_T0
+            self.startup_metrics[name] = elapsed
+            log_event(logger, logging.INFO, f"⏱️ {name}: {elapsed * 1000:.0f} ms")
+    
+    def apply_thread_policy(self, role):
+        """Afinidade/prioridade da thread atual para o papel 'vision', 'capture' ou 'motor'"""
+        advanced = self.config.advanced
+        if role == "motor":
+            return apply_thread_policy(role, advanced.MOTOR_CPUS, advanced.MOTOR_RT_PRIORITY,
+                                       advanced.MOTOR_NICE)
+        if role == "capture":
+            return apply_thread_policy(role, advanced.CAPTURE_CPUS)
+        return apply_thread_policy(role, advanced.VISION_CPUS)
+    
+    def create_stream(self, name):
+        """Cria o estado de um novo stream com os parâmetros da configuração"""
+        hardware = self.config.hardware
+        index = self._next_stream_index
+        self._next_stream_index += 1
+        return StreamState(
+            name=name,
+            index=index,
+            target_word=self.config.words.DEFAULT_TARGET_WORD,
+            roi=(hardware.ROI_X, hardware.ROI_Y, hardware.ROI_WIDTH, hardware.ROI_HEIGHT),
+            letter_history=self.config.stabilization.LETTER_HISTORY_SIZE,
+            buffer_size=self.config.stabilization.GESTURE_BUFFER_SIZE,
+        )
+    
+    @property
+    def motor_running(self):
+        return self.motor.running
+    
+    @motor_running.setter
+    def motor_running(self, value):
+        self.motor.running = value
+    
+    @property
+    def step_sequence(self):
+        return self.motor.step_sequence
+    
+    @property
+    def current_step(self):
+        return self.motor.current_step
         
     def motor_off(self):
         """Desliga todos os pinos do motor"""
-        for pin in self.motor_pins:
-            GPIO.output(pin, GPIO.LOW)
+        self.motor.off()
     
     def motor_step(self, direction=1):
         """Executa um passo do motor"""
-        if direction == 1:
-            self.current_step = (self.current_step + 1) % len(self.step_sequence)
-        else:
-            self.current_step = (self.current_step - 1) % len(self.step_sequence)
-        
-        step = self.step_sequence[self.current_step]
-        for i, pin in enumerate(self.motor_pins):
-            GPIO.output(pin, step[i])
+        self.motor.step(direction)
     
-    def motor_sequence_threaded(self, steps=1000, delay=0.002, direction=1):
+    def motor_sequence_threaded(self, steps=1000, delay=0.002, direction=1, stream=None):
         """Executa sequência do motor em thread separada"""
-        def run_motor():
-            self.motor_running = True
-            print(f"Iniciando motor: {steps} passos")
-            
-            for _ in range(steps):
-                if not self.motor_running:  # Permite parar o motor
-                    break
-                self.motor_step(direction)
-                time.sleep(delay)
-            
-            self.motor_off()
-            self.motor_running = False
-            print("Motor parado")
+        stream = stream or self.stream
         
-        # Executa em thread separada para não bloquear a detecção
-        motor_thread = threading.Thread(target=run_motor)
-        motor_thread.daemon = True
-        motor_thread.start()
+        # Cópia do trace do frame: a thread do motor completa o registro
+        trace = dict(stream.trace) if stream.trace is not None else None
+        self.tracer.mark(trace, 'dispatch')
+        word = stream.target_word
+        
+        def on_first_step():
+            self.tracer.record_activation(trace, word, stream.name)
+        
+        def on_start(steps):
+            log_event(logger, logging.INFO, f"Iniciando motor: {steps} passos",
+                      frame=stream.frame_count, motor="start", stream=stream.name)
+            self.publish_event("motor", action="start", steps=steps,
+                               frame=stream.frame_count, stream=stream.name)
+        
+        def on_stop():
+            log_event(logger, logging.INFO, "Motor parado",
+                      frame=stream.frame_count, motor="stop", stream=stream.name)
+            self.publish_event("motor", action="stop",
+                               frame=stream.frame_count, stream=stream.name)
+        
+        if not self.motor.run_sequence(steps, delay, direction, on_start, on_stop,
+                                       on_first_step):
+            log_event(logger, logging.INFO, "Motor já em execução; acionamento ignorado",
+                      frame=stream.frame_count, motor="busy", stream=stream.name)
+            return False
+        return True
     
     def create_skin_mask(self, frame):
         """Cria máscara de pele usando múltiplos espaços de cor"""
+        if self.tiled_mask is not None:
+            return self.tiled_mask.run(frame, self._skin_mask)
+        return self._skin_mask(frame)
+    
+    def _skin_mask(self, frame):
         # Converte para HSV e YCrCb
         hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
         ycrcb = cv2.cvtColor(frame, cv2.COLOR_BGR2YCrCb)
         
         # Máscaras HSV
-        lower_hsv = np.array([0, 20, 70], dtype=np.uint8)
-        upper_hsv = np.array([25, 255, 255], dtype=np.uint8)
-        mask_hsv = cv2.inRange(hsv, lower_hsv, upper_hsv)
+        mask_hsv = cv2.inRange(hsv, self.hsv_lower, self.hsv_upper)
         
         # Máscaras YCrCb
-        lower_ycrcb = np.array([0, 133, 77], dtype=np.uint8)
-        upper_ycrcb = np.array([255, 173, 127], dtype=np.uint8)
-        mask_ycrcb = cv2.inRange(ycrcb, lower_ycrcb, upper_ycrcb)
+        mask_ycrcb = cv2.inRange(ycrcb, self.ycrcb_lower, self.ycrcb_upper)
         
         # Combina máscaras
         mask = cv2.bitwise_or(mask_hsv, mask_ycrcb)
         
         # Morfologia
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-        mask = cv2.GaussianBlur(mask, (3, 3), 0)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.morph_kernel)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self.morph_kernel)
+        mask = cv2.GaussianBlur(mask, self.blur_size, 0)
         
         return mask
     
-    def analyze_hand_geometry(self, contour):
-        """Analisa geometria da mão para classificação LIBRAS"""
+    def select_hand_contour(self, mask, area_scale=1.0):
+        """
+        Seleciona o contorno da mão em um único passe sobre os contornos.
+        area_scale: fator dos limites de área para máscaras reduzidas (escala²).
+        
+        Cada contourArea é calculado uma vez (antes: uma vez dentro de max() e
+        de novo para o vencedor). O resultado é o mesmo de
+        max(findContours(...), key=contourArea) seguido do filtro de área.
+        Retorna (contorno, área) ou (None, área do maior blob).
+        
+        connectedComponentsWithStats foi medido e descartado: a rotulação
+        percorre a máscara inteira e custa ~10x um findContours em máscaras
+        300x300 com ruído (benchmark.py blobs).
+        """
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        
+        best_contour, best_area = None, 0
+        for contour in contours:
+            area = cv2.contourArea(contour)
+            # '>' mantém o primeiro em caso de empate, como max()
+            if best_contour is None or area > best_area:
+                best_contour, best_area = contour, area
+        
+        if best_contour is not None and \
+                self.min_area * area_scale < best_area < self.max_area * area_scale:
+            return best_contour, best_area
+        return None, best_area
+    
+    def simplify_contour(self, contour):
+        """
+        Aproxima o contorno por um polígono (tolerância relativa ao perímetro)
+        para acelerar convexHull/convexityDefects. Retorna o próprio contorno
+        se a simplificação estiver desligada.
+        """
+        detection = self.config.detection
+        if not detection.CONTOUR_SIMPLIFY:
+            return contour
+        epsilon = detection.CONTOUR_EPSILON * cv2.arcLength(contour, True)
+        simplified = cv2.approxPolyDP(contour, epsilon, True)
+        return simplified if len(simplified) >= 4 else contour
+    
+    def describe_hand(self, contour, frame, features=None):
+        """
+        Geometria, dedos e letra de um contorno: (geometry, finger_count, letra).
+        features: geometria e dedos já calculados (worker remoto, letra None);
+            a letra é classificada aqui, com os limites desta configuração.
+        frame: None não desenha os defeitos.
+        """
+        if features is None:
+            features = self.compute_features(contour)
+        geometry, finger_count, letter, points = features
+        if letter is None:
+            letter = self.classify_libras_letter(geometry, finger_count, None)
+        
+        for far in points if frame is not None else ():
+            # Desenha ponto de defeito
+            cv2.circle(frame, far, 4, (255, 255, 0), -1)
+        return geometry, finger_count, letter
+    
+    def compute_features(self, contour):
+        """(geometry, finger_count, letra, pontos de defeito), pelo cache se ligado"""
+        if self.config.detection.FEATURE_CACHE:
+            return self.feature_cache.lookup(contour, lambda: self._describe_hand(contour),
+                                             self.feature_settings())
+        return self._describe_hand(contour)
+    
+    def feature_settings(self):
+        """Configurações de que geometria/dedos/letra dependem (validade do cache)"""
+        detection = self.config.detection
+        classification = self.config.classification
+        return (detection.CONTOUR_SIMPLIFY, detection.CONTOUR_EPSILON,
+                tuple(getattr(classification, name) for name in self._classification_names))
+    
+    def _describe_hand(self, contour):
+        hull_contour = self.simplify_contour(contour)
+        geometry = self.analyze_hand_geometry(contour, hull_contour)
+        finger_count, points = self.find_finger_defects(hull_contour)
+        if finger_count == 0 and hull_contour is not contour:
+            # A simplificação pode deixar o polígono convexo (sem defeitos):
+            # conta no contorno original, como sem simplificação
+            finger_count, points = self.find_finger_defects(contour)
+        letter = self.classify_libras_letter(geometry, finger_count, None)
+        return geometry, finger_count, letter, points
+    
+    def analyze_hand_geometry(self, contour, hull_contour=None):
+        """
+        Analisa geometria da mão para classificação LIBRAS.
+        hull_contour: contorno (simplificado) usado nos defeitos de convexidade;
+        área, perímetro, momentos e solidez vêm sempre do contorno original.
+        """
+        if hull_contour is None:
+            hull_contour = contour
         try:
             # Momentos e centro
             M = cv2.moments(contour)
@@ -149,7 +586,7 @@ class LibrasDetectorRPi:
             x, y, w, h = cv2.boundingRect(contour)
             aspect_ratio = w / h if h > 0 else 0
             
-            # Hull convexo
+            # Hull convexo (do contorno original: a solidez não muda com a simplificação)
             hull = cv2.convexHull(contour)
             hull_area = cv2.contourArea(hull)
             solidity = area / hull_area if hull_area > 0 else 0
@@ -158,9 +595,9 @@ class LibrasDetectorRPi:
             compactness = (perimeter * perimeter) / (4 * np.pi * area)
             
             # Defeitos de convexidade
-            hull_indices = cv2.convexHull(contour, returnPoints=False)
+            hull_indices = cv2.convexHull(hull_contour, returnPoints=False)
             if len(hull_indices) > 3:
-                defects = cv2.convexityDefects(contour, hull_indices)
+                defects = cv2.convexityDefects(hull_contour, hull_indices)
                 defect_count = len(defects) if defects is not None else 0
             else:
                 defect_count = 0
@@ -182,25 +619,34 @@ class LibrasDetectorRPi:
             }
             
         except Exception as e:
-            print(f"Erro na análise geométrica: {e}")
+            log_event(logger, logging.ERROR, f"Erro na análise geométrica: {e}")
             return {}
     
     def count_extended_fingers(self, contour, frame):
         """Conta dedos estendidos usando análise de convexidade"""
+        finger_count, points = self.find_finger_defects(contour)
+        for far in points:
+            # Desenha ponto de defeito
+            cv2.circle(frame, far, 4, (255, 255, 0), -1)
+        return finger_count
+    
+    def find_finger_defects(self, contour):
+        """Retorna (número de dedos, pontos de defeito entre dedos)"""
+        points = []
         try:
             # Hull e defeitos
             hull_indices = cv2.convexHull(contour, returnPoints=False)
             if len(hull_indices) < 4:
-                return 0
+                return 0, points
                 
             defects = cv2.convexityDefects(contour, hull_indices)
             if defects is None:
-                return 0
+                return 0, points
             
             # Centro da mão
             M = cv2.moments(contour)
             if M["m00"] == 0:
-                return 0
+                return 0, points
             cx = int(M["m10"] / M["m00"])
             cy = int(M["m01"] / M["m00"])
             
@@ -226,20 +672,20 @@ class LibrasDetectorRPi:
                         # Ângulo típico entre dedos
                         if 30 < angle_deg < 120:
                             valid_fingers += 1
-                            # Desenha ponto de defeito
-                            cv2.circle(frame, far, 4, (255, 255, 0), -1)
+                            points.append(far)
             
             # Retorna número de dedos (defeitos + 1)
-            return min(valid_fingers + 1, 5)
+            return min(valid_fingers + 1, 5), points
             
         except Exception as e:
-            return 0
+            return 0, []
     
     def classify_libras_letter(self, geometry, finger_count, frame):
-        """Classifica letra LIBRAS baseada na geometria e dedos"""
+        """Classifica letra LIBRAS baseada na geometria e dedos (limites em ClassificationConfig)"""
         if not geometry:
             return "INDEFINIDO"
         
+        c = self.config.classification
         area = geometry.get('area', 0)
         aspect_ratio = geometry.get('aspect_ratio', 0)
         solidity = geometry.get('solidity', 0)
@@ -250,127 +696,491 @@ class LibrasDetectorRPi:
         # Classificação baseada em características específicas de LIBRAS
         
         # Letra A - Punho fechado com polegar para cima
-        if finger_count <= 1 and solidity > 0.85 and compactness < 8:
+        if finger_count <= c.A_MAX_FINGERS and solidity > c.A_MIN_SOLIDITY \
+                and compactness < c.A_MAX_COMPACTNESS:
             return "A"
         
         # Letra B - Mão aberta, dedos juntos
-        if finger_count >= 4 and solidity > 0.9 and aspect_ratio < 1.3:
+        if finger_count >= c.B_MIN_FINGERS and solidity > c.B_MIN_SOLIDITY \
+                and aspect_ratio < c.B_MAX_ASPECT_RATIO:
             return "B"
         
         # Letra C - Mão em formato de C
-        if 1 <= finger_count <= 2 and 0.6 < solidity < 0.8 and compactness > 12:
+        if c.C_MIN_FINGERS <= finger_count <= c.C_MAX_FINGERS \
+                and c.C_MIN_SOLIDITY < solidity < c.C_MAX_SOLIDITY \
+                and compactness > c.C_MIN_COMPACTNESS:
             return "C"
         
         # Letra D - Indicador apontando
-        if finger_count == 1 and aspect_ratio > 1.5 and extent < 0.6:
+        if finger_count == c.D_FINGERS and aspect_ratio > c.D_MIN_ASPECT_RATIO \
+                and extent < c.D_MAX_EXTENT:
             return "D"
         
         # Letra E - Punho fechado
-        if finger_count == 0 and solidity > 0.9 and compactness < 6:
+        if finger_count == c.E_FINGERS and solidity > c.E_MIN_SOLIDITY \
+                and compactness < c.E_MAX_COMPACTNESS:
             return "E"
         
         # Letra F - Três dedos (indicador, médio, anelar)
-        if finger_count == 3 and solidity > 0.75:
+        if finger_count == c.F_FINGERS and solidity > c.F_MIN_SOLIDITY:
             return "F"
         
         # Letra G - Indicador e polegar estendidos
-        if finger_count == 2 and aspect_ratio > 1.2:
+        if finger_count == c.G_FINGERS and aspect_ratio > c.G_MIN_ASPECT_RATIO:
             return "G"
         
         # Letra I - Mindinho estendido
-        if finger_count == 1 and aspect_ratio < 1.2 and extent > 0.6:
+        if finger_count == c.I_FINGERS and aspect_ratio < c.I_MAX_ASPECT_RATIO \
+                and extent > c.I_MIN_EXTENT:
             return "I"
         
         # Letra L - L com indicador e polegar
-        if finger_count == 2 and aspect_ratio > 1.4 and compactness > 15:
+        if finger_count == c.L_FINGERS and aspect_ratio > c.L_MIN_ASPECT_RATIO \
+                and compactness > c.L_MIN_COMPACTNESS:
             return "L"
         
         # Letra O - Formato circular
-        if finger_count <= 2 and 0.7 < solidity < 0.85 and 8 < compactness < 15:
+        if finger_count <= c.O_MAX_FINGERS and c.O_MIN_SOLIDITY < solidity < c.O_MAX_SOLIDITY \
+                and c.O_MIN_COMPACTNESS < compactness < c.O_MAX_COMPACTNESS:
             return "O"
         
         # Letra U - Dois dedos juntos
-        if finger_count == 2 and aspect_ratio < 1.3 and solidity > 0.8:
+        if finger_count == c.U_FINGERS and aspect_ratio < c.U_MAX_ASPECT_RATIO \
+                and solidity > c.U_MIN_SOLIDITY:
             return "U"
         
         # Letra V - Dois dedos separados (vitória)
-        if finger_count == 2 and defect_count >= 1 and solidity < 0.8:
+        if finger_count == c.V_FINGERS and defect_count >= c.V_MIN_DEFECTS \
+                and solidity < c.V_MAX_SOLIDITY:
             return "V"
         
         # Padrão padrão baseado no número de dedos
         finger_letters = {0: "E", 1: "D", 2: "V", 3: "F", 4: "B", 5: "ABERTA"}
         return finger_letters.get(finger_count, "INDEFINIDO")
     
-    def update_letter_sequence(self, letter):
+    def update_letter_sequence(self, letter, confidence=None, stream=None):
         """Atualiza sequência de letras detectadas"""
-        if letter != "INDEFINIDO" and (not self.detected_letters or letter != self.detected_letters[-1]):
-            self.detected_letters.append(letter)
-            print(f"Letra detectada: {letter}")
-            print(f"Sequência atual: {' '.join(list(self.detected_letters))}")
+        stream = stream or self.stream
+        if letter != "INDEFINIDO" and (not stream.detected_letters or letter != stream.detected_letters[-1]):
+            stream.detected_letters.append(letter)
+            sequence = ' '.join(list(stream.detected_letters))
+            log_event(logger, logging.INFO,
+                      f"Letra detectada: {letter} | Sequência atual: {sequence}",
+                      frame=stream.frame_count, letter=letter,
+                      confidence=confidence, sequence=sequence, stream=stream.name)
+            self.publish_event("letter", letter=letter, confidence=confidence,
+                               sequence=list(stream.detected_letters),
+                               frame=stream.frame_count, stream=stream.name)
+            self.tracer.record_letter(stream.trace, letter, stream.name)
+            
+            self.mark_startup('first_letter')
             
             # Verifica se formou a palavra alvo
-            self.check_target_word()
+            self.check_target_word(stream)
     
-    def check_target_word(self):
+    def check_target_word(self, stream=None):
         """Verifica se a sequência forma a palavra alvo"""
-        if len(self.detected_letters) >= len(self.target_word):
+        stream = stream or self.stream
+        target_word = stream.target_word
+        if len(stream.detected_letters) >= len(target_word):
             # Pega as últimas N letras
-            recent_letters = ''.join(list(self.detected_letters)[-len(self.target_word):])
+            recent_letters = ''.join(list(stream.detected_letters)[-len(target_word):])
             
-            if recent_letters == self.target_word:
-                current_time = time.time()
-                if current_time - self.last_activation_time > self.activation_cooldown:
-                    self.activate_motor()
-                    self.last_activation_time = current_time
-                    self.detected_letters.clear()  # Limpa para nova detecção
+            if recent_letters == target_word:
+                current_time = self.clock()
+                if current_time - stream.last_activation_time > self.activation_cooldown:
+                    self.tracer.mark(stream.trace, 'word')
+                    self.publish_event("word", word=target_word,
+                                       frame=stream.frame_count, stream=stream.name)
+                    self.activate_motor(stream)
+                    stream.last_activation_time = current_time
+                    stream.detected_letters.clear()  # Limpa para nova detecção
     
-    def activate_motor(self):
+    def activate_motor(self, stream=None):
         """Ativa o motor stepper"""
+        stream = stream or self.stream
         try:
-            print(f"🎯 PALAVRA '{self.target_word}' DETECTADA! MOTOR ATIVADO!")
+            log_event(logger, logging.INFO,
+                      f"🎯 PALAVRA '{stream.target_word}' DETECTADA! MOTOR ATIVADO!",
+                      frame=stream.frame_count, word=stream.target_word,
+                      motor="activate", stream=stream.name)
             
             # Ativa motor em thread separada
-            self.motor_sequence_threaded(steps=1000, delay=0.003)
+            self.motor_sequence_threaded(steps=1000, delay=0.003, stream=stream)
             
-            self.motor_activated = True
+            stream.motor_activated = True
             
             # Reset automático após 3 segundos
             def reset_motor_status():
                 time.sleep(3)
-                self.motor_activated = False
+                stream.motor_activated = False
             
             reset_thread = threading.Thread(target=reset_motor_status)
             reset_thread.daemon = True
             reset_thread.start()
             
         except Exception as e:
-            print(f"Erro ao ativar motor: {e}")
+            log_event(logger, logging.ERROR, f"Erro ao ativar motor: {e}",
+                      frame=stream.frame_count, motor="error", stream=stream.name)
+    
+    def set_target_word(self, word, stream=None):
+        """Define nova palavra alvo e limpa a sequência atual"""
+        stream = stream or self.stream
+        word = word.upper().strip()
+        if word:
+            stream.target_word = word
+            stream.detected_letters.clear()
+            log_event(logger, logging.INFO, f"Nova palavra alvo: {word}",
+                      frame=stream.frame_count, word=word, stream=stream.name)
+    
+    def use_predefined_word(self, index=None, stream=None):
+        """Usa a palavra pré-definida 'index' (ou a seguinte à palavra atual)"""
+        stream = stream or self.stream
+        words = self.config.words.PREDEFINED_WORDS
+        if index is None:
+            current = words.index(stream.target_word) if stream.target_word in words else -1
+            index = current + 1
+        self.set_target_word(words[index % len(words)], stream=stream)
+    
+    def reset_state(self, stream=None):
+        """Limpa sequência, buffer de gestos e estado do motor"""
+        stream = stream or self.stream
+        stream.detected_letters.clear()
+        stream.gesture_buffer.clear()
+        stream.gesture_times.clear()
+        stream.last_gesture = ""
+        stream.motor_activated = False
+        log_event(logger, logging.INFO, "Sistema resetado",
+                  frame=stream.frame_count, stream=stream.name)
+    
+    def stop_motor(self, stream=None):
+        """Para o motor imediatamente"""
+        stream = stream or self.stream
+        self.motor.stop()
+        log_event(logger, logging.INFO, "Motor parado manualmente",
+                  frame=stream.frame_count, motor="manual_stop", stream=stream.name)
+    
+    def get_profiler(self):
+        """Profiler por amostragem (criado no primeiro uso)"""
+        if self.profiler is None:
+            from profiler import SamplingProfiler
+            advanced = self.config.advanced
+            self.profiler = SamplingProfiler(advanced.PROFILER_OUTPUT_DIR,
+                                             advanced.PROFILER_RATE,
+                                             advanced.PROFILER_MAX_DEPTH)
+        return self.profiler
+    
+    def toggle_profiler(self, action="start", stream=None):
+        """Liga ('start') ou desliga e grava ('stop') o profiler"""
+        if action == "start":
+            self.get_profiler().start()
+        elif self.profiler is not None:
+            self.profiler.stop()
+    
+    def submit_command(self, name, stream=None, **kwargs):
+        """Enfileira um comando para ser aplicado entre frames (thread-safe)"""
+        (stream or self.stream).commands.append((name, kwargs))
+    
+    def apply_pending_commands(self, stream=None):
+        """Aplica os comandos enfileirados desde o último frame"""
+        stream = stream or self.stream
+        while stream.commands:
+            name, kwargs = stream.commands.popleft()
+            handler = self.command_handlers.get(name)
+            if handler is None:
+                log_event(logger, logging.WARNING, f"Comando desconhecido: {name}",
+                          frame=stream.frame_count, stream=stream.name)
+                continue
+            try:
+                handler(stream=stream, **kwargs)
+            except Exception as e:
+                log_event(logger, logging.ERROR, f"Erro no comando '{name}': {e}",
+                          frame=stream.frame_count, stream=stream.name)
+    
+    def publish_status(self, current_gesture, stream=None):
+        """Atualiza o snapshot de status (troca atômica da referência)"""
+        stream = stream or self.stream
+        now = time.perf_counter()
+        if stream.last_frame_time is not None:
+            dt = now - stream.last_frame_time
+            if dt > 0:
+                stream.fps = 1.0 / dt if stream.fps == 0 else 0.9 * stream.fps + 0.1 / dt
+        stream.last_frame_time = now
+        
+        stream.status = {
+            'stream': stream.name,
+            'frame': stream.frame_count,
+            'letter': current_gesture,
+            'confirmed_letter': stream.last_gesture,
+            'confidence': stream.last_confidence,
+            'sequence': list(stream.detected_letters),
+            'target_word': stream.target_word,
+            'motor_activated': stream.motor_activated,
+            'motor_running': self.motor.running,
+            'fps': round(stream.fps, 2),
+        }
+        if self.event_publisher is not None:
+            self.event_publisher.update_metrics(stream.status)
+    
+    def publish_event(self, kind, **payload):
+        """Envia evento ao publicador MQTT, se habilitado (não bloqueante)"""
+        if self.event_publisher is not None:
+            self.event_publisher.publish_event(kind, **payload)
+    
+    def start_services(self):
+        """Inicia os serviços de rede habilitados em NetworkConfig"""
+        network = self.config.network
+        if network.ENABLE_REST_API and self.api_server is None:
+            from rest_api import RestApiServer
+            self.api_server = RestApiServer(self, network.API_HOST, network.API_PORT,
+                                            network.API_MAX_REQUESTS_PER_SECOND).start()
+        if network.ENABLE_WEBSOCKET and self.preview_server is None:
+            from preview_server import PreviewServer
+            self.preview_server = PreviewServer(network.API_HOST, network.WS_PORT,
+                                                network.PREVIEW_FPS, network.PREVIEW_WIDTH,
+                                                network.PREVIEW_JPEG_QUALITY).start()
+        if network.ENABLE_MQTT and self.event_publisher is None:
+            from mqtt_publisher import EventPublisher
+            self.event_publisher = EventPublisher(
+                network.MQTT_BROKER, network.MQTT_PORT, network.MQTT_TOPIC_BASE,
+                client_id=network.MQTT_CLIENT_ID, keepalive=network.MQTT_KEEPALIVE,
+                outbox_size=network.MQTT_OUTBOX_SIZE,
+                batch_interval=network.MQTT_BATCH_INTERVAL,
+                metrics_interval=network.MQTT_METRICS_INTERVAL,
+                reconnect_max=network.MQTT_RECONNECT_MAX).start()
+        if network.ENABLE_OFFLOAD and self.offload is None:
+            from offload import OffloadClient
+            self.offload = OffloadClient(network.OFFLOAD_HOST, network.OFFLOAD_PORT,
+                                         deadline_ms=network.OFFLOAD_DEADLINE_MS,
+                                         scale=network.OFFLOAD_SCALE,
+                                         jpeg_quality=network.OFFLOAD_JPEG_QUALITY,
+                                         reconnect_max=network.OFFLOAD_RECONNECT_MAX).start()
+        # Sinais só podem ser instalados na thread principal
+        if self.config.advanced.ENABLE_PROFILER \
+                and threading.current_thread() is threading.main_thread():
+            from profiler import install_signal_handlers
+            install_signal_handlers(self.get_profiler())
+        if (network.ENABLE_STDIN_COMMANDS or network.ENABLE_COMMAND_SOCKET) \
+                and self.command_channel is None:
+            from command_channel import CommandChannel
+            socket_path = network.COMMAND_SOCKET_PATH if network.ENABLE_COMMAND_SOCKET else None
+            self.command_channel = CommandChannel(self, network.ENABLE_STDIN_COMMANDS,
+                                                  socket_path).start()
+    
+    def stop_services(self):
+        """Encerra os serviços de rede"""
+        if self.api_server is not None:
+            self.api_server.stop()
+            self.api_server = None
+        if self.preview_server is not None:
+            self.preview_server.stop()
+            self.preview_server = None
+        if self.event_publisher is not None:
+            self.event_publisher.stop()
+            self.event_publisher = None
+        if self.command_channel is not None:
+            self.command_channel.stop()
+            self.command_channel = None
+        if self.profiler is not None:
+            self.profiler.stop(wait=True)
+        if self.offload is not None:
+            self.offload.stop()
+            self.offload = None
     
     def cleanup(self):
-        """Limpa recursos GPIO"""
-        self.motor_off()
-        GPIO.cleanup()
+        """Limpa recursos GPIO e esvazia a fila de log"""
+        self.release()
+        shutdown_logging()
     
-    def run(self):
-        """Loop principal do detector"""
-        try:
-            # Configuração da webcam USB
-            cap = cv2.VideoCapture(0)
+    def release(self):
+        """
+        Libera os recursos do detector (GPIO, log de sessão, pool de faixas)
+        sem encerrar o logging do processo (detectores embutidos, stream_api).
+        """
+        if self._hardware_thread is not None:
+            self._hardware_thread.join(GPIO_INIT_TIMEOUT)
+        if self.gpio is not None:
+            self.motor_off()
+            self.gpio.cleanup()
+        if self.session_log is not None:
+            self.session_log.close()
+            if self.session_log.dropped:
+                log_event(logger, logging.WARNING,
+                          f"⚠️ Log de sessão: {self.session_log.dropped} registros descartados "
+                          f"sem arquivo disponível")
+        if self.tiled_mask is not None:
+            self.tiled_mask.shutdown()
+    
+    def draw_interface(self, frame, current_gesture, stream=None):
+        """Desenha letra, palavra, sequência, motor e ROI"""
+        stream = stream or self.stream
+        roi_x, roi_y, roi_w, roi_h = stream.roi
+        height = frame.shape[0]
+        
+        # Letra atual
+        color = (0, 255, 0) if current_gesture != "INDEFINIDO" else (0, 0, 255)
+        cv2.putText(frame, f"LETRA: {current_gesture}", (10, 30), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+        
+        # Palavra alvo e progresso
+        cv2.putText(frame, f"Palavra: {stream.target_word}", (10, height - 70), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+        
+        # Sequência atual
+        sequence_text = ' '.join(list(stream.detected_letters)) if stream.detected_letters else "Nenhuma"
+        cv2.putText(frame, f"Sequencia: {sequence_text}", (10, height - 50), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+        
+        # Status do motor
+        motor_status = "ATIVO" if stream.motor_activated else "INATIVO"
+        motor_color = (0, 255, 0) if stream.motor_activated else (0, 0, 255)
+        cv2.putText(frame, f"Motor: {motor_status}", (10, height - 30), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, motor_color, 1)
+        
+        # Status de execução do motor
+        if self.motor.running:
+            cv2.putText(frame, "MOTOR RODANDO...", (10, height - 10), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+        
+        # ROI
+        cv2.rectangle(frame, (roi_x, roi_y), (roi_x + roi_w, roi_y + roi_h), (255, 0, 0), 2)
+        cv2.putText(frame, "ROI - Coloque a mao aqui", (roi_x, roi_y - 10), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 0, 0), 1)
+    
+    def process_frame(self, frame, stream=None, capture_time=None, annotate=True):
+        """
+        Processa um frame capturado: detecção, estabilização e interface.
+        stream: StreamState de origem do frame (stream padrão se None).
+        capture_time: instante da captura (time.perf_counter()), início do trace.
+        annotate: False pula contorno e textos (uso sem janela, ex. stream_api).
+        Retorna (frame anotado, máscara, gesto atual).
+        """
+        stream = stream or self.stream
+        stream.frame_count += 1
+        if capture_time is None:
+            capture_time = time.perf_counter()
+        if self.config.system.ENABLE_LATENCY_TRACE:
+            stream.trace = self.tracer.begin(stream.frame_count, capture_time)
+        self.apply_pending_commands(stream)
+        
+        frame = cv2.flip(frame, 1)
+        
+        # ROI
+        roi_x, roi_y, roi_w, roi_h = stream.roi
+        roi = frame[roi_y:roi_y+roi_h, roi_x:roi_x+roi_w]
+        
+        # Segmentação e features no worker remoto, se responder dentro do prazo
+        remote = None
+        if self.offload is not None:
+            remote = self.offload.process(roi, (roi_x, roi_y))
+        
+        if remote is not None:
+            mask, hand_contour, area = remote.mask, remote.contour, remote.area
+        else:
+            # Detecção de mão
+            mask = self.create_skin_mask(roi)
             
-            # Verifica se conseguiu abrir a webcam USB
-            if not cap.isOpened():
-                print("❌ Erro: Não foi possível abrir a webcam USB")
-                print("💡 Verifique se:")
-                print("   - A webcam está conectada na porta USB")
-                print("   - A webcam é compatível com Linux (UVC)")
-                print("   - Execute 'lsusb' para verificar se é detectada")
-                print("   - Teste com 'cheese' ou outro app de webcam")
-                return
+            # Maior blob dentro dos limites de área (um único contourArea por blob)
+            hand_contour, area = self.select_hand_contour(mask)
+            
+            if hand_contour is not None:
+                # Ajusta coordenadas
+                hand_contour[:, 0, 0] += roi_x
+                hand_contour[:, 0, 1] += roi_y
+        
+        current_gesture = "INDEFINIDO"
+        geometry = {}
+        finger_count = 0
+        
+        stream.last_features = None
+        if hand_contour is not None:
+            # Desenha contorno
+            if annotate:
+                cv2.drawContours(frame, [hand_contour], -1, (0, 255, 0), 2)
             
-            # Configurações específicas para webcam USB
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-            cap.set(cv2.CAP_PROP_FPS, 20)
+            # Análise e classificação da letra
+            geometry, finger_count, current_gesture = self.describe_hand(
+                hand_contour, frame if annotate else None, remote.features if remote is not None else None)
+            stream.last_features = {'area': area, 'geometry': geometry,
+                                    'fingers': finger_count}
+            
+            # Adiciona ao buffer para estabilização
+            stream.gesture_buffer.append(current_gesture)
+            stream.gesture_times.append(capture_time)
+            
+            # Mostra informações
+            if geometry and annotate:
+                cv2.putText(frame, f"Dedos: {finger_count}", (10, 60), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+                cv2.putText(frame, f"Solidity: {geometry.get('solidity', 0):.2f}", 
+                           (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 0), 1)
+                cv2.putText(frame, f"Aspect: {geometry.get('aspect_ratio', 0):.2f}", 
+                           (10, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 0), 1)
+        
+        self.tracer.mark(stream.trace, 'vision')
+        
+        # Sistema de estabilização
+        if len(stream.gesture_buffer) >= 10:
+            # Gesto mais comum nos últimos frames
+            gesture_counts = {}
+            for g in list(stream.gesture_buffer)[-10:]:
+                gesture_counts[g] = gesture_counts.get(g, 0) + 1
+            
+            most_common = max(gesture_counts, key=gesture_counts.get)
+            confidence = gesture_counts[most_common] / 10
+            stream.last_confidence = confidence
+            
+            # Confirma gesto se confiança alta
+            if confidence >= 0.7 and most_common != "INDEFINIDO":
+                if most_common != stream.last_gesture:
+                    if stream.trace is not None:
+                        # Captura do primeiro frame da letra vencedora na janela de votação
+                        window = list(zip(stream.gesture_buffer, stream.gesture_times))[-10:]
+                        stream.trace['vote'] = next(t for g, t in window if g == most_common)
+                    self.update_letter_sequence(most_common, confidence, stream)
+                    stream.last_gesture = most_common
+        
+        # Amostrado: o registro de todos os frames é o session_log
+        every = self.config.system.LOG_FRAME_EVERY
+        if every and stream.frame_count % every == 0 and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("frame", extra={'frame': stream.frame_count, 'letter': current_gesture,
+                                         'confidence': stream.last_confidence,
+                                         'motor': "running" if self.motor.running else None,
+                                         'stream': stream.name})
+        
+        if annotate:
+            self.draw_interface(frame, current_gesture, stream)
+        
+        self.publish_status(current_gesture, stream)
+        
+        if self.session_log is not None:
+            motor = ((MOTOR_RUNNING if self.motor.running else 0)
+                     | (MOTOR_ACTIVATED if stream.motor_activated else 0))
+            self.session_log.append(time.time(), stream.frame_count, stream.index,
+                                    area if hand_contour is not None else 0.0,
+                                    geometry or {}, finger_count, stream.last_confidence,
+                                    current_gesture, stream.last_gesture, motor)
+        
+        if 'first_frame' not in self.startup_metrics:
+            self.mark_startup('first_frame')
+        
+        return frame, mask, current_gesture
+    
+    def open_camera(self, source=None):
+        """Abre e configura a câmera (ou arquivo de vídeo); retorna None se falhar"""
+        hardware = self.config.hardware
+        if source is None:
+            source = hardware.CAMERA_INDEX
+        cap = cv2.VideoCapture(source)
+        if not cap.isOpened():
+            cap.release()
+            return None
+        
+        # Configurações específicas para webcam USB (não se aplicam a arquivos)
+        if isinstance(source, int):
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, hardware.CAMERA_WIDTH)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, hardware.CAMERA_HEIGHT)
+            cap.set(cv2.CAP_PROP_FPS, hardware.CAMERA_FPS)
             cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Buffer menor para reduzir latência
             
             # Configurações automáticas da webcam (se suportadas)
@@ -379,183 +1189,161 @@ class LibrasDetectorRPi:
                 cap.set(cv2.CAP_PROP_AUTOFOCUS, 1)      # Auto focus
             except:
                 pass  # Nem todas as webcams suportam
+        
+        self.mark_startup('camera_ready')
+        return cap
+    
+    def start_devices(self, source=None):
+        """
+        Abre a câmera enquanto o pipeline é aquecido e o GPIO termina de
+        inicializar em background. Retorna o VideoCapture (ou None).
+        """
+        if not self.config.advanced.PARALLEL_STARTUP:
+            cap = self.open_camera(source)
+            self.warmup()
+            return cap
+        
+        result = {}
+        camera_thread = threading.Thread(
+            target=lambda: result.setdefault('cap', self.open_camera(source)),
+            name="camera-open", daemon=True)
+        camera_thread.start()
+        self.warmup()
+        camera_thread.join()
+        self.wait_hardware()
+        return result.get('cap')
+    
+    def run(self, source=None, headless=False, max_frames=None):
+        """Loop principal do detector"""
+        cap = None
+        try:
+            # Configuração da webcam USB
+            cap = self.start_devices(source)
+            
+            # Verifica se conseguiu abrir a webcam USB
+            if cap is None:
+                log_event(logger, logging.ERROR,
+                          "❌ Erro: Não foi possível abrir a webcam USB\n"
+                          "💡 Verifique se:\n"
+                          "   - A webcam está conectada na porta USB\n"
+                          "   - A webcam é compatível com Linux (UVC)\n"
+                          "   - Execute 'lsusb' para verificar se é detectada\n"
+                          "   - Teste com 'cheese' ou outro app de webcam")
+                return
             
             # Informações da webcam
             width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
             height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             fps = cap.get(cv2.CAP_PROP_FPS)
             
-            print("=== DETECTOR DE LIBRAS NO RASPBIAN DESKTOP ===")
-            print(f"📹 Webcam USB configurada: {width}x{height} @ {fps}fps")
-            print(f"🎯 Palavra alvo: '{self.target_word}'")
-            print("🔤 Letras suportadas: A, B, C, D, E, F, G, I, L, O, U, V")
-            print("🔄 Forme a palavra para ativar o motor")
-            print("-" * 60)
-            print("Controles: 'q'=sair, 'r'=reset, 'w'=mudar palavra, 's'=parar motor")
-            print("🖥️ Use o mouse para focar nas janelas do OpenCV")
-            print("-" * 60)
+            # Pelo logger, como os marcos de inicialização: um registro, sem intercalar
+            log_event(logger, logging.INFO,
+                      "=== DETECTOR DE LIBRAS NO RASPBIAN DESKTOP ===\n"
+                      f"📹 Webcam USB configurada: {width}x{height} @ {fps}fps\n"
+                      f"🎯 Palavra alvo: '{self.target_word}'\n"
+                      "🔤 Letras suportadas: A, B, C, D, E, F, G, I, L, O, U, V\n"
+                      "🔄 Forme a palavra para ativar o motor\n"
+                      + "-" * 60 + "\n"
+                      "Controles: 'q'=sair, 'r'=reset, 'w'=próxima palavra, 's'=parar motor\n"
+                      "⌨️ No terminal: 'w PALAVRA' muda a palavra sem pausar a detecção\n"
+                      "🖥️ Use o mouse para focar nas janelas do OpenCV\n"
+                      + "-" * 60)
             
-            # ROI para detecção (ajustado para resolução menor)
-            roi_x, roi_y, roi_w, roi_h = 200, 60, 300, 300
+            self.start_services()
+            # Captura e visão rodam nesta thread
+            self.apply_thread_policy("vision")
             
-            while True:
+            while max_frames is None or self.frame_count < max_frames:
                 ret, frame = cap.read()
+                capture_time = time.perf_counter()
                 if not ret:
-                    print("❌ Erro ao capturar frame da câmera")
+                    log_event(logger, logging.ERROR, "❌ Erro ao capturar frame da câmera",
+                              frame=self.frame_count)
                     break
                 
-                frame = cv2.flip(frame, 1)
-                
-                # ROI
-                roi = frame[roi_y:roi_y+roi_h, roi_x:roi_x+roi_w]
-                
-                # Detecção de mão
-                mask = self.create_skin_mask(roi)
+                frame, mask, current_gesture = self.process_frame(frame,
+                                                                  capture_time=capture_time)
                 
-                # Encontra contornos
-                contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+                # Preview remoto (codificado fora do loop, só com espectadores)
+                if self.preview_server is not None:
+                    self.preview_server.publish(frame)
                 
-                current_gesture = "INDEFINIDO"
-                
-                if contours:
-                    # Maior contorno
-                    hand_contour = max(contours, key=cv2.contourArea)
-                    area = cv2.contourArea(hand_contour)
-                    
-                    if self.min_area < area < self.max_area:
-                        # Ajusta coordenadas
-                        hand_contour[:, 0, 0] += roi_x
-                        hand_contour[:, 0, 1] += roi_y
-                        
-                        # Desenha contorno
-                        cv2.drawContours(frame, [hand_contour], -1, (0, 255, 0), 2)
-                        
-                        # Análise
-                        geometry = self.analyze_hand_geometry(hand_contour)
-                        finger_count = self.count_extended_fingers(hand_contour, frame)
-                        
-                        # Classifica letra
-                        current_gesture = self.classify_libras_letter(geometry, finger_count, frame)
-                        
-                        # Adiciona ao buffer para estabilização
-                        self.gesture_buffer.append(current_gesture)
-                        
-                        # Mostra informações
-                        if geometry:
-                            cv2.putText(frame, f"Dedos: {finger_count}", (10, 60), 
-                                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
-                            cv2.putText(frame, f"Solidity: {geometry.get('solidity', 0):.2f}", 
-                                       (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 0), 1)
-                            cv2.putText(frame, f"Aspect: {geometry.get('aspect_ratio', 0):.2f}", 
-                                       (10, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 0), 1)
-                
-                # Sistema de estabilização
-                if len(self.gesture_buffer) >= 10:
-                    # Gesto mais comum nos últimos frames
-                    gesture_counts = {}
-                    for g in list(self.gesture_buffer)[-10:]:
-                        gesture_counts[g] = gesture_counts.get(g, 0) + 1
-                    
-                    most_common = max(gesture_counts, key=gesture_counts.get)
-                    confidence = gesture_counts[most_common] / 10
-                    
-                    # Confirma gesto se confiança alta
-                    if confidence >= 0.7 and most_common != "INDEFINIDO":
-                        if most_common != self.last_gesture:
-                            self.update_letter_sequence(most_common)
-                            self.last_gesture = most_common
-                
-                # Interface
-                color = (0, 255, 0) if current_gesture != "INDEFINIDO" else (0, 0, 255)
-                cv2.putText(frame, f"LETRA: {current_gesture}", (10, 30), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-                
-                # Palavra alvo e progresso
-                cv2.putText(frame, f"Palavra: {self.target_word}", (10, frame.shape[0] - 70), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-                
-                # Sequência atual
-                sequence_text = ' '.join(list(self.detected_letters)) if self.detected_letters else "Nenhuma"
-                cv2.putText(frame, f"Sequencia: {sequence_text}", (10, frame.shape[0] - 50), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
-                
-                # Status do motor
-                motor_status = "ATIVO" if self.motor_activated else "INATIVO"
-                motor_color = (0, 255, 0) if self.motor_activated else (0, 0, 255)
-                cv2.putText(frame, f"Motor: {motor_status}", (10, frame.shape[0] - 30), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, motor_color, 1)
-                
-                # Status de execução do motor
-                if self.motor_running:
-                    cv2.putText(frame, "MOTOR RODANDO...", (10, frame.shape[0] - 10), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
-                
-                # ROI
-                cv2.rectangle(frame, (roi_x, roi_y), (roi_x + roi_w, roi_y + roi_h), (255, 0, 0), 2)
-                cv2.putText(frame, "ROI - Coloque a mao aqui", (roi_x, roi_y - 10), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 0, 0), 1)
+                if headless:
+                    continue
                 
                 # Mostra resultado no desktop do Raspbian
-                cv2.imshow('Detector LIBRAS - Raspbian Desktop', frame)
+                interface = self.config.interface
+                cv2.imshow(interface.MAIN_WINDOW_NAME, frame)
                 
                 # Mostra máscara em janela menor
-                mask_small = cv2.resize(mask, (200, 200))
-                cv2.imshow('Mascara de Detecao', mask_small)
+                if interface.SHOW_MASK_WINDOW:
+                    mask_small = cv2.resize(mask, tuple(interface.MASK_WINDOW_SIZE))
+                    cv2.imshow(interface.MASK_WINDOW_NAME, mask_small)
                 
-                # Controles
+                # Controles (aplicados entre frames, sem bloquear o loop)
                 key = cv2.waitKey(1) & 0xFF
                 if key == ord('q'):
                     break
                 elif key == ord('r'):
-                    self.detected_letters.clear()
-                    self.gesture_buffer.clear()
-                    self.last_gesture = ""
-                    self.motor_activated = False
-                    print("Sistema resetado")
+                    self.submit_command("reset")
                 elif key == ord('w'):
-                    print("\nDigite a nova palavra alvo:")
-                    # Para entrada via terminal enquanto OpenCV está rodando
-                    cv2.destroyAllWindows()
-                    new_word = input("Nova palavra: ").upper().strip()
-                    if new_word:
-                        self.target_word = new_word
-                        self.detected_letters.clear()
-                        print(f"Nova palavra alvo: {self.target_word}")
-                    # Reabrir janelas
-                    cv2.namedWindow('Detector LIBRAS - Raspberry Pi 3B+')
-                    cv2.namedWindow('Mascara')
+                    self.submit_command("use_word")
                 elif key == ord('s'):
                     # Para o motor
-                    self.motor_running = False
-                    self.motor_off()
-                    print("Motor parado manualmente")
+                    self.submit_command("stop_motor")
             
         except KeyboardInterrupt:
-            print("\n🛑 Parando detector...")
+            log_event(logger, logging.INFO, "🛑 Parando detector...")
         except Exception as e:
-            print(f"❌ Erro durante execução: {e}")
+            logger.exception(f"❌ Erro durante execução: {e}")
         finally:
             # Limpeza
-            cap.release()
-            cv2.destroyAllWindows()
+            if cap is not None:
+                cap.release()
+            if not headless:
+                cv2.destroyAllWindows()
+            self.stop_services()
             self.cleanup()
             print("✅ Recursos liberados com sucesso")
 
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Detector LIBRAS para Raspberry Pi")
+    parser.add_argument("--source", default=None,
+                        help="Índice da câmera ou arquivo de vídeo (padrão: CAMERA_INDEX)")
+    parser.add_argument("--fake-gpio", action="store_true",
+                        help="Usa GPIO simulado (fora da Raspberry Pi)")
+    parser.add_argument("--headless", action="store_true", help="Sem janelas do OpenCV")
+    parser.add_argument("--max-frames", type=int, default=None,
+                        help="Encerra após N frames")
+    args = parser.parse_args()
+    
     print("=== INICIANDO DETECTOR LIBRAS PARA RASPBERRY PI 3B+ ===")
     
+    # Ajustes do usuário (ex.: limites gerados por tune_thresholds.py)
+    config.load_from_file()
+    
+    if args.fake_gpio:
+        config.hardware.USE_FAKE_GPIO = True
+    source = args.source
+    if source is not None and source.isdigit():
+        source = int(source)
+    
     # Configuração dos pinos do motor (ajuste conforme seu hardware)
     # Pinos padrão: 18, 19, 20, 21 (BCM)
-    motor_pins = [18, 19, 20, 21]
+    motor_pins = config.hardware.MOTOR_PINS
     
+    detector = None
     try:
         detector = LibrasDetectorRPi(motor_pins=motor_pins)
-        detector.run()
+        detector.run(source=source, headless=args.headless, max_frames=args.max_frames)
     except Exception as e:
         print(f"❌ Erro ao inicializar: {e}")
         print("💡 Verifique se:")
         print("   - Os pinos GPIO estão corretos")
         print("   - A câmera está conectada")
         print("   - As dependências estão instaladas")
-        GPIO.cleanup()
\ No newline at end of file
+        if detector is not None:
+            detector.cleanup()
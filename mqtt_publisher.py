@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+Publicador MQTT de eventos do Detector LIBRAS
+=============================================
+
+Envia letras confirmadas, palavras detectadas, início/fim do motor e
+métricas periódicas para o broker definido em NetworkConfig.
+
+O loop de frames apenas coloca eventos em uma caixa de saída limitada
+(os mais antigos são descartados quando ela enche) e sobrescreve o último
+snapshot de métricas. Uma thread própria conecta ao broker, reconecta com
+backoff exponencial e envia os eventos acumulados em lote, em uma única
+escrita no socket. Um broker fora do ar nunca bloqueia run().
+
+Implementa o subconjunto do MQTT 3.1.1 necessário para publicar com QoS 0
+(CONNECT, PUBLISH, PINGREQ, DISCONNECT), sem dependências externas.
+
+Tópicos:
+    <base>/events/<tipo>   um JSON por evento (letter, word, motor)
+    <base>/metrics         último snapshot de métricas (retido)
+"""
+
+import json
+import logging
+import random
+import select
+import socket
+import struct
+import threading
+import time
+from collections import deque
+
+from event_log import get_logger, log_event
+
+logger = get_logger("mqtt")
+
+CONNECT_TIMEOUT = 2.0
+
+
+def encode_remaining_length(length):
+    """Codifica o campo 'remaining length' do MQTT (varint de 7 bits)"""
+    encoded = bytearray()
+    while True:
+        byte, length = length % 128, length // 128
+        encoded.append(byte | 0x80 if length else byte)
+        if not length:
+            return bytes(encoded)
+
+
+def encode_string(value):
+    """Codifica uma string MQTT (tamanho de 16 bits + UTF-8)"""
+    data = value.encode("utf-8")
+    return struct.pack("!H", len(data)) + data
+
+
+def connect_packet(client_id, keepalive):
+    variable = encode_string("MQTT") + struct.pack("!BBH", 4, 0x02, keepalive)
+    payload = encode_string(client_id)
+    body = variable + payload
+    return b"\x10" + encode_remaining_length(len(body)) + body
+
+
+def publish_packet(topic, payload, retain=False):
+    body = encode_string(topic) + payload
+    return (bytes([0x30 | (0x01 if retain else 0)])
+            + encode_remaining_length(len(body)) + body)
+
+
+PINGREQ = b"\xc0\x00"
+DISCONNECT = b"\xe0\x00"
+
+
+class EventPublisher:
+    """Publica eventos do detector via MQTT em thread própria"""
+
+    def __init__(self, broker="localhost", port=1883, topic_base="libras_detector",
+                 client_id="libras_detector", keepalive=30, outbox_size=256,
+                 batch_interval=0.2, metrics_interval=5.0, reconnect_max=30.0):
+        self.broker = broker
+        self.port = port
+        self.topic_base = topic_base.rstrip("/")
+        self.client_id = client_id
+        self.keepalive = keepalive
+        self.batch_interval = batch_interval
+        self.metrics_interval = metrics_interval
+        self.reconnect_max = reconnect_max
+
+        # Caixa de saída limitada: append/popleft são atômicos entre threads
+        self.outbox = deque(maxlen=outbox_size)
+        self._metrics = None
+        self._metrics_dirty = False
+
+        self.sock = None
+        self.thread = None
+        self.running = False
+        self._wakeup = threading.Event()
+
+        # Métricas do próprio publicador
+        self.published = 0
+        self.dropped = 0
+        self.batches = 0
+        self.reconnects = 0
+        self.connected = False
+
+    # ------------------------------------------------------------------
+    # API usada pelo detector (não bloqueante)
+    # ------------------------------------------------------------------
+
+    def publish_event(self, kind, **payload):
+        """Enfileira um evento; descarta o mais antigo se a caixa estiver cheia"""
+        if len(self.outbox) == self.outbox.maxlen:
+            self.dropped += 1
+        payload['ts'] = time.time()
+        self.outbox.append((kind, payload))
+
+    def update_metrics(self, metrics):
+        """Substitui o snapshot de métricas (atualizações intermediárias são coalescidas)"""
+        self._metrics = metrics
+        self._metrics_dirty = True
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="mqtt-publisher", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """Envia o que estiver pendente (se conectado) e encerra a thread"""
+        if not self.running:
+            return
+        self.running = False
+        self._wakeup.set()
+        if self.thread is not None:
+            self.thread.join(timeout=timeout)
+
+    def get_stats(self):
+        return {
+            'connected': self.connected,
+            'published': self.published,
+            'dropped': self.dropped,
+            'pending': len(self.outbox),
+            'batches': self.batches,
+            'reconnects': self.reconnects,
+        }
+
+    # ------------------------------------------------------------------
+    # Thread de envio
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        backoff = 0.5
+        last_metrics = 0.0
+        last_send = time.monotonic()
+
+        while self.running:
+            if self.sock is None:
+                if self._connect():
+                    backoff = 0.5
+                else:
+                    # Backoff exponencial com jitter, interrompível pelo stop()
+                    self._wakeup.wait(backoff * random.uniform(0.8, 1.2))
+                    backoff = min(backoff * 2, self.reconnect_max)
+                    continue
+
+            self._wakeup.wait(self.batch_interval)
+            now = time.monotonic()
+
+            events = self._build_batch()
+            metrics = None
+            if self._metrics_dirty and now - last_metrics >= self.metrics_interval:
+                last_metrics = now
+                metrics = self._metrics_packet()
+            ping = not events and metrics is None and now - last_send >= self.keepalive / 2
+
+            if (events or metrics or ping) and self._send_batch(events, metrics, ping):
+                last_send = now
+
+            self._drain_incoming()
+
+        # Encerramento: envia o que restou e desconecta
+        if self.sock is not None:
+            events = self._build_batch()
+            metrics = self._metrics_packet() if self._metrics_dirty else None
+            if events or metrics:
+                self._send_batch(events, metrics)
+            self._send(DISCONNECT)
+            self._close()
+
+    def _build_batch(self):
+        batch = []
+        while self.outbox:
+            kind, payload = self.outbox.popleft()
+            batch.append(publish_packet(f"{self.topic_base}/events/{kind}",
+                                        json.dumps(payload, ensure_ascii=False).encode("utf-8")))
+        return batch
+
+    def _metrics_packet(self):
+        self._metrics_dirty = False
+        return publish_packet(f"{self.topic_base}/metrics",
+                              json.dumps(self._metrics, ensure_ascii=False).encode("utf-8"),
+                              retain=True)
+
+    def _send_batch(self, events, metrics=None, ping=False):
+        """Envia eventos, métricas e/ou PINGREQ em uma única escrita no socket"""
+        batch = events + [packet for packet in (metrics, PINGREQ if ping else None)
+                          if packet is not None]
+        if not self._send(b"".join(batch)):
+            # Os eventos já saíram da caixa e não são reenviados (QoS 0: parte do
+            # lote pode ter chegado): contam como descartados. As métricas são
+            # um snapshot retido e voltam a ser enviadas após reconectar.
+            self.dropped += len(events)
+            if metrics is not None:
+                self._metrics_dirty = True
+            return False
+        self.batches += 1
+        self.published += len(events) + (metrics is not None)
+        return True
+
+    def _connect(self):
+        sock = None
+        try:
+            sock = socket.create_connection((self.broker, self.port), timeout=CONNECT_TIMEOUT)
+            sock.sendall(connect_packet(self.client_id, self.keepalive))
+            connack = sock.recv(4)
+            if len(connack) < 4 or connack[0] != 0x20 or connack[3] != 0:
+                raise ConnectionError(f"CONNACK inválido: {connack!r}")
+        except OSError as e:
+            if sock is not None:
+                sock.close()
+            if self.connected or not self.reconnects:
+                log_event(logger, logging.WARNING,
+                          f"MQTT indisponível em {self.broker}:{self.port}: {e}")
+            self.connected = False
+            self.reconnects += 1
+            return False
+
+        self.sock = sock
+        self.connected = True
+        log_event(logger, logging.INFO, f"📡 MQTT conectado em {self.broker}:{self.port}")
+        return True
+
+    def _send(self, data):
+        try:
+            self.sock.sendall(data)
+            return True
+        except OSError as e:
+            log_event(logger, logging.WARNING, f"MQTT desconectado: {e}")
+            self._close()
+            return False
+
+    def _drain_incoming(self):
+        # Descarta PINGRESP e demais pacotes do broker; detecta conexão fechada
+        try:
+            while self.sock is not None and select.select([self.sock], [], [], 0)[0]:
+                if not self.sock.recv(4096):
+                    self._close()
+        except OSError:
+            self._close()
+
+    def _close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+        self.sock = None
+        self.connected = False
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Várias câmeras/vídeos em um único processo
+==========================================
+
+Cada fonte (índice de câmera, arquivo de vídeo ou objeto com read()) ganha
+seu próprio StreamState (ROI, buffer de gestos, sequência e palavra alvo) e
+uma thread de captura. O processamento usa recursos compartilhados do
+LibrasDetectorRPi: o pool de workers de visão, o motor e os publicadores.
+
+O escalonamento é round-robin com no máximo um frame em processamento por
+stream, então nenhuma fonte monopoliza os workers.
+
+Uso:
+    python3 multi_camera.py 0 1                 # duas webcams
+    python3 multi_camera.py gravacao1.mp4 gravacao2.mp4 --workers 2
+"""
+
+import argparse
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import cv2
+
+from event_log import get_logger, log_event
+
+logger = get_logger("multi_camera")
+
+
+class FrameSource:
+    """Captura frames de uma fonte em thread própria"""
+
+    def __init__(self, source, name, realtime=None, width=640, height=480, fps=20,
+                 thread_setup=None):
+        self.source = source
+        self.name = name
+        # Chamado no início da thread de captura (afinidade de CPU)
+        self.thread_setup = thread_setup
+        # Câmeras: mantém só o frame mais recente. Arquivos: entrega todos os frames.
+        self.realtime = isinstance(source, int) if realtime is None else realtime
+        self.width = width
+        self.height = height
+        self.fps = fps
+
+        self.cap = None
+        self.thread = None
+        self.running = False
+        self.finished = False
+        self._frames = queue.Queue(maxsize=1 if self.realtime else 2)
+
+        self.captured = 0
+        self.dropped = 0
+
+    def open(self):
+        if hasattr(self.source, "read"):
+            self.cap = self.source
+            return True
+
+        self.cap = cv2.VideoCapture(self.source)
+        if not self.cap.isOpened():
+            return False
+        if isinstance(self.source, int):
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+            self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return True
+
+    def start(self):
+        if not self.open():
+            log_event(logger, logging.ERROR, f"❌ Não foi possível abrir a fonte {self.source}",
+                      stream=self.name)
+            self.finished = True
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self._capture, name=f"capture-{self.name}",
+                                       daemon=True)
+        self.thread.start()
+        return self
+
+    def _capture(self):
+        if self.thread_setup is not None:
+            self.thread_setup()
+        while self.running:
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            self.captured += 1
+            # Instante da captura acompanha o frame (trace de latência)
+            item = (frame, time.perf_counter())
+
+            if self.realtime:
+                # Descarta o frame antigo não consumido
+                try:
+                    self._frames.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+                self._frames.put_nowait(item)
+            else:
+                while self.running:
+                    try:
+                        self._frames.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+        self.finished = True
+
+    def get(self):
+        """Retorna (frame, instante da captura) ou None (não bloqueia)"""
+        try:
+            return self._frames.get_nowait()
+        except queue.Empty:
+            return None
+
+    @property
+    def exhausted(self):
+        return self.finished and self._frames.empty()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+        if self.cap is not None:
+            self.cap.release()
+
+
+class MultiStreamDetector:
+    """Distribui frames de N fontes entre os workers de visão compartilhados"""
+
+    def __init__(self, detector, sources, workers=2, show=False, realtime=None):
+        self.detector = detector
+        self.workers = max(1, workers)
+        self.show = show
+
+        hardware = detector.config.hardware
+        self.streams = []
+        self.sources = []
+        for index, source in enumerate(sources):
+            name = f"cam{index}"
+            # O primeiro stream reutiliza o stream padrão (API REST, teclado)
+            if index == 0:
+                stream = detector.stream
+                stream.name = name
+            else:
+                stream = detector.create_stream(name)
+            self.streams.append(stream)
+            self.sources.append(FrameSource(source, name, realtime,
+                                            hardware.CAMERA_WIDTH, hardware.CAMERA_HEIGHT,
+                                            hardware.CAMERA_FPS,
+                                            lambda: detector.apply_thread_policy("capture")))
+
+        self.executor = None
+        self._next = 0
+        self._latest = {}
+        self.elapsed = 0.0
+
+    def run(self, max_frames=None):
+        """Processa as fontes até todas terminarem, 'q' ou max_frames frames no total"""
+        for source in self.sources:
+            source.start()
+
+        self.executor = ThreadPoolExecutor(max_workers=self.workers,
+                                           thread_name_prefix="vision",
+                                           initializer=self.detector.apply_thread_policy,
+                                           initargs=("vision",))
+        in_flight = {}
+        busy = set()
+        processed = 0
+        start = time.perf_counter()
+        count = len(self.streams)
+
+        try:
+            while True:
+                # Round-robin a partir do stream seguinte ao último escalonado
+                first = self._next
+                for offset in range(count):
+                    if len(in_flight) >= self.workers:
+                        break
+                    index = (first + offset) % count
+                    if index in busy:
+                        continue
+                    item = self.sources[index].get()
+                    if item is None:
+                        continue
+                    frame, capture_time = item
+                    future = self.executor.submit(self.detector.process_frame, frame,
+                                                  self.streams[index], capture_time)
+                    in_flight[future] = index
+                    busy.add(index)
+                    self._next = (index + 1) % count
+
+                if not in_flight:
+                    if all(source.exhausted for source in self.sources):
+                        break
+                    time.sleep(0.001)
+                    continue
+
+                done, _ = wait(in_flight, timeout=0.05, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = in_flight.pop(future)
+                    busy.discard(index)
+                    processed += 1
+                    try:
+                        result = future.result()
+                        if self.show:
+                            self._latest[index] = result
+                    except Exception as e:
+                        log_event(logger, logging.ERROR, f"Erro ao processar frame: {e}",
+                                  stream=self.streams[index].name)
+
+                if self.show and done and self._display():
+                    break
+                if max_frames is not None and processed >= max_frames:
+                    break
+        except KeyboardInterrupt:
+            print("\n🛑 Parando detector...")
+        finally:
+            wait(in_flight)
+            self.elapsed = time.perf_counter() - start
+            self.executor.shutdown(wait=True)
+            for source in self.sources:
+                source.stop()
+            if self.show:
+                cv2.destroyAllWindows()
+
+        return self.get_stats()
+
+    def _display(self):
+        # Janelas só na thread principal; retorna True se 'q' foi pressionado
+        for index, (frame, mask, _) in self._latest.items():
+            cv2.imshow(f"Detector LIBRAS - {self.streams[index].name}", frame)
+        self._latest.clear()
+        return (cv2.waitKey(1) & 0xFF) == ord('q')
+
+    def get_stats(self):
+        """Métricas por stream e agregadas"""
+        per_stream = {}
+        for stream, source in zip(self.streams, self.sources):
+            per_stream[stream.name] = {
+                'frames': stream.frame_count,
+                'captured': source.captured,
+                'dropped': source.dropped,
+                'sequence': list(stream.detected_letters),
+            }
+        total = sum(stream.frame_count for stream in self.streams)
+        return {
+            'streams': per_stream,
+            'frames': total,
+            'elapsed': self.elapsed,
+            'fps': total / self.elapsed if self.elapsed > 0 else 0.0,
+        }
+
+
+def parse_source(value):
+    """Converte '0' em índice de câmera; demais valores são caminhos de arquivo"""
+    return int(value) if value.isdigit() else value
+
+
+if __name__ == "__main__":
+    from config import config
+    from libras_detector_rpi import LibrasDetectorRPi
+
+    parser = argparse.ArgumentParser(description="Detector LIBRAS com várias fontes de vídeo")
+    parser.add_argument("sources", nargs="*", help="Índices de câmera ou arquivos de vídeo")
+    parser.add_argument("--workers", type=int, default=config.advanced.STREAM_WORKERS,
+                        help="Workers de visão compartilhados")
+    parser.add_argument("--show", action="store_true", help="Mostra uma janela por stream")
+    args = parser.parse_args()
+
+    sources = [parse_source(s) for s in args.sources] or config.hardware.CAMERA_SOURCES
+    if not sources:
+        sources = [config.hardware.CAMERA_INDEX]
+
+    detector = LibrasDetectorRPi(motor_pins=config.hardware.MOTOR_PINS)
+    try:
+        # Propaga falhas do GPIO iniciado em background (PARALLEL_STARTUP)
+        detector.wait_hardware()
+        detector.start_services()
+        stats = MultiStreamDetector(detector, sources, args.workers, args.show).run()
+        print(f"✅ {stats['frames']} frames em {stats['elapsed']:.1f}s ({stats['fps']:.1f} FPS)")
+        for name, info in stats['streams'].items():
+            print(f"   {name}: {info}")
+    finally:
+        detector.stop_services()
+        detector.cleanup()
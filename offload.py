@@ -0,0 +1,428 @@
+# -*- coding: utf-8 -*-
+"""
+Processamento remoto da visão do Detector LIBRAS
+================================================
+
+A Raspberry Pi envia a ROI reduzida (OFFLOAD_SCALE) e comprimida em JPEG
+para um worker na rede local. O worker faz a segmentação (máscara de pele
+e seleção do contorno) e a extração de features (geometria e dedos) e
+devolve o contorno e as features. A letra é classificada na Pi, com os
+limites de ClassificationConfig da Pi (o worker pode ter outro
+user_config); estabilização, palavras e motor também continuam na Pi.
+
+Cada frame tem um prazo (OFFLOAD_DEADLINE_MS): se a resposta não chega a
+tempo, o frame é processado localmente e a resposta atrasada é descartada
+quando chegar. Há no máximo uma requisição em voo; enquanto ela estiver
+pendente, os frames seguintes também são locais. Worker fora do ar nunca
+bloqueia o loop: a conexão é refeita em background, com backoff.
+
+Protocolo (TCP, little-endian):
+    requisição   id u32, origem x/y i16, escala f32, tamanho u32, JPEG
+    resposta     id u32, tempo no worker f32 (ms), tamanho do JSON u32,
+                 tamanho do contorno u32, JSON, contorno (int32 x/y)
+
+Worker (na máquina mais forte):
+    python3 offload.py --host 0.0.0.0 --port 5600
+"""
+
+import json
+import logging
+import random
+import select
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import deque, namedtuple
+
+import cv2
+import numpy as np
+
+from event_log import get_logger, log_event
+
+logger = get_logger("offload")
+
+CONNECT_TIMEOUT = 2.0
+
+REQUEST = struct.Struct("<IhhfI")
+RESPONSE = struct.Struct("<IfII")
+
+# Resultado remoto de um frame; contour é None se nenhuma mão foi encontrada
+RemoteResult = namedtuple("RemoteResult", "contour area features mask")
+
+
+def analyze_roi(detector, roi, origin=(0, 0), scale=1.0):
+    """
+    Segmentação e features de uma ROI (possivelmente reduzida por 'scale').
+    O contorno volta na escala e nas coordenadas do frame original.
+    Retorna (contorno, área, (geometry, dedos, letra, pontos)) ou (None, área, None).
+    """
+    mask = detector.create_skin_mask(roi)
+    contour, area = detector.select_hand_contour(mask, area_scale=scale * scale)
+    if contour is None:
+        return None, area / (scale * scale), None
+
+    if scale != 1.0:
+        contour = np.round(contour / scale).astype(np.int32)
+    contour[:, 0, 0] += origin[0]
+    contour[:, 0, 1] += origin[1]
+    return contour, cv2.contourArea(contour), detector.compute_features(contour)
+
+
+def _json_default(value):
+    # Escalares NumPy vindos do OpenCV (pontos de defeito, momentos)
+    if isinstance(value, np.integer):
+        return int(value)
+    return float(value)
+
+
+def encode_response(request_id, compute_ms, contour, area, features):
+    if contour is None:
+        body = {'hand': False, 'area': area}
+        points = b""
+    else:
+        # A letra não vai: quem classifica é a Pi, com os limites dela
+        geometry, finger_count, _, defects = features
+        body = {'hand': True, 'area': area, 'geometry': geometry,
+                'fingers': finger_count, 'points': defects}
+        points = np.ascontiguousarray(contour, dtype=np.int32).tobytes()
+    payload = json.dumps(body, default=_json_default).encode("utf-8")
+    return RESPONSE.pack(request_id, compute_ms, len(payload), len(points)) + payload + points
+
+
+class OffloadClient:
+    """Envia ROIs ao worker e espera a resposta até o prazo do frame"""
+
+    def __init__(self, host, port=5600, deadline_ms=40, scale=1.0, jpeg_quality=80,
+                 reconnect_max=10.0):
+        self.host = host
+        self.port = port
+        self.deadline = deadline_ms / 1000
+        self.scale = scale
+        self.encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), int(jpeg_quality)]
+        self.reconnect_max = reconnect_max
+
+        self.sock = None
+        self.running = False
+        self.thread = None
+        self._wakeup = threading.Event()
+        # Um frame por vez no socket (vários streams caem no processamento local)
+        self._lock = threading.Lock()
+        self._buffer = bytearray()
+        self._pending = None
+        self._next_id = 0
+
+        # Métricas
+        self.frames = 0
+        self.offloaded = 0
+        self.deadline_misses = 0
+        self.busy = 0
+        self.unavailable = 0
+        self.errors = 0
+        self.requests = 0
+        self.bytes_sent = 0
+        self.reconnects = 0
+        self.rtts = deque(maxlen=512)
+        self.remote_times = deque(maxlen=512)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._connect_loop, name="offload-connect",
+                                       daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self._wakeup.set()
+        if self.thread is not None:
+            self.thread.join(timeout=CONNECT_TIMEOUT + 1)
+        with self._lock:
+            self._close()
+
+    def process(self, roi, origin):
+        """RemoteResult do worker ou None (processar localmente)"""
+        self.frames += 1
+        if not self._lock.acquire(blocking=False):
+            self.busy += 1
+            return None
+        try:
+            if self.sock is None:
+                self.unavailable += 1
+                return None
+
+            # Resposta atrasada de um frame anterior ainda em voo
+            if self._pending is not None:
+                self._receive(time.perf_counter(), poll=True)
+                if self._pending is not None:
+                    self.busy += 1
+                    return None
+
+            start = time.perf_counter()
+            request_id = self._send(roi, origin)
+            if request_id is None:
+                return None
+            reply = self._receive(start + self.deadline)
+            if reply is None:
+                if self.sock is not None:
+                    self.deadline_misses += 1
+                return None
+            self.rtts.append(time.perf_counter() - start)
+            result = self._decode(reply, roi.shape[:2], origin)
+            if result is not None:
+                self.offloaded += 1
+            return result
+        finally:
+            self._lock.release()
+
+    def get_stats(self):
+        rtts = sorted(self.rtts)
+        n = len(rtts)
+        return {
+            'connected': self.sock is not None,
+            'frames': self.frames,
+            'offloaded': self.offloaded,
+            'offload_ratio': self.offloaded / self.frames if self.frames else 0.0,
+            'deadline_misses': self.deadline_misses,
+            'busy': self.busy,
+            'unavailable': self.unavailable,
+            'errors': self.errors,
+            'reconnects': self.reconnects,
+            'rtt_p50_ms': rtts[n // 2] * 1000 if n else None,
+            'rtt_p95_ms': rtts[min(n - 1, int(n * 0.95))] * 1000 if n else None,
+            'worker_ms': (sum(self.remote_times) / len(self.remote_times)
+                          if self.remote_times else None),
+            'bytes_per_request': self.bytes_sent / self.requests if self.requests else None,
+        }
+
+    # ------------------------------------------------------------------
+    # Socket
+    # ------------------------------------------------------------------
+
+    def _send(self, roi, origin):
+        small = roi
+        if self.scale != 1.0:
+            small = cv2.resize(roi, None, fx=self.scale, fy=self.scale,
+                               interpolation=cv2.INTER_AREA)
+        ok, jpeg = cv2.imencode(".jpg", small, self.encode_params)
+        if not ok:
+            self.errors += 1
+            return None
+
+        self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+        header = REQUEST.pack(self._next_id, origin[0], origin[1], self.scale, len(jpeg))
+        try:
+            self.sock.sendall(header + jpeg.tobytes())
+        except OSError as e:
+            log_event(logger, logging.WARNING, f"Worker desconectado: {e}")
+            self._close()
+            return None
+        self.requests += 1
+        self.bytes_sent += len(header) + len(jpeg)
+        self._pending = self._next_id
+        return self._next_id
+
+    def _receive(self, deadline, poll=False):
+        """
+        Lê até chegar a resposta pendente ou vencer o prazo; descarta as atrasadas.
+        poll: consulta o socket sem esperar, mesmo com o prazo vencido.
+        """
+        while self.sock is not None:
+            message = self._pop_message()
+            if message is not None:
+                if message[0] == self._pending:
+                    self._pending = None
+                    return message
+                continue
+
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0 and not poll:
+                return None
+            try:
+                if not select.select([self.sock], [], [], max(timeout, 0))[0]:
+                    return None
+                data = self.sock.recv(65536)
+            except OSError:
+                data = b""
+            if not data:
+                log_event(logger, logging.WARNING, "Worker encerrou a conexão")
+                self._close()
+                return None
+            self._buffer += data
+        return None
+
+    def _pop_message(self):
+        if len(self._buffer) < RESPONSE.size:
+            return None
+        request_id, worker_ms, json_size, contour_size = RESPONSE.unpack_from(self._buffer)
+        end = RESPONSE.size + json_size + contour_size
+        if len(self._buffer) < end:
+            return None
+        body = bytes(self._buffer[RESPONSE.size:RESPONSE.size + json_size])
+        points = bytes(self._buffer[RESPONSE.size + json_size:end])
+        del self._buffer[:end]
+        return request_id, worker_ms, body, points
+
+    def _decode(self, reply, roi_shape, origin):
+        _, worker_ms, body, points = reply
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = {'error': 'JSON inválido'}
+        if 'error' in data:
+            self.errors += 1
+            return None
+        self.remote_times.append(worker_ms)
+
+        mask = np.zeros(roi_shape, dtype=np.uint8)
+        if not data['hand']:
+            return RemoteResult(None, data['area'], None, mask)
+
+        contour = np.frombuffer(points, dtype=np.int32).reshape(-1, 1, 2).copy()
+        # Máscara só para a janela de debug: o contorno preenchido
+        cv2.drawContours(mask, [contour], -1, 255, -1, offset=(-origin[0], -origin[1]))
+        features = (data['geometry'], data['fingers'], None,
+                    [(int(x), int(y)) for x, y in data['points']])
+        if 'center' in features[0]:
+            features[0]['center'] = tuple(features[0]['center'])
+        return RemoteResult(contour, data['area'], features, mask)
+
+    def _connect_loop(self):
+        backoff = 0.5
+        while self.running:
+            if self.sock is not None:
+                # Acordado por _close() quando a conexão cai
+                self._wakeup.wait(1.0)
+                self._wakeup.clear()
+                continue
+            try:
+                sock = socket.create_connection((self.host, self.port), timeout=CONNECT_TIMEOUT)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError as e:
+                if not self.reconnects:
+                    log_event(logger, logging.WARNING,
+                              f"Worker indisponível em {self.host}:{self.port}: {e}")
+                self.reconnects += 1
+                self._wakeup.wait(backoff * random.uniform(0.8, 1.2))
+                self._wakeup.clear()
+                backoff = min(backoff * 2, self.reconnect_max)
+                continue
+            with self._lock:
+                self._buffer.clear()
+                self._pending = None
+                self.sock = sock
+            backoff = 0.5
+            log_event(logger, logging.INFO, f"🛰️ Worker conectado em {self.host}:{self.port}")
+
+    def _close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = None
+        self._pending = None
+        self._buffer.clear()
+        self._wakeup.set()
+
+
+class _WorkerHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        sock = self.request
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        detector = self.server.detector
+        while True:
+            header = self._read(REQUEST.size)
+            if header is None:
+                return
+            request_id, origin_x, origin_y, scale, size = REQUEST.unpack(header)
+            jpeg = self._read(size)
+            if jpeg is None:
+                return
+
+            start = time.perf_counter()
+            roi = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if roi is None or scale <= 0:
+                payload = json.dumps({'error': 'ROI inválida'}).encode("utf-8")
+                response = RESPONSE.pack(request_id, 0.0, len(payload), 0) + payload
+            else:
+                contour, area, features = analyze_roi(detector, roi, (origin_x, origin_y), scale)
+                compute_ms = (time.perf_counter() - start) * 1000
+                response = encode_response(request_id, compute_ms, contour, area, features)
+            try:
+                sock.sendall(response)
+            except OSError:
+                return
+            self.server.requests += 1
+
+    def _read(self, size):
+        chunks = bytearray()
+        while len(chunks) < size:
+            try:
+                data = self.request.recv(size - len(chunks))
+            except OSError:
+                return None
+            if not data:
+                return None
+            chunks += data
+        return bytes(chunks)
+
+
+class OffloadWorker(socketserver.ThreadingTCPServer):
+    """Serviço de visão: uma thread por Raspberry Pi conectada"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, detector, host="0.0.0.0", port=5600):
+        super().__init__((host, port), _WorkerHandler)
+        self.detector = detector
+        self.requests = 0
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, name="offload-worker",
+                                       daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    import argparse
+
+    from config import Config
+    from libras_detector_rpi import LibrasDetectorRPi
+
+    parser = argparse.ArgumentParser(description="Worker de visão remoto do Detector LIBRAS")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=Config().network.OFFLOAD_PORT)
+    args = parser.parse_args()
+
+    cfg = Config()
+    cfg.load_from_file()
+    # O worker só usa a visão: sem GPIO real e sem serviços de rede
+    cfg.hardware.USE_FAKE_GPIO = True
+    detector = LibrasDetectorRPi(motor_pins=cfg.hardware.MOTOR_PINS, cfg=cfg)
+    worker = OffloadWorker(detector, args.host, args.port)
+    # Linha lida por quem inicia o worker com --port 0 (benchmark)
+    print(f"🛰️ Worker de visão ouvindo em {args.host}:{worker.port}", flush=True)
+    try:
+        worker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.server_close()
+        detector.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+Preview remoto do Detector LIBRAS (MJPEG / WebSocket)
+=====================================================
+
+Substitui o X forwarding das janelas do OpenCV. O detector apenas entrega a
+referência do frame anotado; uma thread de codificação reduz a resolução e
+gera o JPEG no máximo uma vez por tick (PREVIEW_FPS), e só quando há
+espectadores. Os mesmos bytes são enviados a todos os clientes, então o
+custo de CPU não cresce com o número de espectadores.
+
+Clientes lentos não acumulam buffer: cada cliente sempre envia o JPEG mais
+recente quando termina o envio anterior, descartando os intermediários.
+
+Rotas:
+    GET /              página HTML com o preview
+    GET /stream.mjpg   stream MJPEG (multipart/x-mixed-replace)
+    GET /ws            WebSocket, um JPEG por mensagem binária; responde a ping
+                       e a close do cliente (mensagens do cliente são ignoradas)
+"""
+
+import asyncio
+import base64
+import hashlib
+import logging
+import socket
+import struct
+import threading
+import time
+
+import cv2
+
+from event_log import get_logger, log_event
+
+logger = get_logger("preview")
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+BOUNDARY = "librasframe"
+
+# Limite do buffer de escrita por cliente: acima disso o cliente é "lento"
+WRITE_BUFFER_HIGH = 64 * 1024
+
+# Opcodes WebSocket (RFC 6455) e maior mensagem aceita do cliente
+WS_BINARY = 0x2
+WS_CLOSE = 0x8
+WS_PING = 0x9
+WS_PONG = 0xA
+WS_MAX_CLIENT_MESSAGE = 4096
+
+INDEX_HTML = (
+    "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+    "<title>Detector LIBRAS</title></head>"
+    "<body style='margin:0;background:#000'>"
+    "<img src='/stream.mjpg' style='width:100%'></body></html>"
+)
+
+
+class PreviewServer:
+    """Codifica o frame anotado uma vez por tick e distribui para N clientes"""
+
+    def __init__(self, host="0.0.0.0", port=8081, fps=5, width=320, quality=70):
+        self.host = host
+        self.port = port
+        self.interval = 1.0 / fps if fps > 0 else 0
+        self.width = width
+        self.quality = quality
+
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.encoder_thread = None
+        self.running = False
+        self._ready = threading.Event()
+
+        # Frame mais recente entregue pelo detector (troca atômica de referência)
+        self._pending_frame = None
+        self._frame_event = threading.Event()
+
+        # JPEG mais recente compartilhado por todos os clientes
+        self.jpeg = None
+        self.sequence = 0
+        self._new_jpeg = None
+
+        # Métricas
+        self.clients = 0
+        self.encoded_frames = 0
+        self.encode_time = 0.0
+        self.sent_frames = 0
+        self.dropped_frames = 0
+
+    def start(self):
+        """Inicia o servidor e a thread de codificação"""
+        self.running = True
+        self.thread = threading.Thread(target=self._serve, name="preview-server", daemon=True)
+        self.thread.start()
+        self._ready.wait(timeout=5)
+
+        self.encoder_thread = threading.Thread(target=self._encode_loop,
+                                               name="preview-encoder", daemon=True)
+        self.encoder_thread.start()
+        log_event(logger, logging.INFO, f"📺 Preview em http://{self.host}:{self.port}/")
+        return self
+
+    def stop(self):
+        """Encerra servidor e codificador"""
+        if not self.running:
+            return
+        self.running = False
+        self._frame_event.set()
+        if self.encoder_thread is not None:
+            self.encoder_thread.join(timeout=5)
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+
+    def publish(self, frame):
+        """Entrega o frame anotado (chamado pelo loop de frames; sem cópia)"""
+        if self.clients:
+            self._pending_frame = frame
+            self._frame_event.set()
+
+    # ------------------------------------------------------------------
+    # Codificação
+    # ------------------------------------------------------------------
+
+    def _encode_loop(self):
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        next_tick = time.monotonic()
+        while self.running:
+            if not self._frame_event.wait(timeout=0.5):
+                continue
+            self._frame_event.clear()
+
+            now = time.monotonic()
+            if now < next_tick:
+                time.sleep(next_tick - now)
+            next_tick = max(next_tick + self.interval, time.monotonic())
+
+            frame, self._pending_frame = self._pending_frame, None
+            if frame is None or not self.clients:
+                continue
+
+            start = time.perf_counter()
+            height, width = frame.shape[:2]
+            if self.width and width > self.width:
+                size = (self.width, int(height * self.width / width))
+                frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            ok, buffer = cv2.imencode(".jpg", frame, params)
+            self.encode_time += time.perf_counter() - start
+            if not ok:
+                continue
+
+            self.encoded_frames += 1
+            if self.loop is not None and self.loop.is_running():
+                self.loop.call_soon_threadsafe(self._broadcast, buffer.tobytes())
+
+    def _broadcast(self, jpeg):
+        # Executa no event loop: um único objeto bytes para todos os clientes
+        self.jpeg = jpeg
+        self.sequence += 1
+        new_jpeg, self._new_jpeg = self._new_jpeg, asyncio.Event()
+        new_jpeg.set()
+
+    async def _next_jpeg(self, last_sequence):
+        """Aguarda um JPEG mais novo que last_sequence e retorna o mais recente"""
+        while self.sequence == last_sequence:
+            await self._new_jpeg.wait()
+        return self.sequence, self.jpeg
+
+    # ------------------------------------------------------------------
+    # Servidor HTTP / WebSocket
+    # ------------------------------------------------------------------
+
+    def _serve(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._new_jpeg = asyncio.Event()
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self._handle_client, self.host, self.port))
+            self.port = self.server.sockets[0].getsockname()[1]
+        except OSError as e:
+            log_event(logger, logging.ERROR, f"❌ Erro ao iniciar preview: {e}")
+            self._ready.set()
+            return
+
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.server.close()
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.run_until_complete(self.server.wait_closed())
+            self.loop.close()
+
+    async def _handle_client(self, reader, writer):
+        # Buffers pequenos no asyncio e no kernel: cliente lento perde frames em vez de acumular
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER_HIGH)
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, WRITE_BUFFER_HIGH)
+        try:
+            request_line = await reader.readline()
+            parts = request_line.decode("latin-1").split()
+            if len(parts) < 2:
+                return
+            path = parts[1].split("?", 1)[0]
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            if path == "/stream.mjpg":
+                await self._stream_mjpeg(writer)
+            elif path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                await self._stream_websocket(reader, writer,
+                                             headers.get("sec-websocket-key", ""))
+            elif path == "/":
+                body = INDEX_HTML.encode("utf-8")
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n"
+                             b"Content-Length: %d\r\nConnection: close\r\n\r\n" % len(body) + body)
+                await writer.drain()
+            else:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n"
+                             b"Connection: close\r\n\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def _fan_out(self, writer, send):
+        """Envia sempre o JPEG mais recente; frames gerados durante o envio são descartados"""
+        self.clients += 1
+        try:
+            sequence = 0
+            while self.running:
+                latest, jpeg = await self._next_jpeg(sequence)
+                if sequence:
+                    self.dropped_frames += latest - sequence - 1
+                sequence = latest
+                send(jpeg)
+                await writer.drain()
+                self.sent_frames += 1
+        finally:
+            self.clients -= 1
+
+    async def _stream_mjpeg(self, writer):
+        writer.write(("HTTP/1.1 200 OK\r\n"
+                      f"Content-Type: multipart/x-mixed-replace; boundary={BOUNDARY}\r\n"
+                      "Cache-Control: no-cache\r\nConnection: close\r\n\r\n").encode("latin-1"))
+
+        def send(jpeg):
+            writer.write(b"--%s\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n"
+                         % (BOUNDARY.encode("latin-1"), len(jpeg)))
+            writer.write(jpeg)
+            writer.write(b"\r\n")
+
+        await self._fan_out(writer, send)
+
+    async def _stream_websocket(self, reader, writer, key):
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode("latin-1")).digest())
+        writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                     b"Connection: Upgrade\r\nSec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+
+        def send(jpeg):
+            writer.write(websocket_header(len(jpeg)))
+            writer.write(jpeg)
+
+        # Envio dos JPEGs e leitura do cliente em paralelo: o close (ou a queda
+        # da conexão) detectado na leitura encerra o envio
+        sender = asyncio.ensure_future(self._fan_out(writer, send))
+        receiver = asyncio.ensure_future(self._read_websocket(reader, writer))
+        done, pending = await asyncio.wait({sender, receiver},
+                                           return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for task in done:
+            task.result()
+
+    async def _read_websocket(self, reader, writer):
+        """Lê frames do cliente: responde ping com pong e close com close; retorna no close"""
+        while True:
+            head = await reader.readexactly(2)
+            opcode = head[0] & 0x0F
+            length = head[1] & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", await reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", await reader.readexactly(8))[0]
+            if length > WS_MAX_CLIENT_MESSAGE:
+                # 1009: mensagem grande demais
+                writer.write(websocket_header(2, WS_CLOSE) + struct.pack("!H", 1009))
+                return
+            mask = await reader.readexactly(4) if head[1] & 0x80 else None
+            payload = await reader.readexactly(length)
+            if mask is not None:
+                payload = bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+
+            if opcode == WS_CLOSE:
+                # Ecoa o código de status, como pede o protocolo
+                writer.write(websocket_header(len(payload[:2]), WS_CLOSE) + payload[:2])
+                return
+            if opcode == WS_PING:
+                writer.write(websocket_header(len(payload), WS_PONG) + payload)
+
+    def get_stats(self):
+        """Retorna métricas do preview"""
+        return {
+            'clients': self.clients,
+            'encoded_frames': self.encoded_frames,
+            'encode_ms': (self.encode_time / self.encoded_frames * 1000
+                          if self.encoded_frames else 0.0),
+            'sent_frames': self.sent_frames,
+            'dropped_frames': self.dropped_frames,
+        }
+
+
+def websocket_header(length, opcode=WS_BINARY):
+    """Cabeçalho de um frame WebSocket do servidor (FIN + opcode, sem máscara)"""
+    first = 0x80 | opcode
+    if length < 126:
+        return struct.pack("!BB", first, length)
+    if length < 1 << 16:
+        return struct.pack("!BBH", first, 126, length)
+    return struct.pack("!BBQ", first, 127, length)
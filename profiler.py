@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Profiler por amostragem do Detector LIBRAS
+==========================================
+
+Liga e desliga com o detector rodando (SIGUSR1 / SIGUSR2 ou o comando
+'prof on|off' do canal de comandos). Uma thread própria lê as pilhas das
+threads de interesse (principal, captura, visão e motor) PROFILER_RATE
+vezes por segundo via sys._current_frames(); as threads do detector não
+são instrumentadas.
+
+Desligado, não há thread nem hook: custo zero. Ligado, o custo é limitado
+pela taxa de amostragem e pela profundidade máxima da pilha.
+
+A saída é o formato "collapsed stacks" (uma linha 'a;b;c N' por pilha),
+aceito por flamegraph.pl, speedscope e inferno:
+    kill -USR1 $(pgrep -f libras_detector_rpi.py)   # inicia
+    kill -USR2 $(pgrep -f libras_detector_rpi.py)   # para (o arquivo é gravado em background)
+    flamegraph.pl ~/libras_detector/profiles/perfil-*.folded > perfil.svg
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+
+from event_log import get_logger, log_event
+
+logger = get_logger("profiler")
+
+# Prefixos dos nomes de thread amostrados por padrão
+DEFAULT_THREADS = ("MainThread", "capture", "vision", "motor")
+
+
+class SamplingProfiler:
+    """Amostra pilhas de threads selecionadas e acumula pilhas colapsadas"""
+
+    def __init__(self, output_dir, rate=100, max_depth=64, threads=DEFAULT_THREADS):
+        self.output_dir = os.path.expanduser(output_dir)
+        self.interval = 1.0 / rate if rate > 0 else 0.01
+        self.max_depth = max_depth
+        self.threads = tuple(threads)
+
+        self.stacks = {}
+        self.samples = 0
+        self.started_at = None
+        self.thread = None
+        self.running = False
+        self._stop = threading.Event()
+        # Reentrante: o sinal pode chegar enquanto a thread principal está em start()/stop()
+        self._lock = threading.RLock()
+
+    def start(self):
+        """Inicia a amostragem; retorna False se já estiver ativa"""
+        with self._lock:
+            if self.running:
+                return False
+            self.running = True
+            self.stacks = {}
+            self.samples = 0
+            self.started_at = time.time()
+            # Evento e pilhas próprios desta sessão: uma sessão anterior pode
+            # ainda estar gravando seu arquivo
+            self._stop = threading.Event()
+            self.thread = threading.Thread(target=self._sample_loop,
+                                           args=(self._stop, self.stacks, self._path()),
+                                           name="profiler", daemon=True)
+            self.thread.start()
+        log_event(logger, logging.INFO,
+                  f"🔬 Profiler ligado ({1 / self.interval:.0f} amostras/s)")
+        return True
+
+    def stop(self, wait=False):
+        """
+        Para a amostragem; a thread do profiler grava o arquivo ao sair, então
+        quem chama (sinal ou comando no loop de frames) não bloqueia.
+        wait: aguarda a gravação (encerramento do detector, benchmarks).
+        Retorna o caminho do arquivo (ou None se não estava ativo).
+        """
+        with self._lock:
+            if not self.running:
+                return None
+            self.running = False
+            self._stop.set()
+            thread = self.thread
+        if wait:
+            thread.join(timeout=2)
+        return self._path()
+
+    def _path(self):
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        return os.path.join(self.output_dir, f"perfil-{stamp}.folded")
+
+    def write(self, path=None, stacks=None):
+        """Grava as pilhas colapsadas acumuladas"""
+        if path is None:
+            path = self._path()
+        if stacks is None:
+            stacks = self.stacks
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as output:
+                for stack, count in sorted(stacks.items(), key=lambda item: -item[1]):
+                    output.write(f"{stack} {count}\n")
+        except OSError as e:
+            log_event(logger, logging.ERROR, f"❌ Erro ao gravar perfil: {e}")
+            return None
+        return path
+
+    def _wanted(self, name):
+        return not self.threads or name.startswith(self.threads)
+
+    def _sample_loop(self, stop, stacks, path):
+        own = threading.get_ident()
+        next_tick = time.monotonic()
+        samples = 0
+        while not stop.is_set():
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                name = names.get(ident)
+                if ident == own or name is None or not self._wanted(name):
+                    continue
+                stack = self._collapse(name, frame)
+                stacks[stack] = stacks.get(stack, 0) + 1
+            samples += 1
+            if stacks is self.stacks:
+                self.samples = samples
+
+            # Taxa fixa; se a amostragem atrasar, pula ticks em vez de acumular
+            next_tick = max(next_tick + self.interval, time.monotonic())
+            stop.wait(next_tick - time.monotonic())
+
+        # Gravação fora da thread que pediu a parada
+        path = self.write(path, stacks)
+        log_event(logger, logging.INFO,
+                  f"🔬 Profiler desligado: {samples} amostras em {path}")
+
+    def _collapse(self, thread_name, frame):
+        frames = []
+        while frame is not None and len(frames) < self.max_depth:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:"
+                          f"{code.co_firstlineno})")
+            frame = frame.f_back
+        frames.append(thread_name)
+        return ";".join(reversed(frames))
+
+
+def install_signal_handlers(profiler):
+    """SIGUSR1 liga e SIGUSR2 desliga o profiler (somente na thread principal)"""
+    import signal
+
+    if not hasattr(signal, "SIGUSR1"):
+        return False
+
+    signal.signal(signal.SIGUSR1, lambda signum, frame: profiler.start())
+    signal.signal(signal.SIGUSR2, lambda signum, frame: profiler.stop())
+    return True
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+API REST local de controle e status do Detector LIBRAS
+======================================================
+
+Servidor HTTP mínimo em asyncio rodando em thread e event loop próprios.
+O loop de frames nunca espera pela API: o status é lido de um snapshot
+publicado pelo detector a cada frame, e os comandos entram na fila de
+comandos do detector, que é esvaziada uma vez por frame.
+
+A thread da API disputa a CPU com o loop de frames, então o custo dela
+é limitado: o JSON do status é gerado uma vez por snapshot (não por
+requisição) e o servidor atende no máximo max_rate requisições por
+segundo; as excedentes esperam a vez antes de serem processadas.
+
+Endpoints:
+    GET  /status          letra atual, sequência, estado do motor, FPS
+    GET  /latency         distribuição da latência gesto → motor por etapa
+    GET  /offload         RTT e fração de frames processados no worker remoto
+    POST /word            {"word": "OLA"} muda a palavra alvo
+    POST /reset           limpa sequência e buffer de gestos
+    POST /motor/stop      para o motor
+    POST /motor/start     aciona o motor manualmente
+"""
+
+import asyncio
+import json
+import logging
+import threading
+
+from event_log import get_logger, log_event
+
+logger = get_logger("rest_api")
+
+MAX_BODY_SIZE = 4096
+
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large"}
+
+
+class RestApiServer:
+    """API REST do detector em uma thread com event loop asyncio próprio"""
+
+    def __init__(self, detector, host="0.0.0.0", port=8080, max_rate=0):
+        """max_rate: requisições por segundo no total (0 = sem limite)"""
+        self.detector = detector
+        self.host = host
+        self.port = port
+        self.max_rate = max_rate
+        self._next_slot = 0.0
+        # JSON do último snapshot de status (o snapshot é trocado, nunca alterado)
+        self._status_source = None
+        self._status_body = None
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.request_count = 0
+        self._ready = threading.Event()
+
+        self.routes = {
+            ("GET", "/status"): self.handle_status,
+            ("GET", "/latency"): self.handle_latency,
+            ("GET", "/offload"): self.handle_offload,
+            ("POST", "/word"): self.handle_word,
+            ("POST", "/reset"): self.handle_command("reset"),
+            ("POST", "/motor/stop"): self.handle_command("stop_motor"),
+            ("POST", "/motor/start"): self.handle_command("trigger_motor"),
+        }
+
+    def start(self):
+        """Inicia o servidor em thread separada e aguarda o bind"""
+        self.thread = threading.Thread(target=self._serve, name="rest-api", daemon=True)
+        self.thread.start()
+        self._ready.wait(timeout=5)
+        log_event(logger, logging.INFO, f"🌐 API REST em http://{self.host}:{self.port}")
+        return self
+
+    def stop(self):
+        """Encerra o servidor e a thread do event loop"""
+        if self.thread is None:
+            return
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+        self.thread = None
+
+    def _serve(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self._handle_client, self.host, self.port))
+            # Porta real quando port=0 (porta efêmera)
+            self.port = self.server.sockets[0].getsockname()[1]
+        except OSError as e:
+            log_event(logger, logging.ERROR, f"❌ Erro ao iniciar API REST: {e}")
+            self._ready.set()
+            return
+
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.server.close()
+            # Conexões keep-alive abertas são canceladas antes de fechar o loop
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.run_until_complete(self.server.wait_closed())
+            self.loop.close()
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "requisição inválida"})
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Content-Length inválido"})
+                    break
+                if length > MAX_BODY_SIZE:
+                    await self._respond(writer, 413, {"error": "corpo muito grande"})
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                await self._throttle()
+                status, payload = self.dispatch(method, path.split("?", 1)[0], body)
+                keep_alive = (version == "HTTP/1.1"
+                              and headers.get("connection", "").lower() != "close")
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # CancelledError: servidor sendo encerrado com conexões keep-alive abertas
+            pass
+        finally:
+            writer.close()
+
+    async def _throttle(self):
+        """Espaça as requisições em 1/max_rate segundos (todas as conexões juntas)"""
+        if not self.max_rate:
+            return
+        now = self.loop.time()
+        slot = max(self._next_slot, now)
+        self._next_slot = slot + 1.0 / self.max_rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _respond(self, writer, status, payload, keep_alive=False):
+        if isinstance(payload, bytes):
+            body = payload  # JSON já serializado
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    def dispatch(self, method, path, body):
+        """Roteia a requisição e retorna (status HTTP, payload JSON)"""
+        self.request_count += 1
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                return 405, {"error": f"método {method} não permitido"}
+            return 404, {"error": f"rota {path} não encontrada"}
+
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {"error": "JSON inválido"}
+        return handler(data)
+
+    def handle_status(self, data):
+        status = self.detector.status
+        if status is not self._status_source:
+            self._status_body = json.dumps(status, ensure_ascii=False).encode("utf-8")
+            self._status_source = status
+        return 200, self._status_body
+
+    def handle_latency(self, data):
+        return 200, self.detector.tracer.get_distributions()
+
+    def handle_offload(self, data):
+        offload = self.detector.offload
+        return 200, offload.get_stats() if offload is not None else {'enabled': False}
+
+    def handle_word(self, data):
+        word = str(data.get("word", "")).upper().strip() if isinstance(data, dict) else ""
+        if not word:
+            return 400, {"error": "campo 'word' obrigatório"}
+        self.detector.submit_command("set_word", word=word)
+        return 202, {"queued": "set_word", "word": word}
+
+    def handle_command(self, name):
+        def handler(data):
+            self.detector.submit_command(name)
+            return 202, {"queued": name}
+        return handler
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+Log binário de sessão do Detector LIBRAS
+========================================
+
+Um registro de largura fixa por frame (instante, frame, área do contorno,
+campos de analyze_hand_geometry, dedos, letra bruta, letra estabilizada,
+confiança e estado do motor), gravado em um arquivo mapeado em memória.
+Escrever um frame é um único Struct.pack_into no mapa (poucos µs); o sistema
+operacional grava as páginas no cartão SD em segundo plano.
+
+Formato do arquivo:
+    cabeçalho de HEADER_SIZE bytes: magic, tamanho do registro, número de
+    registros válidos, capacidade e o dtype NumPy em JSON;
+    em seguida 'capacidade' registros (arquivo esparso, pré-alocado).
+
+Quando um arquivo enche, o log passa para o próximo, que já foi criado e
+pré-alocado por uma thread em segundo plano; a mesma thread fecha o
+arquivo cheio e apaga os antigos (só os MAX_FILES mais recentes são
+mantidos). A thread de frames nunca cria, trunca ou sincroniza arquivos
+nem espera por eles: se o próximo arquivo ainda não está pronto (ou a
+pré-alocação falhou, ex. cartão cheio), o registro é descartado e contado
+em 'dropped' até a thread de apoio conseguir.
+
+Leitura sem cópia, para análise:
+
+    from session_log import read_session
+    frames = read_session("~/libras_detector/sessions/sessao-20240101-120000-000.bin")
+    frames[frames['stable_letter'] == b'A']['solidity'].mean()
+"""
+
+import glob
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+
+import numpy as np
+
+MAGIC = b"LIBRASv1"
+HEADER_SIZE = 1024
+# magic, tamanho do registro, registros válidos, capacidade
+HEADER_STRUCT = struct.Struct("<8sIQQ")
+COUNT_OFFSET = 12
+COUNT_STRUCT = struct.Struct("<Q")
+
+LETTER_SIZE = 10
+
+# Campos na ordem gravada; o Struct abaixo tem exatamente o mesmo layout (sem padding)
+RECORD_DTYPE = np.dtype([
+    ('ts', '<f8'),              # time.time()
+    ('frame', '<u4'),
+    ('stream', '<u2'),          # StreamState.index módulo 65536
+    ('area', '<f4'),
+    ('cx', '<i2'),
+    ('cy', '<i2'),
+    ('perimeter', '<f4'),
+    ('aspect_ratio', '<f4'),
+    ('solidity', '<f4'),
+    ('compactness', '<f4'),
+    ('defect_count', '<u2'),
+    ('extent', '<f4'),
+    ('width', '<u2'),
+    ('height', '<u2'),
+    ('fingers', 'u1'),
+    ('confidence', '<f4'),
+    ('raw_letter', f'S{LETTER_SIZE}'),
+    ('stable_letter', f'S{LETTER_SIZE}'),
+    ('motor', 'u1'),            # bit 0: motor girando, bit 1: palavra ativou o motor
+])
+RECORD_STRUCT = struct.Struct(f"<dIHfhhffffHfHHBf{LETTER_SIZE}s{LETTER_SIZE}sB")
+
+assert RECORD_STRUCT.size == RECORD_DTYPE.itemsize
+
+# Encerra a thread de apoio
+_STOP = object()
+
+MOTOR_RUNNING = 1
+MOTOR_ACTIVATED = 2
+
+
+class SessionLog:
+    """Grava registros de frame em arquivos mapeados em memória, com rotação"""
+
+    def __init__(self, directory, records_per_file=100000, max_files=10):
+        self.directory = os.path.expanduser(directory)
+        self.capacity = records_per_file
+        self.max_files = max_files
+
+        self.path = None
+        self._file = None
+        self._map = None
+        self.count = 0
+        self.files = 0
+        # Registros descartados sem arquivo pronto para recebê-los
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._pack = RECORD_STRUCT.pack_into
+        self._size = RECORD_STRUCT.size
+        self._pack_count = COUNT_STRUCT.pack_into
+
+        # Próximo arquivo, pré-alocado em background: (caminho, arquivo, mapa).
+        # Thread persistente: criar uma thread por rotação custaria a espera do start()
+        self._spare = None
+        self._jobs = queue.Queue()
+        self._ready = threading.Event()
+        self._worker = threading.Thread(target=self._work, name="session-log", daemon=True)
+        self._worker.start()
+        self._jobs.put(None)
+        # O primeiro arquivo fica pronto antes do primeiro frame
+        self._ready.wait()
+
+    def append(self, ts, frame, stream, area, geometry, fingers, confidence,
+               raw_letter, stable_letter, motor):
+        """Grava um registro (thread-safe); letras são truncadas em LETTER_SIZE bytes"""
+        get = geometry.get
+        cx, cy = get('center', (0, 0))
+        with self._lock:
+            if (self._map is None or self.count >= self.capacity) and not self._rotate():
+                self.dropped += 1
+                return
+            self._pack(self._map, HEADER_SIZE + self.count * self._size,
+                       ts, frame, stream & 0xFFFF, area, cx, cy,
+                       get('perimeter', 0.0), get('aspect_ratio', 0.0),
+                       get('solidity', 0.0), get('compactness', 0.0),
+                       get('defect_count', 0), get('extent', 0.0),
+                       get('width', 0), get('height', 0),
+                       fingers, confidence,
+                       raw_letter.encode('ascii', 'replace'),
+                       stable_letter.encode('ascii', 'replace'), motor)
+            self.count += 1
+            self._pack_count(self._map, COUNT_OFFSET, self.count)
+
+    def close(self):
+        with self._lock:
+            if not self._worker.is_alive():
+                return
+            self._ready.wait()
+            self._jobs.put(_STOP)
+            self._worker.join()
+            if self._map is not None:
+                self._finish((self._file, self._map, self.count))
+                self._map = None
+                self._file = None
+            if self._spare is not None:
+                # Pré-alocado e nunca usado
+                path, spare_file, spare_map = self._spare
+                self._spare = None
+                spare_map.close()
+                spare_file.close()
+                os.remove(path)
+
+    def _rotate(self):
+        """Troca para o arquivo pré-alocado; False se ele não está disponível"""
+        if not self._ready.is_set():
+            # A thread de apoio ainda está preparando o próximo arquivo
+            return False
+        self._ready.clear()
+        spare, self._spare = self._spare, None
+        if spare is None:
+            # A pré-alocação falhou (erro de disco): nova tentativa em background
+            self._jobs.put(None)
+            return False
+        full = (self._file, self._map, self.count) if self._map is not None else None
+        self.path, self._file, self._map = spare
+        self.count = 0
+        self._jobs.put(full)
+        return True
+
+    def _work(self):
+        """Thread de apoio: fecha o arquivo cheio, apaga antigos e pré-aloca o próximo"""
+        while True:
+            full = self._jobs.get()
+            if full is _STOP:
+                return
+            if full is not None:
+                try:
+                    self._finish(full)
+                except OSError:
+                    pass
+            try:
+                self._prune()
+                self._spare = self._open_next()
+            except OSError:
+                self._spare = None
+            self._ready.set()
+
+    def _open_next(self):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.directory, f"sessao-{stamp}-{self.files:03d}.bin")
+        self.files += 1
+
+        header = bytearray(HEADER_SIZE)
+        HEADER_STRUCT.pack_into(header, 0, MAGIC, self._size, 0, self.capacity)
+        descr = json.dumps(RECORD_DTYPE.descr).encode('ascii')
+        header[HEADER_STRUCT.size:HEADER_STRUCT.size + len(descr)] = descr
+
+        log_file = open(path, "w+b")
+        try:
+            log_file.write(header)
+            # Arquivo esparso: os blocos só ocupam o cartão quando escritos
+            log_file.truncate(HEADER_SIZE + self.capacity * self._size)
+            return path, log_file, mmap.mmap(log_file.fileno(), 0)
+        except OSError:
+            log_file.close()
+            os.remove(path)
+            raise
+
+    def _finish(self, full):
+        log_file, log_map, count = full
+        log_map.flush()
+        log_map.close()
+        # Remove a parte não usada do arquivo
+        log_file.truncate(HEADER_SIZE + count * self._size)
+        log_file.close()
+
+    def _prune(self):
+        # O arquivo em uso está entre os mantidos; o próximo ainda não existe
+        paths = sorted(glob.glob(os.path.join(self.directory, "sessao-*.bin")))
+        for path in paths[:-self.max_files] if self.max_files > 0 else []:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def read_session(path):
+    """Abre um log de sessão como array estruturado NumPy (np.memmap, sem cópia)"""
+    path = os.path.expanduser(path)
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    magic, record_size, count, _ = HEADER_STRUCT.unpack_from(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path} não é um log de sessão do detector")
+    descr = header[HEADER_STRUCT.size:].rstrip(b"\0").decode('ascii')
+    dtype = np.dtype([tuple(field) for field in json.loads(descr)])
+    if dtype.itemsize != record_size:
+        raise ValueError(f"{path}: tamanho de registro inconsistente")
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=HEADER_SIZE, shape=(count,))
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+API de detecção embutível
+=========================
+
+detect_stream(frames) passa frames BGR de qualquer iterável (ou iterável
+assíncrono) pelo pipeline do detector, sem câmera, janela, teclado nem
+GPIO, e devolve os eventos sob demanda:
+
+    {'kind': 'frame',  'frame', 'letter', 'confidence', 'confirmed',
+                       'area', 'fingers', 'geometry', 'dropped', 'stream'}
+    {'kind': 'letter', 'frame', 'letter', 'confidence', 'sequence', 'stream'}
+    {'kind': 'word',   'frame', 'word', 'stream'}
+
+'letter' é a letra confirmada pela estabilização; 'word' é a palavra alvo
+formada. Sem mão no frame, 'area', 'fingers' e 'geometry' são None.
+
+Uma thread (ou tarefa, no caso assíncrono) lê a fonte para uma fila
+limitada, e cada frame só é processado quando o consumidor pede o
+próximo evento. Com o consumidor lento, a fila enche e a política
+decide (AdvancedConfig.STREAM_DROP_POLICY):
+
+    block        a leitura da fonte espera (vídeos gravados: nenhum frame perdido)
+    drop_oldest  descarta o frame mais antigo da fila (câmera ao vivo)
+    drop_newest  descarta o frame que acabou de chegar
+
+'dropped' conta os frames descartados até ali. Importar este módulo não
+importa o detector nem RPi.GPIO; o motor fica desligado, a menos que
+motor=True.
+
+Uso:
+    from stream_api import detect_stream
+
+    for event in detect_stream(frames, drop_policy="block"):
+        if event['kind'] == 'word':
+            print(event['word'])
+
+    async for event in detect_stream(async_frames):
+        ...
+"""
+
+import asyncio
+import copy
+import logging
+import threading
+import time
+from collections import deque
+
+from config import AdvancedConfig
+
+DROP_POLICIES = ("block", "drop_oldest", "drop_newest")
+
+
+def make_stream_detector(cfg=None, motor=False):
+    """
+    Detector sem janela que guarda os eventos 'letter' e 'word' de cada frame.
+    cfg: Config (None carrega a configuração do usuário); o detector usa uma cópia.
+    motor: False usa GPIO simulado e não aciona o motor na palavra alvo.
+    O detector não configura o logging: as mensagens vão para o logger
+    "libras" e seguem os handlers da aplicação. Ao terminar, chame
+    detector.release().
+    """
+    from config import Config
+    from event_log import get_logger, log_event
+    from libras_detector_rpi import LibrasDetectorRPi
+
+    class StreamDetector(LibrasDetectorRPi):
+        events = None
+        use_motor = False
+
+        def publish_event(self, kind, **payload):
+            if self.events is not None and kind in ("letter", "word"):
+                self.events.append(dict(payload, kind=kind))
+            super().publish_event(kind, **payload)
+
+        def activate_motor(self, stream=None):
+            if self.use_motor:
+                super().activate_motor(stream)
+
+    if cfg is None:
+        logger = get_logger("stream")
+        cfg = Config()
+        cfg.load_from_file(report=lambda message: log_event(logger, logging.INFO,
+                                                            message.strip()))
+    else:
+        cfg = copy.deepcopy(cfg)
+    if not motor:
+        cfg.hardware.USE_FAKE_GPIO = True
+    detector = StreamDetector(motor_pins=cfg.hardware.MOTOR_PINS, cfg=cfg,
+                              configure_logging=False)
+    detector.use_motor = motor
+    return detector
+
+
+class FrameQueue:
+    """Fila limitada entre a fonte e o detector, com política de descarte"""
+
+    def __init__(self, size, policy):
+        self.items = deque()
+        self.size = max(1, size)
+        self.policy = policy
+        self.dropped = 0
+        self.closed = False
+        self.error = None
+
+    def offer(self, item):
+        """Enfileira o item; False se a fila está cheia e a política é 'block'"""
+        if len(self.items) < self.size:
+            self.items.append(item)
+            return True
+        if self.policy == "block":
+            return False
+        self.dropped += 1
+        if self.policy == "drop_oldest":
+            self.items.popleft()
+            self.items.append(item)
+        return True
+
+    def take(self):
+        return self.items.popleft() if self.items else None
+
+
+class _StreamRun:
+    """Detector + StreamState de uma chamada de detect_stream"""
+
+    def __init__(self, cfg, detector, target_word, name):
+        self.owned = detector is None
+        self.detector = detector or make_stream_detector(cfg)
+        self.stream = self.detector.create_stream(name)
+        if target_word:
+            self.stream.target_word = target_word.upper()
+        hardware = self.detector.config.hardware
+        self.size = (hardware.CAMERA_WIDTH, hardware.CAMERA_HEIGHT)
+
+    def process(self, frame, capture_time, dropped):
+        """Processa um frame; retorna a lista de eventos dele"""
+        import cv2
+
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size)
+        detector, stream = self.detector, self.stream
+        detector.events = []
+        _, _, letter = detector.process_frame(frame, stream, capture_time, annotate=False)
+        features = stream.last_features or {}
+        event = {
+            'kind': "frame",
+            'frame': stream.frame_count,
+            'letter': letter,
+            'confidence': stream.last_confidence,
+            'confirmed': stream.last_gesture,
+            'area': features.get('area'),
+            'fingers': features.get('fingers'),
+            'geometry': features.get('geometry'),
+            'dropped': dropped,
+            'stream': stream.name,
+        }
+        return [event] + detector.events
+
+    def close(self):
+        # Só os recursos deste detector: o logging do processo continua ativo
+        self.detector.events = None
+        self.stream = None
+        if self.owned:
+            self.detector.release()
+
+
+def detect_stream(frames, cfg=None, detector=None, target_word=None, drop_policy=None,
+                  queue_size=None, name="stream0"):
+    """
+    Gerador de eventos para os frames dados (gerador assíncrono se 'frames'
+    for um iterável assíncrono).
+    detector: reaproveita um detector de make_stream_detector (um fluxo por vez).
+    drop_policy/queue_size: padrão em AdvancedConfig.STREAM_DROP_POLICY/STREAM_QUEUE_SIZE.
+    """
+    if detector is not None:
+        cfg = detector.config
+    advanced = cfg.advanced if cfg is not None else AdvancedConfig
+    drop_policy = drop_policy or advanced.STREAM_DROP_POLICY
+    queue_size = queue_size or advanced.STREAM_QUEUE_SIZE
+    if drop_policy not in DROP_POLICIES:
+        raise ValueError(f"Política de descarte inválida: {drop_policy!r} "
+                         f"(use {', '.join(DROP_POLICIES)})")
+
+    args = (frames, FrameQueue(queue_size, drop_policy), cfg, detector, target_word, name)
+    if hasattr(frames, "__aiter__"):
+        return _detect_async(*args)
+    return _detect_sync(*args)
+
+
+def _detect_sync(frames, pending, cfg, detector, target_word, name):
+    run = _StreamRun(cfg, detector, target_word, name)
+    ready = threading.Condition()
+    stop = threading.Event()
+
+    def read():
+        try:
+            for frame in frames:
+                item = (frame, time.perf_counter())
+                with ready:
+                    while not pending.offer(item):
+                        if stop.is_set():
+                            return
+                        ready.wait()
+                    ready.notify_all()
+                if stop.is_set():
+                    return
+        except Exception as e:
+            pending.error = e
+        finally:
+            with ready:
+                pending.closed = True
+                ready.notify_all()
+
+    reader = threading.Thread(target=read, name=f"stream-{name}", daemon=True)
+    reader.start()
+    try:
+        while True:
+            with ready:
+                while not pending.items and not pending.closed:
+                    ready.wait()
+                item = pending.take()
+                ready.notify_all()
+            if item is None:
+                if pending.error is not None:
+                    raise pending.error
+                return
+            yield from run.process(*item, pending.dropped)
+    finally:
+        # Consumidor terminou (ou desistiu): libera a leitura e o detector
+        stop.set()
+        with ready:
+            ready.notify_all()
+        run.close()
+
+
+async def _detect_async(frames, pending, cfg, detector, target_word, name):
+    run = _StreamRun(cfg, detector, target_word, name)
+    ready = asyncio.Condition()
+    loop = asyncio.get_running_loop()
+
+    async def read():
+        try:
+            async for frame in frames:
+                item = (frame, time.perf_counter())
+                async with ready:
+                    while not pending.offer(item):
+                        await ready.wait()
+                    ready.notify_all()
+        except Exception as e:
+            pending.error = e
+        finally:
+            pending.closed = True
+            async with ready:
+                ready.notify_all()
+
+    reader = asyncio.ensure_future(read())
+    try:
+        while True:
+            async with ready:
+                while not pending.items and not pending.closed:
+                    await ready.wait()
+                item = pending.take()
+                ready.notify_all()
+            if item is None:
+                if pending.error is not None:
+                    raise pending.error
+                return
+            # Processamento fora do loop de eventos: a fonte continua sendo lida
+            events = await loop.run_in_executor(None, run.process, *item, pending.dropped)
+            for event in events:
+                yield event
+    finally:
+        reader.cancel()
+        run.close()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Transcrição em lote de vídeos gravados
+======================================
+
+Passa cada vídeo de um diretório pelo mesmo pipeline do detector ao vivo
+(segmentação → features → classificação → estabilização → palavra alvo),
+sem janelas, sem GPIO e sem esperar o tempo real. Os vídeos são
+distribuídos em um pool de processos; cada processo mantém um detector
+e o reaproveita entre vídeos.
+
+Para cada vídeo é gravado <saida>/<nome>.json com as letras confirmadas e
+as palavras formadas, cada uma com o frame e o instante no vídeo. O
+cooldown entre palavras segue o relógio do vídeo.
+
+Uso:
+    python3 transcribe.py gravacoes/ --out transcricoes/ --workers 4
+    python3 transcribe.py gravacoes/ --scaling 1,2,4      # FPS agregados por nº de workers
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov", ".h264", ".mjpeg")
+
+# Detector do processo do pool (criado uma vez em _init_worker)
+_detector = None
+
+
+def make_transcriber(cfg):
+    """Detector sem motor que registra letras e palavras com o tempo do vídeo"""
+    from libras_detector_rpi import LibrasDetectorRPi
+
+    class Transcriber(LibrasDetectorRPi):
+        video_time = 0.0
+        events = None
+
+        def publish_event(self, kind, **payload):
+            if self.events is not None and kind in ("letter", "word"):
+                payload.pop("stream", None)
+                payload.pop("sequence", None)
+                self.events.append(dict(payload, kind=kind, t=round(self.video_time, 3)))
+
+        def activate_motor(self, stream=None):
+            # Sem motor na transcrição: o evento 'word' já foi registrado
+            pass
+
+    # Sem GPIO real, sem serviços de rede e sem log em arquivo
+    cfg.hardware.USE_FAKE_GPIO = True
+    cfg.system.ENABLE_LOGGING = False
+    cfg.system.ENABLE_SESSION_LOG = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        detector = Transcriber(motor_pins=cfg.hardware.MOTOR_PINS, cfg=cfg)
+    detector.clock = lambda: detector.video_time
+    return detector
+
+
+def transcribe_video(detector, path, target_word=None, max_frames=None):
+    """Processa um vídeo inteiro e retorna a transcrição (dicionário)"""
+    import cv2
+
+    hardware = detector.config.hardware
+    size = (hardware.CAMERA_WIDTH, hardware.CAMERA_HEIGHT)
+
+    # Estado novo por vídeo
+    detector.stream = detector.create_stream(os.path.basename(path))
+    if target_word:
+        detector.stream.target_word = target_word.upper()
+    detector.stream.last_activation_time = float("-inf")
+    detector.events = []
+    detector.video_time = 0.0
+
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0
+    if not 0 < fps < 1000:
+        fps = hardware.CAMERA_FPS
+    frames = 0
+    start = time.perf_counter()
+    try:
+        while max_frames is None or frames < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if (frame.shape[1], frame.shape[0]) != size:
+                frame = cv2.resize(frame, size)
+            detector.video_time = frames / fps
+            detector.process_frame(frame, annotate=False)
+            frames += 1
+    finally:
+        cap.release()
+    elapsed = time.perf_counter() - start
+
+    letters = [event for event in detector.events if event["kind"] == "letter"]
+    words = [event for event in detector.events if event["kind"] == "word"]
+    return {
+        'video': path,
+        'frames': frames,
+        'fps': fps,
+        'duration': frames / fps,
+        'target_word': detector.stream.target_word,
+        'text': "".join(event["letter"] for event in letters),
+        'letters': [{k: e[k] for k in ("t", "frame", "letter", "confidence")} for e in letters],
+        'words': [{k: e[k] for k in ("t", "frame", "word")} for e in words],
+        'elapsed': elapsed,
+    }
+
+
+def _init_worker(single_thread):
+    global _detector
+    import cv2
+    from config import Config
+
+    if single_thread:
+        # Um processo por núcleo: o paralelismo interno do OpenCV só disputaria CPU
+        cv2.setNumThreads(1)
+    cfg = Config()
+    with contextlib.redirect_stdout(io.StringIO()):
+        cfg.load_from_file()
+    _detector = make_transcriber(cfg)
+
+
+def _transcribe_job(job):
+    path, out_dir, target_word, max_frames = job
+    result = transcribe_video(_detector, path, target_word, max_frames)
+    if out_dir:
+        name = os.path.splitext(os.path.basename(path))[0] + ".json"
+        with open(os.path.join(out_dir, name), "w", encoding="utf-8") as output:
+            json.dump(result, output, ensure_ascii=False, indent=2)
+    return result
+
+
+def find_videos(directory):
+    """Vídeos do diretório (não recursivo), em ordem alfabética"""
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.lower().endswith(VIDEO_EXTENSIONS))
+
+
+def transcribe_all(videos, workers, out_dir=None, target_word=None, max_frames=None,
+                   on_result=None):
+    """Transcreve os vídeos em 'workers' processos; retorna (resultados, segundos)"""
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    jobs = [(path, out_dir, target_word, max_frames) for path in videos]
+    results = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(workers > 1,)) as executor:
+        # Vídeos longos primeiro equilibram melhor a carga entre processos
+        jobs.sort(key=lambda job: -os.path.getsize(job[0]))
+        for result in executor.map(_transcribe_job, jobs):
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+    return results, time.perf_counter() - start
+
+
+def print_result(result):
+    words = ", ".join(f"{w['word']}@{w['t']:.1f}s" for w in result['words']) or "-"
+    print(f"🎞️ {os.path.basename(result['video'])}: {result['frames']} frames | "
+          f"letras '{result['text']}' | palavras {words}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcrição em lote de vídeos LIBRAS")
+    parser.add_argument("directory", help="Diretório com os vídeos")
+    parser.add_argument("--out", help="Diretório dos JSON de transcrição")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processos em paralelo")
+    parser.add_argument("--word", help="Palavra alvo (padrão: a da configuração)")
+    parser.add_argument("--max-frames", type=int, help="Limite de frames por vídeo")
+    parser.add_argument("--scaling", help="Lista de nº de workers para medir a vazão, ex. 1,2,4")
+    args = parser.parse_args()
+
+    videos = find_videos(args.directory)
+    if not videos:
+        raise SystemExit(f"❌ Nenhum vídeo em {args.directory}")
+
+    if args.scaling:
+        baseline = None
+        for workers in [int(value) for value in args.scaling.split(",")]:
+            results, elapsed = transcribe_all(videos, workers, target_word=args.word,
+                                              max_frames=args.max_frames)
+            fps = sum(result['frames'] for result in results) / elapsed
+            baseline = baseline or fps
+            print(f"{workers} worker(s): {fps:7.1f} FPS agregados | {elapsed:6.1f} s | "
+                  f"escala {fps / baseline:4.2f}x")
+        return
+
+    results, elapsed = transcribe_all(videos, args.workers, args.out, args.word,
+                                      args.max_frames, on_result=print_result)
+    frames = sum(result['frames'] for result in results)
+    print(f"✅ {len(results)} vídeos, {frames} frames em {elapsed:.1f}s "
+          f"({frames / elapsed:.1f} FPS, {args.workers} workers)")
+
+
+if __name__ == "__main__":
+    main()
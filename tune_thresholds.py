@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ajuste automático dos limites de classificação
+==============================================
+
+Procura os limites de ClassificationConfig (solidez, aspecto, compacidade,
+extensão) que melhor classificam um conjunto de vetores de features
+rotulados, e grava o resultado em user_config.json, lido por
+Config.load_from_file().
+
+As regras de classify_libras_letter são avaliadas de forma vetorizada:
+um lote de K configurações candidatas contra N amostras vira matrizes
+K×N de comparações NumPy, e os lotes são distribuídos em um pool de
+processos. Antes da busca, as predições vetorizadas da configuração atual
+são comparadas com classify_libras_letter amostra a amostra.
+
+Dados rotulados:
+    --synthetic N          silhuetas de hand_synth (forma → letra em SHAPE_LETTERS)
+    --session A=log.bin    log de sessão (session_log.py) gravado fazendo a letra A
+    --dataset dados.npz    conjunto salvo antes com --save-dataset
+
+Busca:
+    --search random        candidatos sorteados nos intervalos (--budget)
+    --search grid          grade em --params, --steps valores por parâmetro
+    --search coordinate    a cada rodada, o melhor movimento de um só parâmetro
+
+Uso:
+    python3 tune_thresholds.py --synthetic 5000 --search coordinate
+    python3 tune_thresholds.py --session A=sessao-a.bin --session B=sessao-b.bin \\
+        --search random --budget 50000 --out ~/libras_detector/user_config.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from config import ClassificationConfig, Config
+
+FEATURES = ('fingers', 'aspect_ratio', 'solidity', 'compactness', 'extent', 'defect_count')
+
+# Rótulos possíveis na saída de classify_libras_letter, na ordem dos códigos
+LETTERS = ("A", "B", "C", "D", "E", "F", "G", "I", "L", "O", "U", "V", "ABERTA", "INDEFINIDO")
+CODES = {letter: code for code, letter in enumerate(LETTERS)}
+
+# Sufixo do limite → feature comparada (os limites de dedos/defeitos são fixos)
+PARAM_FEATURES = {'SOLIDITY': 'solidity', 'ASPECT_RATIO': 'aspect_ratio',
+                  'COMPACTNESS': 'compactness', 'EXTENT': 'extent'}
+
+# Rótulo das silhuetas sintéticas (open usa a contagem de dedos)
+SHAPE_LETTERS = {'fist': "A", 'c': "C", 'o': "O"}
+OPEN_LETTERS = {1: "D", 2: "V", 3: "F", 4: "B", 5: "B"}
+
+# Candidatos por tarefa enviada ao pool
+CHUNK = 256
+
+
+def tunable_params():
+    """Limites contínuos de ClassificationConfig, na ordem da classe"""
+    suffixes = tuple("_" + suffix for suffix in PARAM_FEATURES)
+    return [name for name in vars(ClassificationConfig)
+            if name.isupper() and name.endswith(suffixes)]
+
+
+def threshold_pairs(names):
+    """Pares (X_MIN_Y, X_MAX_Y) presentes em names: o mínimo não pode passar do máximo"""
+    return [(name, name.replace("_MIN_", "_MAX_")) for name in names
+            if "_MIN_" in name and name.replace("_MIN_", "_MAX_") in names]
+
+
+def inverted_pairs(values):
+    """Pares de values (nome → limite) com mínimo maior que o máximo"""
+    return [(low, high) for low, high in threshold_pairs(list(values))
+            if values[low] > values[high]]
+
+
+def predict(features, t):
+    """
+    Versão vetorizada de classify_libras_letter.
+    features: arrays (N,); t(nome) -> limite escalar ou coluna (K, 1).
+    Retorna os códigos das letras, (K, N).
+    """
+    fingers = features['fingers']
+    aspect = features['aspect_ratio']
+    solidity = features['solidity']
+    compactness = features['compactness']
+    extent = features['extent']
+    defects = features['defect_count']
+
+    rules = [
+        ("A", (fingers <= t('A_MAX_FINGERS')) & (solidity > t('A_MIN_SOLIDITY'))
+         & (compactness < t('A_MAX_COMPACTNESS'))),
+        ("B", (fingers >= t('B_MIN_FINGERS')) & (solidity > t('B_MIN_SOLIDITY'))
+         & (aspect < t('B_MAX_ASPECT_RATIO'))),
+        ("C", (fingers >= t('C_MIN_FINGERS')) & (fingers <= t('C_MAX_FINGERS'))
+         & (solidity > t('C_MIN_SOLIDITY')) & (solidity < t('C_MAX_SOLIDITY'))
+         & (compactness > t('C_MIN_COMPACTNESS'))),
+        ("D", (fingers == t('D_FINGERS')) & (aspect > t('D_MIN_ASPECT_RATIO'))
+         & (extent < t('D_MAX_EXTENT'))),
+        ("E", (fingers == t('E_FINGERS')) & (solidity > t('E_MIN_SOLIDITY'))
+         & (compactness < t('E_MAX_COMPACTNESS'))),
+        ("F", (fingers == t('F_FINGERS')) & (solidity > t('F_MIN_SOLIDITY'))),
+        ("G", (fingers == t('G_FINGERS')) & (aspect > t('G_MIN_ASPECT_RATIO'))),
+        ("I", (fingers == t('I_FINGERS')) & (aspect < t('I_MAX_ASPECT_RATIO'))
+         & (extent > t('I_MIN_EXTENT'))),
+        ("L", (fingers == t('L_FINGERS')) & (aspect > t('L_MIN_ASPECT_RATIO'))
+         & (compactness > t('L_MIN_COMPACTNESS'))),
+        ("O", (fingers <= t('O_MAX_FINGERS')) & (solidity > t('O_MIN_SOLIDITY'))
+         & (solidity < t('O_MAX_SOLIDITY')) & (compactness > t('O_MIN_COMPACTNESS'))
+         & (compactness < t('O_MAX_COMPACTNESS'))),
+        ("U", (fingers == t('U_FINGERS')) & (aspect < t('U_MAX_ASPECT_RATIO'))
+         & (solidity > t('U_MIN_SOLIDITY'))),
+        ("V", (fingers == t('V_FINGERS')) & (defects >= t('V_MIN_DEFECTS'))
+         & (solidity < t('V_MAX_SOLIDITY'))),
+    ]
+    # Padrão pela contagem de dedos
+    fallback = np.full(fingers.shape, CODES["INDEFINIDO"], dtype=np.int8)
+    for count, letter in {0: "E", 1: "D", 2: "V", 3: "F", 4: "B", 5: "ABERTA"}.items():
+        fallback[fingers == count] = CODES[letter]
+
+    conditions = [condition for _, condition in rules]
+    shape = np.broadcast_shapes(*(np.shape(condition) for condition in conditions))
+    conditions = [np.broadcast_to(condition, shape) for condition in conditions]
+    choices = [np.int8(CODES[letter]) for letter, _ in rules]
+    return np.select(conditions, choices, np.broadcast_to(fallback, shape))
+
+
+# ----------------------------------------------------------------------
+# Pool: cada processo guarda o conjunto de dados uma única vez
+# ----------------------------------------------------------------------
+
+_state = {}
+
+
+def _init_pool(features, labels, names, fixed, metric):
+    classes = np.unique(labels)
+    onehot = (labels[:, None] == classes[None, :]).astype(np.float32)
+    _state.update(features=features, labels=labels, names=names, fixed=fixed,
+                  metric=metric, onehot=onehot, counts=onehot.sum(axis=0))
+
+
+def _score_chunk(candidates):
+    names = _state['names']
+    columns = {name: candidates[:, i:i + 1] for i, name in enumerate(names)}
+    fixed = _state['fixed']
+    predictions = predict(_state['features'], lambda name: columns.get(name, fixed.get(name)))
+    correct = (predictions == _state['labels']).astype(np.float32)
+    if _state['metric'] == "accuracy":
+        return correct.mean(axis=1)
+    # Média das taxas de acerto por letra (classes raras pesam igual)
+    return (correct @ _state['onehot'] / _state['counts']).mean(axis=1)
+
+
+class Evaluator:
+    """
+    Avalia lotes de candidatos (K × P) no pool; conta candidatos e tempo.
+    Candidatos com algum par MIN > MAX (faixa que nunca casa) não são
+    avaliados e recebem -inf.
+    """
+
+    def __init__(self, executor, pairs=()):
+        self.executor = executor
+        # Índices (mínimo, máximo) das colunas dos candidatos
+        self.pairs = list(pairs)
+        self.evaluated = 0
+        self.rejected = 0
+        self.elapsed = 0.0
+
+    def __call__(self, candidates):
+        start = time.perf_counter()
+        valid = np.ones(len(candidates), dtype=bool)
+        for low, high in self.pairs:
+            valid &= candidates[:, low] <= candidates[:, high]
+        scores = np.full(len(candidates), -np.inf)
+        accepted = candidates[valid]
+        if len(accepted):
+            chunks = [accepted[i:i + CHUNK] for i in range(0, len(accepted), CHUNK)]
+            scores[valid] = np.concatenate(list(self.executor.map(_score_chunk, chunks)))
+        self.elapsed += time.perf_counter() - start
+        self.evaluated += len(accepted)
+        self.rejected += len(candidates) - len(accepted)
+        return scores
+
+
+# ----------------------------------------------------------------------
+# Dados
+# ----------------------------------------------------------------------
+
+def _synthetic_slice(seed, start, count):
+    import contextlib
+    import io
+
+    import cv2
+    from hand_synth import iter_samples
+    from libras_detector_rpi import LibrasDetectorRPi
+
+    cv2.setNumThreads(1)
+    cfg = Config()
+    cfg.system.ENABLE_LOGGING = False
+    cfg.hardware.USE_FAKE_GPIO = True
+    cfg.detection.FEATURE_CACHE = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        detector = LibrasDetectorRPi(motor_pins=cfg.hardware.MOTOR_PINS, cfg=cfg)
+    rows, labels = [], []
+    try:
+        for sample in iter_samples(count, seed, start):
+            if sample['contour'] is None:
+                continue
+            geometry = detector.analyze_hand_geometry(sample['contour'])
+            if not geometry:
+                continue
+            fingers, _ = detector.find_finger_defects(sample['contour'])
+            rows.append([fingers] + [geometry[name] for name in FEATURES[1:]])
+            spec = sample['spec']
+            labels.append(OPEN_LETTERS[spec['fingers']] if spec['shape'] == "open"
+                          else SHAPE_LETTERS[spec['shape']])
+    finally:
+        detector.cleanup()
+    return rows, labels
+
+
+def synthetic_dataset(count, workers, seed=0):
+    """Features das silhuetas de hand_synth, extraídas em paralelo"""
+    per_worker = -(-count // workers)
+    jobs = [(seed, start, min(per_worker, count - start))
+            for start in range(0, count, per_worker)]
+    rows, labels = [], []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_rows, chunk_labels in executor.map(_synthetic_slice, *zip(*jobs)):
+            rows += chunk_rows
+            labels += chunk_labels
+    data = np.array(rows, dtype=np.float64)
+    return {name: data[:, i] for i, name in enumerate(FEATURES)}, labels
+
+
+def session_dataset(specs):
+    """Logs de sessão rotulados ('A=caminho.bin'); só frames com mão"""
+    from session_log import read_session
+
+    columns = {name: [] for name in FEATURES}
+    labels = []
+    for spec in specs:
+        letter, _, path = spec.partition("=")
+        records = read_session(path)
+        records = records[records['area'] > 0]
+        for name in FEATURES:
+            columns[name].append(np.asarray(records[name], dtype=np.float64))
+        labels += [letter.upper()] * len(records)
+    return {name: np.concatenate(values) for name, values in columns.items()}, labels
+
+
+def load_dataset(path):
+    data = np.load(path)
+    return {name: data[name] for name in FEATURES}, [str(label) for label in data['label']]
+
+
+def save_dataset(path, features, labels):
+    np.savez_compressed(path, label=np.array(labels), **features)
+
+
+def check_equivalence(features, cfg):
+    """Compara predict() com classify_libras_letter em todas as amostras"""
+    from types import SimpleNamespace
+
+    from libras_detector_rpi import LibrasDetectorRPi
+
+    fixed = {name: getattr(cfg.classification, name) for name in dir(cfg.classification)
+             if name.isupper()}
+    vectorized = predict(features, fixed.get)
+    owner = SimpleNamespace(config=cfg)
+    mismatches = 0
+    for i in range(len(features['fingers'])):
+        geometry = {name: features[name][i] for name in FEATURES[1:]}
+        letter = LibrasDetectorRPi.classify_libras_letter(
+            owner, geometry, int(features['fingers'][i]), None)
+        mismatches += CODES[letter] != vectorized[i]
+    return mismatches
+
+
+# ----------------------------------------------------------------------
+# Busca
+# ----------------------------------------------------------------------
+
+def param_ranges(features, names, current):
+    """Intervalo de cada limite: quantis 0.5%–99.5% da feature, incluindo o valor atual"""
+    ranges = []
+    for name in names:
+        suffix = next(suffix for suffix in PARAM_FEATURES if name.endswith("_" + suffix))
+        values = features[PARAM_FEATURES[suffix]]
+        low, high = np.quantile(values, [0.005, 0.995])
+        ranges.append((min(low, current[name]), max(high, current[name])))
+    return np.array(ranges)
+
+
+def search_random(evaluate, base, ranges, budget, rng, pairs=()):
+    candidates = rng.uniform(ranges[:, 0], ranges[:, 1], size=(budget, len(base)))
+    # Sorteio independente inverteria metade dos pares: ordena cada par
+    for low, high in pairs:
+        candidates[:, [low, high]] = np.sort(candidates[:, [low, high]], axis=1)
+    candidates[0] = base
+    scores = evaluate(candidates)
+    best = int(np.argmax(scores))
+    return candidates[best], scores[best]
+
+
+def search_grid(evaluate, base, ranges, indices, steps, limit):
+    axes = [np.linspace(ranges[i, 0], ranges[i, 1], steps) for i in indices]
+    total = steps ** len(indices)
+    if total > limit:
+        raise SystemExit(f"❌ Grade com {total} candidatos (limite {limit}); "
+                         "use menos --params ou --steps")
+    best, best_score = base, evaluate(base[None, :])[0]
+    # Lotes da grade sem materializar o produto inteiro de uma vez
+    grid = itertools.product(*axes)
+    while True:
+        block = list(itertools.islice(grid, CHUNK * 16))
+        if not block:
+            break
+        candidates = np.repeat(base[None, :], len(block), axis=0)
+        candidates[:, indices] = block
+        scores = evaluate(candidates)
+        i = int(np.argmax(scores))
+        if scores[i] > best_score:
+            best, best_score = candidates[i], scores[i]
+    return best, best_score
+
+
+def search_coordinate(evaluate, base, ranges, indices, steps, rounds):
+    best = base.copy()
+    best_score = evaluate(best[None, :])[0]
+    for _ in range(rounds):
+        # Todos os movimentos de um único parâmetro em um só lote
+        candidates = np.repeat(best[None, :], len(indices) * steps, axis=0)
+        for k, i in enumerate(indices):
+            candidates[k * steps:(k + 1) * steps, i] = np.linspace(ranges[i, 0], ranges[i, 1],
+                                                                   steps)
+        scores = evaluate(candidates)
+        j = int(np.argmax(scores))
+        if scores[j] <= best_score:
+            break
+        best, best_score = candidates[j], scores[j]
+    return best, best_score
+
+
+def prune(evaluate, best, score, base, indices):
+    """Volta ao valor original cada limite que não melhora a pontuação"""
+    for i in indices:
+        if best[i] == base[i]:
+            continue
+        candidate = best.copy()
+        candidate[i] = base[i]
+        if evaluate(candidate[None, :])[0] >= score:
+            best = candidate
+    return best
+
+
+def per_letter(features, labels, values):
+    predictions = predict(features, values.get)
+    report = {}
+    for code in np.unique(labels):
+        selected = labels == code
+        report[int(code)] = (int(selected.sum()), float((predictions[selected] == code).mean()))
+    return report
+
+
+def write_user_config(path, params):
+    """Atualiza só a seção 'classification' de user_config.json"""
+    path = os.path.expanduser(path)
+    data = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    data.setdefault('classification', {}).update(params)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ajuste dos limites de ClassificationConfig")
+    parser.add_argument("--synthetic", type=int, default=0, help="Amostras sintéticas")
+    parser.add_argument("--session", action="append", default=[],
+                        help="Log de sessão rotulado, LETRA=caminho.bin (repetível)")
+    parser.add_argument("--dataset", help="Conjunto .npz salvo com --save-dataset")
+    parser.add_argument("--save-dataset", help="Grava as features carregadas em .npz")
+    parser.add_argument("--search", choices=("random", "grid", "coordinate"),
+                        default="coordinate")
+    parser.add_argument("--params", help="Limites ajustados, separados por vírgula "
+                                         "(padrão: todos os contínuos)")
+    parser.add_argument("--budget", type=int, default=20000, help="Candidatos (random)")
+    parser.add_argument("--steps", type=int, default=32,
+                        help="Valores por parâmetro (grid/coordinate)")
+    parser.add_argument("--rounds", type=int, default=50, help="Rodadas (coordinate)")
+    parser.add_argument("--metric", choices=("balanced", "accuracy"), default="balanced")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="user_config.json a atualizar (padrão: só mostra)")
+    args = parser.parse_args()
+
+    cfg = Config()
+    cfg.load_from_file()
+
+    parts = []
+    if args.dataset:
+        parts.append(load_dataset(args.dataset))
+    if args.session:
+        parts.append(session_dataset(args.session))
+    if args.synthetic:
+        parts.append(synthetic_dataset(args.synthetic, args.workers, args.seed))
+    if not parts:
+        raise SystemExit("❌ Informe --synthetic, --session ou --dataset")
+    features = {name: np.concatenate([part[0][name] for part in parts]) for name in FEATURES}
+    label_names = sum((part[1] for part in parts), [])
+    if args.save_dataset:
+        save_dataset(args.save_dataset, features, label_names)
+    labels = np.array([CODES.get(label, CODES["INDEFINIDO"]) for label in label_names],
+                      dtype=np.int8)
+    print(f"📊 {len(labels)} amostras, letras {sorted(set(label_names))}")
+
+    mismatches = check_equivalence(features, cfg)
+    print(f"🔎 Regras vetorizadas vs. classify_libras_letter: {mismatches} divergências")
+    if mismatches:
+        raise SystemExit("❌ predict() não reproduz classify_libras_letter")
+
+    current = {name: getattr(cfg.classification, name) for name in dir(cfg.classification)
+               if name.isupper()}
+    names = tunable_params()
+    selected = args.params.split(",") if args.params else names
+    unknown = set(selected) - set(names)
+    if unknown:
+        raise SystemExit(f"❌ Limites desconhecidos: {sorted(unknown)}")
+    indices = [names.index(name) for name in selected]
+    fixed = {name: value for name, value in current.items() if name not in names}
+    base = np.array([current[name] for name in names], dtype=np.float64)
+    ranges = param_ranges(features, names, current)
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_pool,
+                             initargs=(features, labels, names, fixed, args.metric)) as executor:
+        pairs = [(names.index(low), names.index(high)) for low, high in threshold_pairs(names)]
+        evaluate = Evaluator(executor, pairs)
+        before = evaluate(base[None, :])[0]
+        if args.search == "random":
+            # Só os limites selecionados variam
+            fixed_ranges = np.repeat(base[:, None], 2, axis=1)
+            fixed_ranges[indices] = ranges[indices]
+            best, score = search_random(evaluate, base, fixed_ranges, args.budget,
+                                        np.random.default_rng(args.seed), pairs)
+        elif args.search == "grid":
+            best, score = search_grid(evaluate, base, ranges, indices, args.steps,
+                                      limit=10 ** 7)
+        else:
+            best, score = search_coordinate(evaluate, base, ranges, indices, args.steps,
+                                            args.rounds)
+        # Limites que não influenciam o resultado (ex.: letras ausentes) ficam como estavam
+        best = prune(evaluate, best, score, base, indices)
+
+    rate = evaluate.evaluated / evaluate.elapsed if evaluate.elapsed else 0
+    print(f"⚙️ {evaluate.evaluated} configurações em {evaluate.elapsed:.2f}s "
+          f"({rate:,.0f}/s, {args.workers} processos; {evaluate.rejected} com MIN > MAX "
+          f"descartadas)")
+    print(f"🎯 {args.metric}: {before * 100:.1f}% → {score * 100:.1f}%")
+
+    tuned = {name: round(float(value), 4) for name, value in zip(names, best)
+             if not np.isclose(value, current[name])}
+    for name, value in tuned.items():
+        print(f"   {name}: {current[name]} → {value}")
+    after = dict(current, **tuned)
+    report_before = per_letter(features, labels, current)
+    report_after = per_letter(features, labels, after)
+    for code, (count, recall) in report_after.items():
+        print(f"   {LETTERS[code]:<10} {count:6d} amostras | "
+              f"{report_before[code][1] * 100:5.1f}% → {recall * 100:5.1f}%")
+
+    if args.out and tuned:
+        inverted = inverted_pairs(after)
+        if inverted:
+            raise SystemExit(f"❌ Limites invertidos, nada gravado: "
+                             + ", ".join(f"{low} > {high}" for low, high in inverted))
+        write_user_config(args.out, tuned)
+        print(f"✅ Limites gravados em {args.out}")
+
+
+if __name__ == "__main__":
+    main()